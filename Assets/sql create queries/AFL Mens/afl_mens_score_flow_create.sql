@@ -21,6 +21,12 @@ CREATE TABLE afl_mens_score_flow (
     uniquePlayerId         VARCHAR(255)    NOT NULL,
     uniqueMatchId          VARCHAR(255)    NOT NULL,
 
+    -- Season (partitioning column)
+    fixtureYear            VARCHAR(50)     NOT NULL,
+
+    -- Change Tracking
+    lastModified           TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (scoreFlowId),
 
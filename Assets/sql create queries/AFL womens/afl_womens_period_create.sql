@@ -43,6 +43,12 @@ CREATE TABLE afl_womens_period (
     uniquePeriodId              VARCHAR(255)      NOT NULL,
     uniquePlayerId              VARCHAR(255)      NOT NULL,
 
+    -- Season (partitioning column)
+    fixtureYear                 VARCHAR(50)       NOT NULL,
+
+    -- Change Tracking
+    lastModified                TIMESTAMP(6)      NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniquePeriodId),
 
@@ -47,6 +47,9 @@ CREATE TABLE NRL_mens_fixture (
     uniqueHomeSquadId             VARCHAR(255)         NOT NULL,
     uniqueSportId                 VARCHAR(255)         NOT NULL,
 
+    -- Change Tracking
+    lastModified                  TIMESTAMP(6)         NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniqueFixtureId),
 
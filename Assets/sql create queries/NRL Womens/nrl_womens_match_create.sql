@@ -86,6 +86,9 @@ CREATE TABLE NRL_womens_match (
     uniqueSportId               VARCHAR(255)    NOT NULL,
     uniqueMatchId               VARCHAR(255)    NOT NULL,
 
+    -- Change Tracking
+    lastModified                TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniqueMatchId),
 
@@ -77,6 +77,12 @@ CREATE TABLE NRL_womens_period (
     uniquePlayerId              VARCHAR(255)    NOT NULL,
     uniquePeriodId              VARCHAR(255)    NOT NULL,
 
+    -- Season (partitioning column)
+    fixtureYear                 VARCHAR(50)     NOT NULL,
+
+    -- Change Tracking
+    lastModified                TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniquePeriodId),
 
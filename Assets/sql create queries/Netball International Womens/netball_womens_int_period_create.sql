@@ -57,6 +57,12 @@ CREATE TABLE netball_womens_international_period (
     uniquePlayerId              VARCHAR(255)    NOT NULL,
     uniquePeriodId              VARCHAR(255)    NOT NULL,
 
+    -- Season (partitioning column)
+    fixtureYear                 VARCHAR(50)     NOT NULL,
+
+    -- Change Tracking
+    lastModified                TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniquePeriodId),
 
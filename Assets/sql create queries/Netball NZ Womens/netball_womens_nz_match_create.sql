@@ -71,6 +71,9 @@ CREATE TABLE netball_womens_nz_match (
     uniqueSquadId               VARCHAR(255)    NOT NULL,
     uniqueSportId               VARCHAR(255)    NOT NULL,
 
+    -- Change Tracking
+    lastModified                TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Composite Primary Key
     uniqueMatchId               VARCHAR(255)    NOT NULL,
     PRIMARY KEY (uniqueMatchId),
@@ -15,6 +15,9 @@ CREATE TABLE player_info (
     uniqueSquadId           VARCHAR(255)    NOT NULL,
     uniquePlayerId          VARCHAR(255)    NOT NULL,
   
+    -- Change Tracking
+    lastModified            TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniquePlayerId),
 
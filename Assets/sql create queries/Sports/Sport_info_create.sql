@@ -11,6 +11,9 @@ CREATE TABLE sport_info (
     -- Explicitly set uniqueSportId
     uniqueSportId           VARCHAR(255)    NOT NULL,
 
+    -- Change Tracking
+    lastModified            TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniqueSportId)
 );
@@ -6,6 +6,9 @@ CREATE TABLE squad_info (
     -- Explicitly set uniqueSquadId
     uniqueSquadId           VARCHAR(255)    NOT NULL,
 
+    -- Change Tracking
+    lastModified            TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniqueSquadId)
 );
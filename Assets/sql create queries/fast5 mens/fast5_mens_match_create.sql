@@ -73,6 +73,9 @@ CREATE TABLE fast5_mens_match (
     uniqueSportId               VARCHAR(255)    NOT NULL,
     uniqueMatchId               VARCHAR(255)    NOT NULL,
 
+    -- Change Tracking
+    lastModified                TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+
     -- Primary Key
     PRIMARY KEY (uniqueMatchId),
 
@@ -1,6 +1,7 @@
 # CsvScraper.py
 
 import logging
+import argparse
 import json
 import os
 import sys
@@ -20,6 +21,7 @@ from Core.ScoreFlowData import ScoreFlow
 from Utils.SportCategory import determine_sport_category
 from Utils.SanitiseFilename import sanitize_filename
 import Utils.CsvHelper as cs  
+from Utils.ColumnarHelper import ColumnarWriter
 
 class CsvScraper:
 
@@ -27,10 +29,19 @@ class CsvScraper:
     This class is responsible for scraping the entire database and saving the data to CSV files.
     This is mostly legacy code, however, it still works if you need to save the data locally into a csv format. 
     The size of all CSV's should be roughly 200MB. 
+
+    With output_format 'parquet' or 'feather', the fixture, match, period and score flow tables are written
+    as season partitioned datasets under Data/Columnar instead (see Utils/ColumnarHelper.py).
+    With output_format 'consolidated', they are appended to one CSV per sport, season and table under
+    Data/Consolidated, with an index of every match's byte range (see ConsolidatedCsvWriter in Utils/CsvHelper.py).
+    The CSV outputs can be written gzip or zstd compressed with compression 'gzip' or 'zstd'.
     """
 
 
-    def __init__(self):
+    def __init__(self, output_format='csv', compression=None):
+        self.output_format = output_format
+        self.compression = compression
+
         # Setup logging with both error and info logs
         self.info_logger, self.error_logger = setup_logging()
 
@@ -70,6 +81,33 @@ class CsvScraper:
         leagues_df, _ = League.fetch_leagues()
         print(f"Fetched {len(leagues_df)} leagues.")
 
+        # Collect squad info, player info and unique fields in memory for the whole scrape, the files are written at the end
+        self.squad_info_csv = cs.squad_info_accumulator()
+        self.player_info_csv = cs.player_info_accumulator()
+        self.unique_fields = {}  # Sport category to its unique fields accumulator
+        if self.output_format == 'consolidated':
+            self.table_writer = cs.ConsolidatedCsvWriter(compression=self.compression)
+        elif self.output_format != 'csv':
+            self.table_writer = ColumnarWriter(self.output_format)
+        else:
+            self.table_writer = None
+
+        try:
+            self.scrape_leagues(leagues_df, sport_id_map)
+        finally:
+            if self.table_writer is not None:
+                self.table_writer.flush()
+            self.squad_info_csv.flush()
+            self.player_info_csv.flush()
+            for unique_fields_csv in self.unique_fields.values():
+                unique_fields_csv.flush()
+
+    def scrape_leagues(self, leagues_df, sport_id_map):
+
+        """
+        This method scrapes every league and saves its fixtures, matches, periods and score flows to CSV files.
+        """
+
         # Iterate over leagues
         for _, league in leagues_df.iterrows():
             league_id = league['id']
@@ -136,16 +174,17 @@ class CsvScraper:
 
             # Create the league directory
             league_dir = os.path.join("Data", "Leagues", sanitized_sport_category, sanitized_league_name)
-            os.makedirs(league_dir, exist_ok=True)
 
             # Save the fixture CSV
-            fixture_csv_path = os.path.join(league_dir, f"{sanitized_league_name} Fixture.csv")
-            if not os.path.exists(fixture_csv_path):
-                cs.save_fixture_to_csv(fixture.data, fixture_csv_path)
-                print(f"Fixture data saved to {fixture_csv_path}")
+            if self.table_writer is None:
+                os.makedirs(league_dir, exist_ok=True)
+                fixture_csv_path = os.path.join(league_dir, f"{sanitized_league_name} Fixture.csv")
+                if cs.find_csv_file(fixture_csv_path) is None:
+                    cs.save_fixture_to_csv(fixture.data, fixture_csv_path, self.compression)
 
             match_year = re.search(r'\b(20\d{2})\b', league_name)
             fixture_year = match_year.group(1) if match_year else None
+            season = fixture_year or str(league['season'])
 
             # Initialize sets to track processed IDs
             processed_unique_match_ids = set()
@@ -195,7 +234,7 @@ class CsvScraper:
 
                     if uniqueSquadId not in processed_unique_squad_ids:
                         # Save squad info to CSV
-                        cs.save_squad_info_to_csv(squad_id, squad_name, fixture_title, str(fixture_year), sport_id)
+                        cs.save_squad_info_to_csv(squad_id, squad_name, fixture_title, str(fixture_year), sport_id, self.squad_info_csv)
                         processed_unique_squad_ids.add(uniqueSquadId)
 
                 # Fetch match data
@@ -293,7 +332,7 @@ class CsvScraper:
                     }
 
                     # Save player info to CSV
-                    cs.save_player_info_to_csv(player_info_data)
+                    cs.save_player_info_to_csv(player_info_data, self.player_info_csv)
 
                 print(f"Collected {len(match_data_list)} match entries "
                       f"for league {league_id}.")
@@ -301,27 +340,36 @@ class CsvScraper:
                 # Save match data to CSV
                 match_df = pd.DataFrame(match_data_list)
                 match_dir = os.path.join(league_dir, f"Match {match_id}")
-                os.makedirs(match_dir, exist_ok=True)
-                match_csv_path = os.path.join(match_dir, f"{sanitized_league_name} match {match_id} data.csv")
-                match_df.to_csv(match_csv_path, index=False)
-                print(f"Match data saved to {match_csv_path}")
+                additional_data_dir = os.path.join(match_dir, 'Additional Data')
+                if self.table_writer is not None:
+                    self.table_writer.add(sport_category, 'match', season, match_df)
+                else:
+                    os.makedirs(match_dir, exist_ok=True)
+                    match_csv_path = os.path.join(match_dir, f"{sanitized_league_name} match {match_id} data.csv")
+                    cs.save_dataframe_to_csv(match_df, match_csv_path, force_save=True, compression=self.compression)
+
+                    # Create 'Additional Data' directory
+                    os.makedirs(additional_data_dir, exist_ok=True)
 
                 # Save unique fields based on the sport category
                 match_fields = match_df.columns if not match_df.empty else []
-                cs.save_unique_fields(sanitized_sport_category, match_fields)
-
-                # Create 'Additional Data' directory
-                additional_data_dir = os.path.join(match_dir, 'Additional Data')
-                os.makedirs(additional_data_dir, exist_ok=True)
+                cs.save_unique_fields(sanitized_sport_category, match_fields, self.unique_fields)
 
                 # Fetch period data
                 period_data = PeriodData(league_id, match_id)
                 period_data.fetch_data()
                 print(f"Fetched {len(period_data.data)} period records " f"for match {match_id}.")
 
-                if not period_data.data.empty:
+                if not period_data.data.empty and self.table_writer is not None:
+                    # Same matchId and periodId columns as the per period CSVs
+                    period_df = period_data.data.copy()
+                    period_df['matchId'] = match_id
+                    if 'period' in period_df.columns:
+                        period_df['periodId'] = pd.factorize(period_df['period'])[0] + 1
+                    self.table_writer.add(sport_category, 'period', season, period_df)
+                elif not period_data.data.empty:
                     # Save period stats to CSV
-                    cs.save_period_stats_to_csv(period_data.data, match_id, additional_data_dir, league_name_and_season)
+                    cs.save_period_stats_to_csv(period_data.data, match_id, additional_data_dir, league_name_and_season, self.compression)
 
                 # Fetch score flow data
                 score_flow = ScoreFlow(league_id, match_id)
@@ -329,13 +377,25 @@ class CsvScraper:
                 print(f"Fetched {len(score_flow.data)} score flow records "
                       f"for match {match_id}.")
 
-                if not score_flow.data.empty:
-                    cs.save_score_flow_to_csv(score_flow.data, league_name_and_season, match_id, additional_data_dir)
+                if not score_flow.data.empty and self.table_writer is not None:
+                    self.table_writer.add(sport_category, 'score_flow', season, score_flow.data)
+                elif not score_flow.data.empty:
+                    cs.save_score_flow_to_csv(score_flow.data, league_name_and_season, match_id, additional_data_dir, self.compression)
 
                 print(f"Completed processing for match {match_id} in league {league_id}.")
 
+            if self.table_writer is not None:
+                self.table_writer.add(sport_category, 'fixture', season, fixture.data, key=fixture_id)
+
             print("Scraping completed.")
 
 if __name__ == "__main__":
-    scraper = CsvScraper()
+    parser = argparse.ArgumentParser(description="Scrape every league into local files.")
+    parser.add_argument('output_format', nargs='?', default='csv', choices=['csv', 'consolidated', 'parquet', 'feather'],
+                        help="'csv' for the per match CSVs, 'consolidated' for one CSV per sport, season and table, "
+                             "or 'parquet' or 'feather' for columnar datasets.")
+    parser.add_argument('--compression', choices=['gzip', 'zstd'], help="Write the CSVs compressed.")
+    args = parser.parse_args()
+
+    scraper = CsvScraper(args.output_format, args.compression)
     scraper.scrape_entire_database()
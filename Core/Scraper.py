@@ -7,6 +7,8 @@ import re
 import traceback
 from DatabaseUtils.SqlConnector import connect
 from DatabaseUtils.DatabaseHelper import DatabaseHelper
+from DatabaseUtils.ColumnStats import ColumnStatsCatalog
+from DatabaseUtils.PartitionManager import PartitionManager, UNKNOWN_SEASON
 from Utils.Logger import setup_logging
 from Utils.JsonLoader import load_json_fields
 from Core.LeaguesList import League
@@ -14,6 +16,7 @@ from Core.FixtureDetails import Fixture
 from Core.MatchDetails import Match
 from Core.PeriodData import PeriodData
 from Core.ScoreFlowData import ScoreFlow
+from Core.Sinks import FixtureRecords
 from Utils.SportCategory import determine_sport_category
 
 """
@@ -33,6 +36,7 @@ Supporting python files:
 - JsonLoader
 - DatabaseHelper
 - Logger
+- Sinks
 
 
 Supporting files:
@@ -57,19 +61,48 @@ For more information on the methods and how they work, please refer to the docum
 
 """
 
+# Columns the collection loop reads besides the table columns, kept when the frames are projected
+TRANSFORM_COLUMNS = ('playerId', 'squadId', 'squadName', 'firstname', 'surname', 'displayName', 'shortDisplayName', 'period')
+
 
 class Scraper:
-    def __init__(self):
+    def __init__(self, commit_every=10, commit_interval=30, table_suffix='', sinks=(), write_database=True):
+        """
+        Parameters:
+        commit_every (int): Number of fixtures to group into one database commit.
+        commit_interval (float): Maximum number of seconds between commits.
+        table_suffix (str): Suffix added to every table written to, e.g. '_staging' for a staging rebuild.
+        sinks (list): Extra outputs from Core/Sinks.py (CSV, Parquet, NDJSON, spool) that get every fixture's rows,
+                      each written on its own thread from the same fetch.
+        write_database (bool): Upsert the rows into MySQL. Without it, only the sinks are written
+                               (the connection is still used to look up missing playerIds, if there is one).
+        """
         # Setup logging with both error and info logs
         self.info_logger, self.error_logger = setup_logging()
 
         self.connection = connect()
         if self.connection is None:
             self.error_logger.error("Failed to connect to the database.")
-            raise ConnectionError("Database connection failed.")
-        self.connection.autocommit = False  # Turn off auto-commit
+            if write_database:
+                raise ConnectionError("Database connection failed.")
+            print("No database connection, only writing the sinks. Missing playerIds can't be looked up.")
+        else:
+            self.connection.autocommit = False  # Turn off auto-commit
+        self.table_suffix = table_suffix
+
+        # The stats catalog and partitions live in the database, so they are only set up with a connection
+        self.stats_catalog = None
+        self.partition_manager = None
+        if self.connection is not None:
+            self.stats_catalog = ColumnStatsCatalog(self.connection, self.error_logger, table_suffix=table_suffix)
+            self.partition_manager = PartitionManager(self.connection, self.error_logger)
         self.db_helper = DatabaseHelper(
-            self.connection, self.info_logger, self.error_logger)
+            self.connection, self.info_logger, self.error_logger,
+            commit_every=commit_every, commit_interval=commit_interval, stats_catalog=self.stats_catalog,
+            on_commit=self.publish_committed, on_rollback=self.discard_uncommitted)
+        self.sinks = list(sinks)
+        self.write_database = write_database
+        self.uncommitted_records = []  # Fixtures written to MySQL but not committed yet, held back from the sinks
 
         # Load JSON fields for each table
         self.json_fields = load_json_fields()
@@ -81,6 +114,9 @@ class Scraper:
         self.squad_fields = self.json_fields['squad_fields']
         self.sport_fields = self.json_fields['sport_fields']
 
+        # Columns kept from the match, period and score flow frames, compiled once per sport
+        self.column_plans = {}
+
         # Path to the BrokenFixtures.json file
         self.broken_fixtures_file = os.path.join('Assets', 'Jsons', 'BrokenFixtures.json')
         # Initialize the broken fixtures list
@@ -102,7 +138,21 @@ class Scraper:
                 json.dump(self.broken_fixtures, f)
             self.error_logger.info(f"Added fixtureId {fixture_id} to broken fixtures list.")
 
+    def mark_broken_fixture(self, fixture_id):
+        """
+        Add a fixture that failed to load to the broken fixtures, unless the failure was the connection being lost.
+        A fixture that never reached the server isn't broken, it is loaded again once the database is back.
+        """
+        if not self.connection.is_connected():
+            self.error_logger.error(f"Lost the database connection while writing fixtureId {fixture_id}.")
+            return
+        self.add_broken_fixture(fixture_id)
+
     def find_player_id(self, firstname, surname, squad_name=None):
+        # Without a database connection (sinks only) there is nothing to look up
+        if self.connection is None:
+            return None
+
         # Normalize the names
         firstname = firstname.strip().lower()
         surname = surname.strip().lower()
@@ -144,6 +194,243 @@ class Scraper:
                 f"No playerId found for {firstname} {surname} with squadName {squad_name}.")
             return None  # No match found
 
+    def prepare_season_partitions(self, sport_category_lower, fixture_year):
+        """
+        Give a season its own partition in the sport's partitioned tables, if it doesn't have one yet.
+        Adding a partition is DDL and commits implicitly, so the pending fixtures are committed first.
+        """
+        table_prefix = sport_category_lower.replace(' ', '_')
+        season_tables = [f"{table_prefix}_{category}{self.table_suffix}" for category in ('match', 'period', 'score_flow')]
+        if any(self.partition_manager.needs_partition(table, fixture_year) for table in season_tables):
+            self.db_helper.commit_pending()
+            for table in season_tables:
+                self.partition_manager.ensure_season(table, fixture_year)
+
+    def column_plan(self, sport_category_lower):
+        """
+        Return the columns worth keeping from a sport's match, period and score flow frames, as
+        {'match': set, 'period': set, 'score_flow': set}. Compiled on first use and cached for the run.
+
+        A column is kept if it is in the table's unique fields JSON and in the live table (the same match
+        insert_rows_dynamically makes), or if the collection loop reads it (TRANSFORM_COLUMNS).
+        Without the database (sinks only), or when a table can't be read, the JSON fields alone are used.
+        """
+        if sport_category_lower in self.column_plans:
+            return self.column_plans[sport_category_lower]
+
+        table_prefix = sport_category_lower.replace(' ', '_')
+        json_fields = {'match': self.match_fields, 'period': self.period_fields, 'score_flow': self.score_flow_fields}
+        plan = {}
+        for category, fields in json_fields.items():
+            columns = set(fields.get('required_fields', []) + fields.get('optional_fields', []))
+            if self.write_database:
+                table_columns = self.db_helper.get_table_columns(f"{table_prefix}_{category}{self.table_suffix}")
+                if table_columns:
+                    columns &= set(table_columns)
+            plan[category] = columns | set(TRANSFORM_COLUMNS)
+
+        self.info_logger.info(
+            f"Column plan for '{sport_category_lower}': "
+            + ", ".join(f"{category} {len(columns)} columns" for category, columns in plan.items()))
+        self.column_plans[sport_category_lower] = plan
+        return plan
+
+    @staticmethod
+    def project_columns(df, columns):
+        """Drop the columns of a fetched frame that aren't in the plan, before its rows are copied."""
+        dropped = [column for column in df.columns if column not in columns]
+        if not dropped:
+            return df
+        return df.drop(columns=dropped)
+
+    def publish_to_sinks(self, records):
+        """
+        Hand a fixture's rows to every sink. Each sink writes them on its own thread.
+        """
+        for sink in self.sinks:
+            sink.submit(records)
+
+    def publish_committed(self):
+        """
+        Hand the fixtures of the group that was just committed to the sinks.
+        Called by DatabaseHelper after every group commit.
+        """
+        records, self.uncommitted_records = self.uncommitted_records, []
+        for fixture_records in records:
+            self.publish_to_sinks(fixture_records)
+
+    def discard_uncommitted(self):
+        """
+        Drop the fixtures of a group that was rolled back, so the sinks never get rows MySQL doesn't have.
+        Called by DatabaseHelper after the pending fixtures are rolled back together.
+        """
+        if self.uncommitted_records:
+            self.error_logger.warning(f"Not writing {len(self.uncommitted_records)} rolled back fixtures to the sinks.")
+        self.uncommitted_records = []
+
+    def close_sinks(self):
+        """
+        Wait for every sink to write its queued fixtures, and report the sinks that failed.
+        """
+        for sink in self.sinks:
+            error = sink.close()
+            if error is not None:
+                self.error_logger.error(f"{sink.name} sink stopped early: {error}")
+                print(f"{sink.name} sink stopped early: {error}")
+            else:
+                print(f"{sink.name} sink finished.")
+        self.sinks = []
+
+    def load_fixture_records(self, records):
+        """
+        Upsert a fixture's collected rows into MySQL, as one savepoint protected part of the group commit transaction.
+        Used by scrape_specific_fixture, and by the spool loader for fixtures scraped earlier.
+
+        Parameters:
+        records (FixtureRecords): The fixture's rows.
+
+        Returns:
+        bool: True if the fixture was written, False if it was rolled back (and added to the broken fixtures,
+              unless the connection was lost).
+        """
+        fixture_id = records.fixture_id
+        sport_category_lower = records.sport_category.lower()
+        sport_info_data = records.fixture_tables['sport_info'][0]
+        squad_info_list = records.fixture_tables['squad_info']
+        player_info_list = records.fixture_tables['player_info']
+        fixture_data_list = records.fixture_tables['fixture']
+        match_data_dict = records.match_tables['match']
+        period_data_dict = records.match_tables['period']
+        score_flow_data_dict = records.match_tables['score_flow']
+
+        # For table names
+        table_prefix = sport_category_lower.replace(' ', '_')
+        fixture_table = f"{table_prefix}_fixture{self.table_suffix}"
+        match_table = f"{table_prefix}_match{self.table_suffix}"
+        period_table = f"{table_prefix}_period{self.table_suffix}"
+        score_flow_table = f"{table_prefix}_score_flow{self.table_suffix}"
+        squad_table = f"squad_info{self.table_suffix}"
+        sport_table = f"sport_info{self.table_suffix}"
+        player_table = f"player_info{self.table_suffix}"
+
+        # Start the transaction
+        try:
+            # Give a new season its own partition before any of its rows are written
+            self.prepare_season_partitions(sport_category_lower, records.season)
+
+            # Begin transaction (or join the open group commit transaction) with a savepoint for this fixture
+            self.db_helper.begin_fixture()
+
+            # Insert squad info
+            self.db_helper.savepoint('squad_info')
+            try:
+                self.db_helper.insert_rows_dynamically(squad_table, squad_info_list, self.squad_fields)
+                print(f"Inserted {len(squad_info_list)} squad info entries.")
+            except mysql_error as err:
+                self.error_logger.error(f"Error inserting squad info for fixtureId {fixture_id}: {err.msg}")
+                self.db_helper.rollback_to_savepoint('squad_info')
+                records.fixture_tables['squad_info'] = []  # Keep the sinks in step with what MySQL has
+
+            # Insert sport info
+            try:
+                self.db_helper.insert_data_dynamically(sport_table, sport_info_data, self.sport_fields)
+                print(f"Inserted sport info for fixtureId {fixture_id}.")
+            except mysql_error as err:
+                self.error_logger.error(f"Error inserting sport info for fixtureId {fixture_id}: {err.msg}")
+                self.db_helper.rollback_fixture()
+                self.mark_broken_fixture(fixture_id)
+                return False  # Exit the method
+
+            # Insert player info
+            self.db_helper.savepoint('player_info')
+            try:
+                self.db_helper.insert_rows_dynamically(player_table, player_info_list, self.player_fields)
+                print(f"Inserted {len(player_info_list)} player info entries.")
+            except mysql_error as err:
+                self.error_logger.error(f"Error inserting player info: {err.msg}")
+                self.db_helper.rollback_to_savepoint('player_info')
+                records.fixture_tables['player_info'] = []
+
+            # Insert fixture data
+            self.db_helper.savepoint('fixture_data')
+            try:
+                self.db_helper.insert_rows_dynamically(fixture_table, fixture_data_list, self.fixture_fields)
+                print(f"Inserted fixture data for fixture {fixture_id}.")
+            except mysql_error as err:
+                self.error_logger.error(f"Error inserting fixture data for fixtureId {fixture_id}: {err.msg}")
+                self.db_helper.rollback_to_savepoint('fixture_data')
+                records.fixture_tables['fixture'] = []
+
+            # Now, for each match ID, insert match data, period data, score flow data, and print statements
+            for match_id in match_data_dict.keys():
+                # Insert match data for match_id
+                match_data_list_for_match = match_data_dict[match_id]
+                self.db_helper.savepoint('match_data')
+                try:
+                    self.db_helper.insert_rows_dynamically(match_table, match_data_list_for_match, self.match_fields)
+                    print(f"Inserted match data for match {match_id}.")
+                except mysql_error as err:
+                    self.error_logger.error(f"Error inserting match data for match {match_id}: {err.msg}")
+                    self.db_helper.rollback_to_savepoint('match_data')
+                    match_data_dict[match_id] = []
+                    # Continue processing other data
+
+                # Insert period data for match_id
+                period_data_list_for_match = period_data_dict.get(match_id, [])
+                if period_data_list_for_match:
+                    self.db_helper.savepoint('period_data')
+                    try:
+                        self.db_helper.insert_rows_dynamically(period_table, period_data_list_for_match, self.period_fields)
+                        print(f"Inserted period data for match {match_id}.")
+                    except mysql_error as err:
+                        self.error_logger.error(f"Error inserting period data for match {match_id}: {err.msg}")
+                        self.db_helper.rollback_to_savepoint('period_data')
+                        period_data_dict[match_id] = []
+                else:
+                    print(f"No period data to insert for match {match_id}.")
+
+                # Insert score flow data for match_id
+                score_flow_data_list_for_match = score_flow_data_dict.get(match_id, [])
+                if score_flow_data_list_for_match:
+                    self.db_helper.savepoint('score_flow_data')
+                    try:
+                        self.db_helper.insert_rows_dynamically(score_flow_table, score_flow_data_list_for_match, self.score_flow_fields)
+                        print(f"Inserted score flow data for match {match_id}.")
+                    except mysql_error as err:
+                        self.error_logger.error(f"Error inserting score flow data for match {match_id}: {err.msg}")
+                        self.db_helper.rollback_to_savepoint('score_flow_data')
+                        score_flow_data_dict[match_id] = []
+                else:
+                    print(f"No score flow data to insert for match {match_id}.")
+
+            # The sinks get the fixture once its group is committed (see publish_committed),
+            # without the rows of any table whose savepoint was rolled back above
+            if self.sinks:
+                self.uncommitted_records.append(records)
+
+            # Close the fixture, the group commit policy decides whether the transaction is committed now
+            if self.db_helper.end_fixture():
+                print(f"Transaction committed successfully up to fixtureId: {fixture_id}")
+            else:
+                print(f"Fixture {fixture_id} written, waiting for group commit.")
+
+        except mysql_error as err:
+            # Log the error and rollback the transaction
+            self.error_logger.error(f"MySQL error during transaction for fixtureId {fixture_id}: {err.msg}")
+            self.db_helper.rollback_fixture()
+            self.mark_broken_fixture(fixture_id)
+            return False
+
+        except Exception as e:
+            # Log any other exceptions and rollback the transaction
+            self.error_logger.error(f"Unexpected error during transaction for fixtureId {fixture_id}: {e}")
+            self.error_logger.error(f"Traceback: {traceback.format_exc()}")
+            self.db_helper.rollback_fixture()
+            self.mark_broken_fixture(fixture_id)
+            return False
+
+        return True
+
     def scrape_entire_database(self):
         # Define the sport_id_map
         sport_id_map = {
@@ -175,6 +462,12 @@ class Scraper:
 
             self.scrape_specific_fixture(league_id, fixture_id, regulation_periods, sport_id_map)
 
+        # Commit whatever the group commit policy has left pending
+        self.db_helper.commit_pending()
+
+        # Let the sinks write out what they still have queued
+        self.close_sinks()
+
     def scrape_specific_fixture(self, league_id, fixture_id, regulation_periods, sport_id_map=None):
         if sport_id_map is None:
             # Define the sport_id_map if not provided
@@ -237,12 +530,13 @@ class Scraper:
 
         match_year = re.search(r'\b(20\d{2})\b', league_name)
         fixture_year = match_year.group(1) if match_year else None
+        if fixture_year is None:
+            # fixtureYear is NOT NULL and part of the partitioned keys, these rows go to the catch-all partition
+            self.error_logger.warning(f"No season found in league name '{league_name}', storing fixture {fixture_id} as '{UNKNOWN_SEASON}'.")
+            fixture_year = UNKNOWN_SEASON
 
-        # Start the transaction
+        # Collect the fixture's rows, nothing is written until they are all collected
         try:
-            # Begin transaction
-            self.connection.start_transaction()
-
             # Process sport info
             sport_info_data = {
                 'sportId': str(sport_id),
@@ -262,12 +556,8 @@ class Scraper:
             period_data_dict = {}
             score_flow_data_dict = {}
 
-            # For table names
-            table_prefix = sport_category_lower.replace(' ', '_')
-            fixture_table = f"{table_prefix}_fixture"
-            match_table = f"{table_prefix}_match"
-            period_table = f"{table_prefix}_period"
-            score_flow_table = f"{table_prefix}_score_flow"
+            # Columns kept from the match, period and score flow frames
+            column_plan = self.column_plan(sport_category_lower)
 
             # Initialize sets to track processed IDs
             processed_unique_match_ids = set()
@@ -337,6 +627,9 @@ class Scraper:
 
                 print(f"Fetched {len(match.data)} match records for match {match_id}.")
 
+                # Only carry the columns that get written on through the loop below
+                match.data = self.project_columns(match.data, column_plan['match'])
+
                 # Ensure 'firstname' and 'surname' are in match.data
                 if 'firstname' not in match.data.columns or 'surname' not in match.data.columns:
                     self.error_logger.error(f"'firstname' or 'surname' not found in match data for matchId: {match_id}. Skipping match.")
@@ -426,6 +719,7 @@ class Scraper:
 
                 # Assign matchId to period data
                 if not period_data.data.empty:
+                    period_data.data = self.project_columns(period_data.data, column_plan['period'])
                     period_data.data['matchId'] = str(match_id)
 
                 # Process and collect period data
@@ -493,6 +787,7 @@ class Scraper:
                         row['uniqueFixtureId'] = uniqueFixtureId
                         row['periodId'] = period_id
                         row['uniquePeriodId'] = uniquePeriodId
+                        row['fixtureYear'] = fixture_year
 
                         # Add the row to the period_data_list_for_match
                         period_data_list_for_match.append(row.to_dict())
@@ -509,6 +804,7 @@ class Scraper:
                 # Process and collect score flow data
                 score_flow_data_list_for_match = []
                 if not score_flow.data.empty:
+                    score_flow.data = self.project_columns(score_flow.data, column_plan['score_flow'])
                     score_flow_counter = 1
                     for idx, row in score_flow.data.iterrows():
                         score_flow_id = f"{match_id}_flow_{score_flow_counter}"
@@ -567,6 +863,7 @@ class Scraper:
                         row['uniqueSquadId'] = uniqueSquadId
                         row['uniqueSportId'] = uniqueSportId
                         row['uniqueFixtureId'] = uniqueFixtureId
+                        row['fixtureYear'] = fixture_year
 
                         score_flow_data_list_for_match.append(row.to_dict())
                 else:
@@ -583,95 +880,33 @@ class Scraper:
             # Convert player_info_dict.values() to player_info_list
             player_info_list = list(player_info_dict.values())
 
-            # Insert squad info
-            try:
-                for squad_info_data in squad_info_list:
-                    self.db_helper.insert_data_dynamically('squad_info', squad_info_data, self.squad_fields)
-                print(f"Inserted {len(squad_info_list)} squad info entries.")
-            except mysql_error as err:
-                self.error_logger.error(f"Error inserting squad info for fixtureId {fixture_id}: {err.msg}")
-
-            # Insert sport info
-            try:
-                self.db_helper.insert_data_dynamically('sport_info', sport_info_data, self.sport_fields)
-                print(f"Inserted sport info for fixtureId {fixture_id}.")
-            except mysql_error as err:
-                self.error_logger.error(f"Error inserting sport info for fixtureId {fixture_id}: {err.msg}")
-                self.connection.rollback()
-                self.add_broken_fixture(fixture_id)
-                return  # Exit the method
-
-            # Insert player info
-            try:
-                for player_info_data in player_info_list:
-                    self.db_helper.insert_data_dynamically('player_info', player_info_data, self.player_fields)
-                print(f"Inserted {len(player_info_list)} player info entries.")
-            except mysql_error as err:
-                self.error_logger.error(f"Error inserting player info: {err.msg}")
-
-            # Insert fixture data
-            try:
-                for fixture_data in fixture_data_list:
-                    self.db_helper.insert_data_dynamically(fixture_table, fixture_data, self.fixture_fields)
-                print(f"Inserted fixture data for fixture {fixture_id}.")
-            except mysql_error as err:
-                self.error_logger.error(f"Error inserting fixture data for fixtureId {fixture_id}: {err.msg}")
-
-            # Now, for each match ID, insert match data, period data, score flow data, and print statements
-            for match_id in match_data_dict.keys():
-                # Insert match data for match_id
-                match_data_list_for_match = match_data_dict[match_id]
-                try:
-                    for match_data in match_data_list_for_match:
-                        self.db_helper.insert_data_dynamically(match_table, match_data, self.match_fields)
-                    print(f"Inserted match data for match {match_id}.")
-                except mysql_error as err:
-                    self.error_logger.error(f"Error inserting match data for match {match_id}: {err.msg}")
-                    # Continue processing other data
-
-                # Insert period data for match_id
-                period_data_list_for_match = period_data_dict.get(match_id, [])
-                if period_data_list_for_match:
-                    try:
-                        for period_row in period_data_list_for_match:
-                            self.db_helper.insert_data_dynamically(period_table, period_row, self.period_fields)
-                        print(f"Inserted period data for match {match_id}.")
-                    except mysql_error as err:
-                        self.error_logger.error(f"Error inserting period data for match {match_id}: {err.msg}")
-                else:
-                    print(f"No period data to insert for match {match_id}.")
-
-                # Insert score flow data for match_id
-                score_flow_data_list_for_match = score_flow_data_dict.get(match_id, [])
-                if score_flow_data_list_for_match:
-                    try:
-                        for score_flow_row in score_flow_data_list_for_match:
-                            self.db_helper.insert_data_dynamically(score_flow_table, score_flow_row, self.score_flow_fields)
-                        print(f"Inserted score flow data for match {match_id}.")
-                    except mysql_error as err:
-                        self.error_logger.error(f"Error inserting score flow data for match {match_id}: {err.msg}")
-                else:
-                    print(f"No score flow data to insert for match {match_id}.")
-
-            # Commit the transaction after successful batch insertion
-            self.connection.commit()
-            print(f"Transaction committed successfully for fixtureId: {fixture_id}")
+            # The same rows that go into MySQL, for the sinks
+            records = FixtureRecords(
+                sport_category, fixture_year, fixture_id,
+                {'sport_info': [sport_info_data], 'squad_info': squad_info_list,
+                 'player_info': player_info_list, 'fixture': fixture_data_list},
+                {'match': match_data_dict, 'period': period_data_dict, 'score_flow': score_flow_data_dict})
 
         except mysql_error as err:
-            # Log the error and rollback the transaction
-            self.error_logger.error(f"MySQL error during transaction for fixtureId {fixture_id}: {err.msg}")
-            self.connection.rollback()
+            # Log the error, nothing has been written for this fixture yet
+            self.error_logger.error(f"MySQL error while collecting fixtureId {fixture_id}: {err.msg}")
             self.add_broken_fixture(fixture_id)
             return  # Exit the method
 
         except Exception as e:
-            # Log any other exceptions and rollback the transaction
-            self.error_logger.error(f"Unexpected error during transaction for fixtureId {fixture_id}: {e}")
+            # Log any other exceptions, nothing has been written for this fixture yet
+            self.error_logger.error(f"Unexpected error while collecting fixtureId {fixture_id}: {e}")
             self.error_logger.error(f"Traceback: {traceback.format_exc()}")
-            self.connection.rollback()
             self.add_broken_fixture(fixture_id)
             return  # Exit the method
 
+        # Without the database the sinks get the fixture straight away. Otherwise it is written to MySQL first,
+        # and held back until its group commit so the sinks never get ahead of the database.
+        if not self.write_database:
+            self.publish_to_sinks(records)
+        elif not self.load_fixture_records(records) and records in self.uncommitted_records:
+            self.uncommitted_records.remove(records)
+
         # At the end, write the broken fixtures list to the JSON file
         with open(self.broken_fixtures_file, 'w') as f:
             json.dump(self.broken_fixtures, f)
@@ -0,0 +1,278 @@
+import os
+import re
+import json
+import queue
+import logging
+import threading
+import numpy as np
+import pandas as pd
+import Utils.CsvHelper as cs
+from Utils.SanitiseFilename import sanitize_filename
+from Utils.ColumnarHelper import ColumnarWriter
+
+"""
+Output sinks for the Scraper, so one pass of fetching and transforming feeds every output format.
+
+The Scraper collects the normalised rows of a fixture once (the same rows it upserts into MySQL) and hands them to
+every sink as a FixtureRecords bundle once the fixture's group commit has gone through (straight away with
+--no-database). Each sink runs on its own thread with its own bounded queue, so writing a CSV, Parquet or NDJSON
+file overlaps with the API calls for the next fixture, and a slow sink only holds up the scrape once its queue is full.
+
+Sinks:
+- CsvSink: one consolidated CSV per sport, season and table (see ConsolidatedCsvWriter), optionally compressed.
+- ParquetSink: season partitioned Parquet or Feather datasets (see ColumnarWriter).
+- NdjsonSink: one newline delimited JSON file per sport, season and table.
+- SpoolSink: append-only write-ahead segments of whole fixtures, loaded into MySQL later by
+  DatabaseUtils/SpoolLoader.py, so scraping doesn't wait on (or fail with) the database.
+"""
+
+SINK_QUEUE_SIZE = 8  # Fixtures waiting per sink before the scraper blocks
+MATCH_TABLES = ('match', 'period', 'score_flow')  # Tables whose rows are kept per match
+FIXTURE_TABLES = ('sport_info', 'squad_info', 'player_info', 'fixture')  # Tables whose rows are kept per fixture
+SPOOL_DIR = 'Spool'
+SEGMENT_BYTES = 64 * 1024 * 1024  # Size a spool segment grows to before the next one is started
+SEGMENT_PATTERN = re.compile(r'^segment-(\d{6})\.ndjson$')
+
+
+class FixtureRecords:
+    """
+    The normalised rows of one fixture, as collected by the Scraper.
+    """
+
+    def __init__(self, sport_category, season, fixture_id, fixture_tables, match_tables):
+        """
+        Parameters:
+        sport_category (str): The sport category, e.g. 'AFL Mens'.
+        season (str): The fixture year.
+        fixture_id (int): The ID of the fixture.
+        fixture_tables (dict): Table name ('sport_info', 'squad_info', 'player_info', 'fixture') to a list of row dicts.
+        match_tables (dict): Table name ('match', 'period', 'score_flow') to a dict of matchId to a list of row dicts.
+        """
+        self.sport_category = sport_category
+        self.season = season
+        self.fixture_id = fixture_id
+        self.fixture_tables = fixture_tables
+        self.match_tables = match_tables
+
+    def to_dict(self):
+        """Return the fixture as a JSON serialisable dict, the line format of the spool segments."""
+        return {
+            'sport_category': self.sport_category, 'season': self.season, 'fixture_id': self.fixture_id,
+            'fixture_tables': self.fixture_tables,
+            'match_tables': {table: {str(match_id): rows for match_id, rows in rows_by_match.items()}
+                             for table, rows_by_match in self.match_tables.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a fixture from a spool segment line."""
+        return cls(data['sport_category'], data['season'], data['fixture_id'],
+                   data['fixture_tables'], data['match_tables'])
+
+    def blocks(self):
+        """
+        Yield (table, key, DataFrame) for every non-empty block of rows, one block per match for the match tables
+        and one block per fixture for the others. The key is the matchId or the fixtureId.
+        """
+        for table, rows in self.fixture_tables.items():
+            if rows:
+                yield table, str(self.fixture_id), pd.DataFrame(rows)
+        for table, rows_by_match in self.match_tables.items():
+            for match_id, rows in rows_by_match.items():
+                if rows:
+                    yield table, str(match_id), pd.DataFrame(rows)
+
+
+class RecordSink:
+    """
+    Base class of the output sinks. A sink writes the fixtures it is given on its own thread.
+    Subclasses implement write() for one fixture, and finish() to flush whatever they still buffer.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.queue = queue.Queue(maxsize=SINK_QUEUE_SIZE)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name=f"{name} sink", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Write fixtures from the queue until close() sends None, then finish."""
+        while True:
+            records = self.queue.get()
+            if records is None:
+                break
+            if self.error is not None:
+                continue  # Keep draining so the scraper never blocks on a failed sink
+            try:
+                self.write(records)
+            except Exception as e:
+                self.error = e
+                logging.error(f"{self.name} sink failed on fixture {records.fixture_id}: {e}")
+                print(f"{self.name} sink failed on fixture {records.fixture_id}: {e}")
+
+        if self.error is None:
+            try:
+                self.finish()
+            except Exception as e:
+                self.error = e
+                logging.error(f"{self.name} sink failed to finish: {e}")
+
+    def submit(self, records):
+        """Queue a fixture for writing, blocking while the sink's queue is full."""
+        self.queue.put(records)
+
+    def close(self):
+        """
+        Wait for the queued fixtures to be written and the sink to finish.
+
+        Returns:
+        Exception: The error the sink stopped on, or None.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        return self.error
+
+    def write(self, records):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+class CsvSink(RecordSink):
+    """
+    Appends every table to one consolidated CSV per sport, season and table under Data/Consolidated.
+    """
+
+    def __init__(self, compression=None, root=cs.CONSOLIDATED_ROOT):
+        self.writer = cs.ConsolidatedCsvWriter(root, compression)
+        super().__init__('CSV')
+
+    def write(self, records):
+        for table, key, df in records.blocks():
+            self.writer.add(records.sport_category, table, records.season, df, key=key)
+
+    def finish(self):
+        self.writer.flush()
+
+
+class ParquetSink(RecordSink):
+    """
+    Writes every table as a season partitioned Parquet (or Feather) dataset under Data/Columnar.
+    """
+
+    def __init__(self, output_format='parquet'):
+        self.writer = ColumnarWriter(output_format)
+        super().__init__(output_format.capitalize())
+
+    def write(self, records):
+        for table, _, df in records.blocks():
+            self.writer.add(records.sport_category, table, records.season, df)
+
+    def finish(self):
+        self.writer.flush()
+
+
+class NdjsonSink(RecordSink):
+    """
+    Appends every row as one JSON object per line to Data/NDJSON/<sport>/<season>/<table>.ndjson.
+    The files of a run replace the files of an earlier run the first time they are written.
+    """
+
+    def __init__(self, root=os.path.join("Data", "NDJSON")):
+        self.root = root
+        self.started_files = set()
+        super().__init__('NDJSON')
+
+    def write(self, records):
+        lines_by_file = {}
+        season = sanitize_filename(str(records.season)) if records.season else 'unknown'
+        for table, _, df in records.blocks():
+            file_path = os.path.join(self.root, sanitize_filename(records.sport_category), season, f"{table}.ndjson")
+            lines_by_file.setdefault(file_path, []).append(df.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+
+        # One append per file and fixture
+        for file_path, lines in lines_by_file.items():
+            mode = 'a' if file_path in self.started_files else 'w'
+            cs.ensure_directory_exists(os.path.dirname(file_path))
+            with open(file_path, mode, encoding='utf-8') as ndjson_file:
+                ndjson_file.writelines(lines)
+            self.started_files.add(file_path)
+
+
+def json_default(value):
+    """Serialise the numpy and pandas values in scraped rows, numpy scalars as their Python value and the rest as text."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def segment_path(spool_dir, segment_number):
+    """Return the path of a spool segment, e.g. Spool/segment-000001.ndjson."""
+    return os.path.join(spool_dir, f"segment-{segment_number:06d}.ndjson")
+
+
+def list_segments(spool_dir=SPOOL_DIR):
+    """Return the segment file names in the spool folder, oldest first."""
+    if not os.path.isdir(spool_dir):
+        return []
+    return sorted(name for name in os.listdir(spool_dir) if SEGMENT_PATTERN.match(name))
+
+
+class SpoolSink(RecordSink):
+    """
+    Appends every fixture as one JSON line to a write-ahead segment under Spool/.
+
+    Segments are append-only. A run starts a new segment after the newest existing one, and a segment is
+    closed for good once it reaches SEGMENT_BYTES and the next one is started. Every line is flushed and
+    fsynced before the next fixture, so a fixture that made it into a segment survives a crash.
+    The fixtures are loaded into MySQL by DatabaseUtils/SpoolLoader.py.
+    """
+
+    def __init__(self, spool_dir=SPOOL_DIR, segment_bytes=SEGMENT_BYTES):
+        self.spool_dir = spool_dir
+        self.segment_bytes = segment_bytes
+        os.makedirs(spool_dir, exist_ok=True)
+        segments = list_segments(spool_dir)
+        self.segment_number = int(SEGMENT_PATTERN.match(segments[-1]).group(1)) + 1 if segments else 1
+        self.segment_size = 0
+        super().__init__('Spool')
+
+    def write(self, records):
+        line = (json.dumps(records.to_dict(), default=json_default) + '\n').encode('utf-8')
+        if self.segment_size and self.segment_size + len(line) > self.segment_bytes:
+            self.segment_number += 1
+            self.segment_size = 0
+
+        with open(segment_path(self.spool_dir, self.segment_number), 'ab') as segment_file:
+            segment_file.write(line)
+            segment_file.flush()
+            os.fsync(segment_file.fileno())
+        self.segment_size += len(line)
+
+
+def create_sinks(names, compression=None):
+    """
+    Create sinks from their names.
+
+    Parameters:
+    names (list): Any of 'csv', 'parquet', 'feather', 'ndjson' and 'spool'.
+    compression (str): None, 'gzip' or 'zstd', used by the CSV sink.
+
+    Returns:
+    list: The started sinks.
+    """
+    sinks = []
+    for name in names:
+        if name == 'csv':
+            sinks.append(CsvSink(compression))
+        elif name in ('parquet', 'feather'):
+            sinks.append(ParquetSink(name))
+        elif name == 'ndjson':
+            sinks.append(NdjsonSink())
+        elif name == 'spool':
+            sinks.append(SpoolSink())
+        else:
+            raise ValueError(f"Unknown sink '{name}', expected 'csv', 'parquet', 'feather', 'ndjson' or 'spool'.")
+    return sinks
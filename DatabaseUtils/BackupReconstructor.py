@@ -1,53 +1,347 @@
 import os
+import re
 import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))) 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
 import logging
+from mysql.connector import Error
 from SqlConnector import connect  # Ensure proper path for SqlConnector
 from Reconstructor import drop_all_tables, create_tables  # Importing necessary functions from Reconstructor
+from CreateDatabaseBackup import open_backup_file, is_backup_file, MANIFEST_FILE  # Backups may be plain, gzip or zstd compressed
+from CreateDatabaseBackup import read_backup_segment, backup_index_path, load_backup_chain
+from CreateScriptParser import load_create_scripts
+from Utils.FileChecksum import file_checksum
 
 """
 This script is used to drop all tables from the current database, reconstruct blank tables,
 and then insert data from a backup SQL file.
 Foreign key constraints will be ignored during the process.
+
+The backup is streamed and split into statements as it is read, so it never has to fit in memory.
+INSERT statements are grouped into large transactions and replayed on a pool of worker connections,
+with foreign key and unique checks disabled, and progress and throughput are printed as it goes.
+Folder backups made with CreateDatabaseBackup.py --parallel restore one table file per worker.
+
+Single tables or sports can be restored on their own with --table and --sport. Only those tables are dropped
+and restored, using the backup's segment index (or the per-table files of a folder backup) to seek straight to them.
+
+With --chain, the full backup in Backups/backup_chain.json is restored first and then every incremental backup
+made with CreateDatabaseBackup.py --incremental is applied on top of it, oldest first.
 """
 
-# Function to execute the SQL script from the given backup file
-def execute_sql_script(connection, sql_file):
-    """Execute the SQL script from the given file while ignoring foreign key constraints."""
+RESTORE_WORKERS = 4  # Worker connections used to replay the data
+BATCH_BYTES = 8 * 1024 * 1024  # Size of the statements committed together in one transaction
+PROGRESS_INTERVAL = 5  # Seconds between progress reports
+
+STATEMENT_TOKENS = re.compile(r"\\.|'|;")
+CREATE_TABLE_PATTERN = re.compile(r'^CREATE\s+TABLE\s+(?!IF\s+NOT\s+EXISTS)', re.IGNORECASE)
+INSERT_PATTERN = re.compile(r'^(?:INSERT|REPLACE)\s', re.IGNORECASE)
+STATEMENT_TABLE_PATTERN = re.compile(r'^(?:(?:INSERT|REPLACE)\s+INTO|CREATE\s+TABLE(?:\s+IF\s+NOT\s+EXISTS)?)\s+`?(\w+)`?', re.IGNORECASE)
+
+
+# Class to track and report restore progress across the worker threads
+class RestoreProgress:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.last_report = self.start_time
+        self.statements = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def add(self, statements, byte_count, errors=0):
+        """Count restored statements and print a progress line every PROGRESS_INTERVAL seconds."""
+        with self.lock:
+            self.statements += statements
+            self.bytes += byte_count
+            self.errors += errors
+            now = time.monotonic()
+            if now - self.last_report >= PROGRESS_INTERVAL:
+                self.last_report = now
+                print(self.summary("Restored"))
+
+    def summary(self, prefix):
+        elapsed = max(time.monotonic() - self.start_time, 1e-6)
+        megabytes = self.bytes / (1024 * 1024)
+        return (f"{prefix} {self.statements} statements ({megabytes:.1f} MB) in {elapsed:.0f}s, "
+                f"{megabytes / elapsed:.2f} MB/s, {self.statements / elapsed:.0f} statements/s, {self.errors} errors")
+
+
+# Function to split a SQL dump into statements while streaming it
+def iter_sql_statements(file):
+    """
+    Yield one SQL statement at a time from an open dump file.
+    Semicolons inside quoted values are ignored, and comment lines between statements are skipped.
+    """
+    buffer = []
+    in_string = False
+    for line in file:
+        if not buffer and not in_string and (not line.strip() or line.lstrip().startswith('--')):
+            continue
+
+        start = 0
+        for token in STATEMENT_TOKENS.finditer(line):
+            text = token.group()
+            if text == "'":
+                in_string = not in_string  # A doubled '' toggles twice, so it stays inside the string
+            elif text == ';' and not in_string:
+                buffer.append(line[start:token.end()])
+                yield ''.join(buffer).strip()
+                buffer = []
+                start = token.end()
+
+        rest = line[start:]
+        if buffer or rest.strip():
+            buffer.append(rest)
+
+    remainder = ''.join(buffer).strip()
+    if remainder:
+        yield remainder
+
+
+# Function to set up a connection for a bulk restore
+def prepare_restore_session(connection):
+    """Disable foreign key and unique checks and autocommit on the connection's session."""
+    cursor = connection.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+    cursor.execute("SET UNIQUE_CHECKS = 0;")
+    cursor.close()
+    connection.autocommit = False
+
+
+# Function to put a connection's session back to normal after a restore
+def finish_restore_session(connection):
+    """Re-enable foreign key and unique checks on the connection's session."""
+    cursor = connection.cursor()
+    cursor.execute("SET UNIQUE_CHECKS = 1;")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+    connection.commit()
+    cursor.close()
+
+
+# Function to execute a batch of statements as one transaction
+def execute_batch(connection, statements):
+    """
+    Execute the statements in one transaction. If the transaction fails, the statements are
+    replayed one by one so a single bad statement doesn't lose the rest of the batch.
+
+    Returns:
+    int: The number of statements that failed.
+    """
+    cursor = connection.cursor()
+    try:
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+            connection.commit()
+            return 0
+        except Error as e:
+            connection.rollback()
+            logging.warning(f"Batch of {len(statements)} statements failed, replaying them one by one: {e}")
+
+        errors = 0
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+                connection.commit()
+            except Error as e:
+                connection.rollback()
+                errors += 1
+                logging.error(f"Error executing statement: {e}")
+                print(f"Error executing statement: {e}")
+        return errors
+    finally:
+        cursor.close()
+
+
+# Function to run a batch on a pooled worker connection
+def execute_pooled_batch(connection_pool, statements, byte_count, progress):
+    """Take a worker connection from the pool, execute the batch on it and report the progress."""
+    connection = connection_pool.get()
+    try:
+        errors = execute_batch(connection, statements)
+    finally:
+        connection_pool.put(connection)
+    progress.add(len(statements), byte_count, errors)
+
+
+# Function to replay a stream of SQL statements across the worker connections
+def restore_sql_stream(connection, file, connection_pool, workers, progress, tables=None):
+    """
+    Stream a dump, run its schema statements on the main connection and hand its INSERT statements
+    to the worker connections in large batches.
+
+    Parameters:
+    tables (set): Only restore statements for these tables, or None for every statement.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    in_flight = threading.BoundedSemaphore(workers * 2)  # Keeps only a few batches in memory at a time
+    futures = []
+
+    def submit(statements, byte_count):
+        in_flight.acquire()
+        future = executor.submit(execute_pooled_batch, connection_pool, statements, byte_count, progress)
+        future.add_done_callback(lambda _: in_flight.release())
+        futures.append(future)
+
     try:
         cursor = connection.cursor()
+        batch = []
+        batch_bytes = 0
+        for statement in iter_sql_statements(file):
+            if tables is not None:
+                table_match = STATEMENT_TABLE_PATTERN.match(statement)
+                if not table_match or table_match.group(1) not in tables:
+                    continue
+
+            if INSERT_PATTERN.match(statement):
+                batch.append(statement)
+                batch_bytes += len(statement)
+                if batch_bytes >= BATCH_BYTES:
+                    submit(batch, batch_bytes)
+                    batch = []
+                    batch_bytes = 0
+                continue
+
+            # Schema statements run in order on the main connection, tables made by create_tables are kept
+            statement = CREATE_TABLE_PATTERN.sub('CREATE TABLE IF NOT EXISTS ', statement)
+            try:
+                cursor.execute(statement)
+                connection.commit()
+                progress.add(1, len(statement))
+            except Error as e:
+                logging.error(f"Error executing statement: {e}")
+                print(f"Error executing statement: {e}")
+                progress.add(0, 0, errors=1)
+        if batch:
+            submit(batch, batch_bytes)
+        cursor.close()
+    finally:
+        executor.shutdown(wait=True)
+
+    # Surface any unexpected error raised inside a worker
+    for future in futures:
+        future.result()
+
+
+# Function to replay a single SQL dump file across the worker connections
+def restore_sql_file(connection, sql_file, connection_pool, workers, progress, tables=None):
+    """
+    Restore a dump file. When only some tables are wanted and the backup has a segment index,
+    the restore seeks straight to those tables' segments instead of reading the whole file.
+    """
+    index_path = backup_index_path(sql_file)
+    if tables is None or not os.path.exists(index_path):
+        if tables is not None:
+            print(f"No segment index found for {sql_file}, scanning the whole file.")
+        with open_backup_file(sql_file) as file:
+            restore_sql_stream(connection, file, connection_pool, workers, progress, tables)
+        return
+
+    with open(index_path, 'r') as f:
+        index = json.load(f)
+
+    with open(sql_file, 'rb') as raw:
+        for table_name in sorted(tables):
+            entry = index['tables'].get(table_name)
+            if entry is None:
+                print(f"Table {table_name} is not in the backup, skipping.")
+                continue
+            print(f"Restoring {table_name} ({entry['rows']} rows)...")
+            with read_backup_segment(raw, entry['offset'], entry['length'], index['compression']) as segment:
+                restore_sql_stream(connection, segment, connection_pool, workers, progress)
 
-        # Disable foreign key checks before any operation
-        cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
-        connection.commit()
-        print("Foreign key checks disabled.")
-
-        # Read the SQL file and execute it line by line
-        with open(sql_file, 'r', encoding='utf-8') as file:
-            sql_script = ''
-            for line in file:
-                sql_script += line
-                if line.strip().endswith(';'):  # Full statement reached
-                    try:
-                        cursor.execute(sql_script)
-                        connection.commit()
-                        print(f"Executed: {sql_script[:50]}...")  # Feedback
-                    except Exception as e:
-                        logging.error(f"Error executing statement: {e}")
-                        print(f"Error executing statement: {e}")
-                    sql_script = ''  # Reset the buffer for the next statement
+
+# Function to replay one table file of a folder backup on a worker connection
+def restore_table_file(connection_pool, table_file, progress):
+    """Stream a table file and commit its statements in large batches on one pooled connection."""
+    connection = connection_pool.get()
+    try:
+        batch = []
+        batch_bytes = 0
+        with open_backup_file(table_file) as file:
+            for statement in iter_sql_statements(file):
+                batch.append(statement)
+                batch_bytes += len(statement)
+                if batch_bytes >= BATCH_BYTES:
+                    progress.add(len(batch), batch_bytes, execute_batch(connection, batch))
+                    batch = []
+                    batch_bytes = 0
+        if batch:
+            progress.add(len(batch), batch_bytes, execute_batch(connection, batch))
+    finally:
+        connection_pool.put(connection)
+
+
+# Function to replay a folder backup, one table file per worker
+def restore_backup_folder(connection, backup_dir, connection_pool, workers, progress, tables=None):
+    """Run the schema file, then restore every table file listed in the manifest (or only the given tables) in parallel."""
+    with open(os.path.join(backup_dir, MANIFEST_FILE), 'r') as f:
+        manifest = json.load(f)
+
+    # Schema first, on the main connection
+    restore_sql_file(connection, os.path.join(backup_dir, manifest['schema']), connection_pool, workers, progress, tables)
+
+    table_files = []
+    for table_name, entry in manifest['tables'].items():
+        if tables is not None and table_name not in tables:
+            continue
+        table_file = os.path.join(backup_dir, entry['file'])
+        if file_checksum(table_file) != entry['sha256']:
+            logging.error(f"Checksum mismatch for {table_file}, skipping table {table_name}.")
+            print(f"Checksum mismatch for {table_file}, skipping table {table_name}.")
+            continue
+        table_files.append(table_file)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(restore_table_file, connection_pool, table_file, progress) for table_file in table_files]
+        for future in futures:
+            future.result()
+
+
+# Function to restore a backup file or folder
+def execute_sql_script(connection, sql_file, workers=RESTORE_WORKERS, tables=None):
+    """Restore the given backup file or folder (or only the given tables) while ignoring foreign key constraints."""
+    worker_connections = []
+    progress = RestoreProgress()
+    try:
+        # Disable foreign key and unique checks before any operation
+        prepare_restore_session(connection)
+        print("Foreign key and unique checks disabled.")
+
+        # Open the worker connections, each with the same session settings
+        connection_pool = queue.Queue()
+        for _ in range(workers):
+            worker_connection = connect()
+            if worker_connection is None:
+                raise ConnectionError("Could not open a worker connection.")
+            prepare_restore_session(worker_connection)
+            worker_connections.append(worker_connection)
+            connection_pool.put(worker_connection)
+
+        if os.path.isdir(sql_file):
+            restore_backup_folder(connection, sql_file, connection_pool, workers, progress, tables)
+        else:
+            restore_sql_file(connection, sql_file, connection_pool, workers, progress, tables)
 
         # Re-enable foreign key checks after the process is complete
-        cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
-        connection.commit()
+        finish_restore_session(connection)
         print("Foreign key checks enabled.")
 
-        cursor.close()
+        print(progress.summary("Finished, restored"))
         print(f"Successfully executed: {sql_file}")
     except Exception as e:
         logging.error(f"Error executing {sql_file}: {e}")
         print(f"Error executing {sql_file}: {e}")
+    finally:
+        for worker_connection in worker_connections:
+            worker_connection.close()
 
 # Function to reconstruct the database using the backup file
 def reconstruct_database(backup_file):
@@ -77,14 +371,102 @@ def reconstruct_database(backup_file):
         logging.error("Failed to connect to the database.")
         print("Failed to connect to the database.")
 
+# Function to turn table and sport filters into a set of table names
+def resolve_tables(table_names=None, sport_names=None):
+    """
+    Resolve the --table and --sport filters into table names.
+    Sports are matched against the sport names in sql_create_queries_file_paths.json, e.g. 'AFL Mens'.
+    """
+    tables = set(table_names or [])
+    wanted_sports = {sport.lower() for sport in (sport_names or [])}
+    if wanted_sports:
+        for table in load_create_scripts():
+            if table['sport'].lower() in wanted_sports:
+                tables.add(table['table_name'])
+    return tables
+
+
+# Function to restore only some tables from a backup
+def restore_tables(backup_file, tables):
+    """Drop and restore only the given tables, leaving the rest of the database as it is."""
+    connection = connect()
+    if connection is None:
+        logging.error("Failed to connect to the database.")
+        print("Failed to connect to the database.")
+        return
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+        for table_name in sorted(tables):
+            cursor.execute(f"DROP TABLE IF EXISTS `{table_name}`;")
+            print(f"Dropped table: {table_name}")
+        cursor.close()
+
+        print(f"Restoring {len(tables)} tables from backup file: {backup_file}")
+        execute_sql_script(connection, backup_file, tables=tables)
+    except Exception as e:
+        print(f"Error during table restore: {e}")
+        logging.error(f"Error during table restore: {e}")
+    finally:
+        connection.close()
+        print("MySQL connection closed.")
+
+# Function to restore the full backup of the chain and apply every increment after it
+def restore_backup_chain(backup_folder):
+    """Reconstruct the database from the chain's full backup, then apply its incremental backups in order."""
+    chain = load_backup_chain(backup_folder)
+    if chain is None:
+        print("No backup chain found. Exiting.")
+        return
+
+    reconstruct_database(os.path.join(backup_folder, chain['base']))
+
+    connection = connect()
+    if connection is None:
+        logging.error("Failed to connect to the database.")
+        print("Failed to connect to the database.")
+        return
+    try:
+        for increment in chain['increments']:
+            print(f"Applying incremental backup {increment['file']} ({increment['since']} to {increment['until']})")
+            execute_sql_script(connection, os.path.join(backup_folder, increment['file']))
+    except Exception as e:
+        print(f"Error while applying incremental backups: {e}")
+        logging.error(f"Error while applying incremental backups: {e}")
+    finally:
+        connection.close()
+        print("MySQL connection closed.")
+
+# Function to check if a path in the Backups folder is a backup file or a folder backup
+def is_backup(backup_folder, name):
+    """
+    Check if a name in the Backups folder is a full backup file, or a folder backup with a manifest.
+    Incremental backups only hold changed rows, so they are only restored through --chain.
+    """
+    path = os.path.join(backup_folder, name)
+    if os.path.isdir(path):
+        return os.path.exists(os.path.join(path, MANIFEST_FILE))
+    return is_backup_file(name) and not name.startswith('powerdata_incremental_')
+
 # Main function to reconstruct the database from the latest backup
 def main():
+    parser = argparse.ArgumentParser(description="Restore the database from the latest backup.")
+    parser.add_argument('--table', action='append', help="Only restore this table (can be repeated).")
+    parser.add_argument('--sport', action='append', help="Only restore this sport's tables, e.g. 'AFL Mens' (can be repeated).")
+    parser.add_argument('--chain', action='store_true', help="Restore the latest full backup and apply its incremental backups.")
+    args = parser.parse_args()
+
     # Get the latest backup file from the Backups directory
     project_root = os.path.abspath(os.getcwd())
     backup_folder = os.path.join(project_root, 'Backups')
 
+    if args.chain:
+        restore_backup_chain(backup_folder)
+        return
+
     # Step 1: Check if backup exists
-    backup_files = [f for f in os.listdir(backup_folder) if f.endswith('.sql')]
+    backup_files = [f for f in os.listdir(backup_folder) if is_backup(backup_folder, f)]
     if not backup_files:
         print("No backup files found. Exiting.")
         return
@@ -95,8 +477,15 @@ def main():
 
     print(f"Using latest backup file: {latest_backup_file}")
 
-    # Step 3: Reconstruct the database using the latest backup file
-    reconstruct_database(latest_backup_file)
+    # Step 3: Restore only the filtered tables, or reconstruct the whole database
+    if args.table or args.sport:
+        tables = resolve_tables(args.table, args.sport)
+        if not tables:
+            print("No tables matched the filters. Exiting.")
+            return
+        restore_tables(latest_backup_file, tables)
+    else:
+        reconstruct_database(latest_backup_file)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,205 @@
+import sys
+import os
+import time
+import random
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from DatabaseUtils.SqlConnector import connect
+from DatabaseUtils.CreateScriptParser import load_create_scripts, build_create_table
+from DatabaseUtils.QueryIndexes import load_index_set, build_query_indexes
+
+"""
+Query benchmark for the index set in Assets/jsons/query_indexes.json.
+
+Scratch copies of a sport's fixture and match tables are filled with a synthetic multi-season dataset,
+then the queries we actually run (player by season, squad by round, match by date) are timed
+before and after the query indexes are built, and the median latency of each is printed.
+
+The scratch tables ('benchmark_fixture' and 'benchmark_match') are dropped again once the benchmark is done.
+"""
+
+BENCHMARK_SPORT = 'AFL Mens'
+BENCHMARK_PREFIX = 'benchmark'
+SEASONS = range(2014, 2024)
+ROUNDS_PER_SEASON = 24
+MATCHES_PER_ROUND = 9
+SQUADS = 18
+PLAYERS_PER_SQUAD = 40
+PLAYERS_PER_MATCH = 22
+QUERY_REPEATS = 50
+INSERT_BATCH_SIZE = 2000
+
+BENCHMARK_QUERIES = {
+    'player by season': (
+        f"SELECT * FROM {BENCHMARK_PREFIX}_match WHERE playerId = %s AND fixtureYear = %s",
+        lambda: (str(random.randrange(SQUADS * PLAYERS_PER_SQUAD)), str(random.choice(SEASONS)))
+    ),
+    'squad by round': (
+        f"""SELECT m.* FROM {BENCHMARK_PREFIX}_match m
+            JOIN {BENCHMARK_PREFIX}_fixture f ON f.uniqueFixtureId = m.uniqueFixtureId
+            WHERE m.squadId = %s AND f.fixtureId = %s AND f.roundNumber = %s""",
+        lambda: (str(random.randrange(SQUADS)), str(random.choice(SEASONS)), random.randrange(1, ROUNDS_PER_SEASON + 1))
+    ),
+    'match by date': (
+        f"SELECT * FROM {BENCHMARK_PREFIX}_fixture WHERE utcStartTime BETWEEN %s AND %s",
+        lambda: (lambda season: (f"{season}-05-01", f"{season}-05-08"))(random.choice(SEASONS))
+    ),
+}
+
+
+# Function to fill a column with a synthetic value
+def synthetic_value(definition, column, i):
+    """Return a value for a column that isn't part of the benchmark's access patterns."""
+    if definition.upper().startswith('INT'):
+        return i % 31
+    return f"{column}-{i % 50}"[:45]
+
+
+# Function to create the scratch tables used by the benchmark
+def create_benchmark_tables(connection):
+    """
+    Create scratch copies of the sport's fixture and match tables, with their primary keys but without foreign keys.
+
+    Returns:
+    dict: Category ('fixtures' or 'match_details') to the parsed create script of the copied table.
+    """
+    tables = {
+        table['category']: table for table in load_create_scripts()
+        if table['sport'] == BENCHMARK_SPORT and table['category'] in ('fixtures', 'match_details')
+    }
+    cursor = connection.cursor()
+    for category, table in tables.items():
+        name = f"{BENCHMARK_PREFIX}_{'fixture' if category == 'fixtures' else 'match'}"
+        columns = [(column, definition) for column, definition in table['columns'] if column != 'lastModified']
+        cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        cursor.execute(build_create_table(name, columns, table['primary_key']))
+        table['benchmark_name'] = name
+        table['benchmark_columns'] = columns
+    connection.commit()
+    cursor.close()
+    return tables
+
+
+# Function to insert rows in batches
+def insert_rows(connection, table_name, columns, rows):
+    """Insert the rows with batched executemany."""
+    cursor = connection.cursor()
+    column_list = ', '.join(f"`{column}`" for column, _ in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    query = f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        cursor.executemany(query, rows[i:i + INSERT_BATCH_SIZE])
+    connection.commit()
+    cursor.close()
+
+
+# Function to generate and load the synthetic multi-season dataset
+def load_synthetic_data(connection, tables):
+    """Fill the scratch tables with every season, round, match and player of the synthetic competition."""
+    fixture_table = tables['fixtures']
+    match_table = tables['match_details']
+    fixture_rows = []
+    match_rows = []
+
+    for season in SEASONS:
+        for round_number in range(1, ROUNDS_PER_SEASON + 1):
+            for match_number in range(MATCHES_PER_ROUND):
+                match_id = f"{season}{round_number:02d}{match_number}"
+                unique_fixture_id = f"{season}-{match_id}"
+                home, away = random.sample(range(SQUADS), 2)
+                start_time = f"{season}-{3 + round_number // 4:02d}-{1 + (round_number % 4) * 7 + match_number % 7:02d}"
+
+                fixture_values = {
+                    'fixtureId': str(season), 'matchId': match_id, 'roundNumber': round_number,
+                    'utcStartTime': start_time, 'localStartTime': start_time,
+                    'homeSquadId': str(home), 'awaySquadId': str(away), 'uniqueFixtureId': unique_fixture_id,
+                }
+                fixture_rows.append(tuple(
+                    fixture_values.get(column, synthetic_value(definition, column, len(fixture_rows)))
+                    for column, definition in fixture_table['benchmark_columns']))
+
+                for squad in (home, away):
+                    for player in random.sample(range(PLAYERS_PER_SQUAD), PLAYERS_PER_MATCH):
+                        player_id = str(squad * PLAYERS_PER_SQUAD + player)
+                        match_values = {
+                            'fixtureId': str(season), 'fixtureYear': str(season), 'matchId': match_id,
+                            'playerId': player_id, 'squadId': str(squad), 'uniqueFixtureId': unique_fixture_id,
+                            'uniqueMatchId': f"{match_id}-{player_id}",
+                        }
+                        match_rows.append(tuple(
+                            match_values.get(column, synthetic_value(definition, column, len(match_rows)))
+                            for column, definition in match_table['benchmark_columns']))
+
+    insert_rows(connection, fixture_table['benchmark_name'], fixture_table['benchmark_columns'], fixture_rows)
+    insert_rows(connection, match_table['benchmark_name'], match_table['benchmark_columns'], match_rows)
+    print(f"Loaded {len(fixture_rows)} fixture rows and {len(match_rows)} match rows over {len(SEASONS)} seasons.")
+
+
+# Function to time every benchmark query
+def time_queries(connection):
+    """Run every query QUERY_REPEATS times with random parameters and return the median latency in milliseconds."""
+    cursor = connection.cursor()
+    results = {}
+    for label, (query, make_params) in BENCHMARK_QUERIES.items():
+        random.seed(label)
+        timings = []
+        for _ in range(QUERY_REPEATS):
+            start = time.perf_counter()
+            cursor.execute(query, make_params())
+            cursor.fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[label] = statistics.median(timings)
+    cursor.close()
+    return results
+
+
+# Function to build the declared query indexes on the scratch tables
+def build_benchmark_indexes(connection, tables):
+    """Build the sport's declared query indexes on the scratch copies of its tables."""
+    sport_indexes = load_index_set(BENCHMARK_SPORT)
+    index_set = {
+        table['benchmark_name']: sport_indexes.get(table['table_name'], []) for table in tables.values()
+    }
+    build_query_indexes(connection, index_set)
+    cursor = connection.cursor()
+    for table in tables.values():
+        cursor.execute(f"ANALYZE TABLE {table['benchmark_name']}")
+        cursor.fetchall()
+    cursor.close()
+
+
+# Function to run the benchmark and print the results
+def run_benchmark():
+    """Time the queries without and with the query indexes and print the before and after latencies."""
+    connection = connect()
+    if connection is None:
+        print("Connection to the database failed. Benchmark cannot be run.")
+        return
+
+    tables = {}
+    try:
+        random.seed(0)
+        tables = create_benchmark_tables(connection)
+        load_synthetic_data(connection, tables)
+
+        before = time_queries(connection)
+        build_benchmark_indexes(connection, tables)
+        after = time_queries(connection)
+
+        print(f"{'query':<20} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>9}")
+        for label in BENCHMARK_QUERIES:
+            print(f"{label:<20} {before[label]:12.2f} {after[label]:12.2f} {before[label] / after[label]:8.1f}x")
+    finally:
+        cursor = connection.cursor()
+        for table in tables.values():
+            cursor.execute(f"DROP TABLE IF EXISTS {table['benchmark_name']}")
+        connection.commit()
+        cursor.close()
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == "__main__":
+    run_benchmark()
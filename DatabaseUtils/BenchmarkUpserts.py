@@ -0,0 +1,125 @@
+import sys
+import os
+import time
+import random
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from DatabaseUtils.SqlConnector import connect
+from DatabaseUtils.DatabaseHelper import DatabaseHelper
+
+"""
+Microbenchmark for the upsert paths in DatabaseHelper.
+It compares the plain text protocol against reused server-side prepared statements,
+for both single-row inserts and batched inserts, on a scratch table shaped like a sport match table.
+
+The scratch table 'benchmark_upsert' is dropped again once the benchmark is done.
+"""
+
+BENCHMARK_TABLE = 'benchmark_upsert'
+STAT_COLUMNS = [f"stat{i}" for i in range(60)]
+ROW_COUNT = 5000
+BATCH_SIZE = 50
+
+
+# Function to create the scratch table used by the benchmark
+def create_benchmark_table(connection):
+    """Create a scratch table with a primary key, a few string columns and many INT stat columns."""
+    cursor = connection.cursor()
+    stat_columns = ',\n'.join(f"{column} INT DEFAULT NULL" for column in STAT_COLUMNS)
+    cursor.execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {BENCHMARK_TABLE} (
+            uniqueMatchId VARCHAR(255) NOT NULL,
+            playerId VARCHAR(50) NOT NULL,
+            squadName VARCHAR(255) DEFAULT NULL,
+            {stat_columns},
+            PRIMARY KEY (uniqueMatchId)
+        )
+    """)
+    connection.commit()
+    cursor.close()
+
+
+# Function to generate synthetic rows for the benchmark
+def generate_rows(prefix):
+    """Generate ROW_COUNT synthetic match rows with unique keys."""
+    rows = []
+    for i in range(ROW_COUNT):
+        row = {
+            'uniqueMatchId': f"{prefix}-{i}",
+            'playerId': str(1000000 + i),
+            'squadName': f"Squad {i % 16}",
+        }
+        row.update({column: random.randint(0, 40) for column in STAT_COLUMNS})
+        rows.append(row)
+    return rows
+
+
+# Function to time one upsert path
+def run_case(connection, logger, use_prepared, batched):
+    """Insert ROW_COUNT rows through DatabaseHelper and return the elapsed seconds."""
+    json_fields = {
+        'required_fields': ['uniqueMatchId', 'playerId'],
+        'optional_fields': ['squadName'] + STAT_COLUMNS
+    }
+    db_helper = DatabaseHelper(connection, logger, logger, commit_every=1, use_prepared=use_prepared)
+    rows = generate_rows(f"{'prepared' if use_prepared else 'text'}-{'batch' if batched else 'single'}")
+
+    # Warm up the statement cache so the column lookups are not part of the timing
+    db_helper.build_upsert_query(BENCHMARK_TABLE, json_fields)
+
+    start = time.perf_counter()
+    db_helper.begin_fixture()
+    if batched:
+        for i in range(0, len(rows), BATCH_SIZE):
+            db_helper.insert_rows_dynamically(BENCHMARK_TABLE, rows[i:i + BATCH_SIZE], json_fields)
+    else:
+        for row in rows:
+            db_helper.insert_data_dynamically(BENCHMARK_TABLE, row, json_fields)
+    db_helper.end_fixture()
+    elapsed = time.perf_counter() - start
+
+    db_helper.clear_statement_cache()
+    return elapsed
+
+
+# Function to run every benchmark case and print the results
+def run_benchmark():
+    """Run the text protocol and prepared statement cases and print rows per second for each."""
+    connection = connect()
+    if connection is None:
+        print("Connection to the database failed. Benchmark cannot be run.")
+        return
+
+    logger = logging.getLogger('benchmark_logger')
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    try:
+        connection.autocommit = False
+        create_benchmark_table(connection)
+
+        results = []
+        for batched in (False, True):
+            for use_prepared in (False, True):
+                elapsed = run_case(connection, logger, use_prepared, batched)
+                label = f"{'prepared' if use_prepared else 'text protocol'}, {'batched' if batched else 'single-row'}"
+                results.append((label, elapsed))
+                print(f"{label:<30} {elapsed:8.3f}s  {ROW_COUNT / elapsed:10.0f} rows/s")
+
+        baseline = results[0][1]
+        for label, elapsed in results[1:]:
+            print(f"{label:<30} {baseline / elapsed:6.2f}x faster than text protocol, single-row")
+    finally:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+        connection.commit()
+        cursor.close()
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,262 @@
+import math
+import hashlib
+import pandas as pd
+from datetime import datetime
+
+"""
+Keeps a persistent catalog of per-column statistics for every table the scraper writes to.
+
+The 'column_stats' table holds, for each (table, column), the number of rows written, how many of them were NULL,
+an estimate of the number of distinct values, the min/max value and when the column was last updated.
+It is updated incrementally from the rows each scrape writes, in the same transaction as the rows themselves,
+so it never needs a rescan of the sport tables. columnChecker.py --catalog reads it to list completely NULL columns.
+
+Distinct counts are estimated with a HyperLogLog sketch stored next to each column (about 3% error),
+so sketches from different scrapes can be merged. Row and NULL counts count rows as they are written,
+so a fixture that is scraped again is counted again.
+"""
+
+STATS_TABLE = 'column_stats'
+SKETCH_PRECISION = 10  # 2^10 registers per column, about 3% standard error
+SKETCH_REGISTERS = 1 << SKETCH_PRECISION
+
+CREATE_STATS_TABLE = f"""
+    CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+        tableName              VARCHAR(64)     NOT NULL,
+        columnName             VARCHAR(64)     NOT NULL,
+        rowsWritten            BIGINT          NOT NULL DEFAULT 0,
+        nullCount              BIGINT          NOT NULL DEFAULT 0,
+        distinctEstimate       BIGINT          NOT NULL DEFAULT 0,
+        distinctSketch         BLOB            DEFAULT NULL,
+        minNumeric             DOUBLE          DEFAULT NULL,
+        maxNumeric             DOUBLE          DEFAULT NULL,
+        minText                VARCHAR(255)    DEFAULT NULL,
+        maxText                VARCHAR(255)    DEFAULT NULL,
+        lastUpdated            TIMESTAMP(6)    NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+        PRIMARY KEY (tableName, columnName)
+    )
+"""
+
+# Counts are added to the stored ones, and min/max are merged with LEAST/GREATEST ignoring NULLs
+UPSERT_STATS = f"""
+    INSERT INTO {STATS_TABLE}
+        (tableName, columnName, rowsWritten, nullCount, distinctEstimate, distinctSketch,
+         minNumeric, maxNumeric, minText, maxText, lastUpdated)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        rowsWritten = rowsWritten + VALUES(rowsWritten),
+        nullCount = nullCount + VALUES(nullCount),
+        distinctEstimate = VALUES(distinctEstimate),
+        distinctSketch = VALUES(distinctSketch),
+        minNumeric = LEAST(COALESCE(minNumeric, VALUES(minNumeric)), COALESCE(VALUES(minNumeric), minNumeric)),
+        maxNumeric = GREATEST(COALESCE(maxNumeric, VALUES(maxNumeric)), COALESCE(VALUES(maxNumeric), maxNumeric)),
+        minText = LEAST(COALESCE(minText, VALUES(minText)), COALESCE(VALUES(minText), minText)),
+        maxText = GREATEST(COALESCE(maxText, VALUES(maxText)), COALESCE(VALUES(maxText), maxText)),
+        lastUpdated = VALUES(lastUpdated)
+"""
+
+
+# Class to estimate the number of distinct values in a column
+class DistinctSketch:
+    def __init__(self, registers=None):
+        """
+        HyperLogLog sketch of the values seen in a column.
+
+        Parameters:
+        registers (bytes): Registers of a stored sketch, or None for an empty sketch.
+        """
+        self.registers = bytearray(registers) if registers else bytearray(SKETCH_REGISTERS)
+
+    def add(self, value):
+        """Add a value to the sketch."""
+        hashed = int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+        index = hashed >> (64 - SKETCH_PRECISION)
+        remainder = hashed & ((1 << (64 - SKETCH_PRECISION)) - 1)
+        rank = (64 - SKETCH_PRECISION) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Merge another sketch into this one."""
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def estimate(self):
+        """Return the estimated number of distinct values."""
+        alpha = 0.7213 / (1 + 1.079 / SKETCH_REGISTERS)
+        raw = alpha * SKETCH_REGISTERS ** 2 / sum(2.0 ** -register for register in self.registers)
+        empty = self.registers.count(0)
+
+        # Linear counting is more accurate while many registers are still empty
+        if raw <= 2.5 * SKETCH_REGISTERS and empty:
+            return round(SKETCH_REGISTERS * math.log(SKETCH_REGISTERS / empty))
+        return round(raw)
+
+
+# Class to collect the statistics of one column before they are written to the catalog
+class ColumnSummary:
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self.sketch = DistinctSketch()
+        self.min_numeric = None
+        self.max_numeric = None
+        self.min_text = None
+        self.max_text = None
+
+    def add(self, value):
+        """Add one written value to the summary. NaN (a missing stat in a scraped frame) counts as NULL."""
+        self.rows += 1
+        if pd.isnull(value):
+            self.nulls += 1
+            return
+        self.sketch.add(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.min_numeric = value if self.min_numeric is None else min(self.min_numeric, value)
+            self.max_numeric = value if self.max_numeric is None else max(self.max_numeric, value)
+        else:
+            text = str(value)[:255]
+            self.min_text = text if self.min_text is None else min(self.min_text, text)
+            self.max_text = text if self.max_text is None else max(self.max_text, text)
+
+    def merge(self, other):
+        """Merge the summary of a later fixture into this one."""
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.sketch.merge(other.sketch)
+        for attribute, pick in (('min_numeric', min), ('max_numeric', max), ('min_text', min), ('max_text', max)):
+            values = [v for v in (getattr(self, attribute), getattr(other, attribute)) if v is not None]
+            setattr(self, attribute, pick(values) if values else None)
+
+
+# Class to keep the column statistics catalog up to date
+class ColumnStatsCatalog:
+    def __init__(self, connection, error_logger, table_suffix=''):
+        """
+        Collect statistics from the rows DatabaseHelper writes and merge them into the catalog table.
+        Statistics for the fixture being written are kept apart until the fixture is done, so a rolled
+        back fixture never reaches the catalog, and the rest are written just before each commit.
+
+        Parameters:
+        connection (mysql.connector.connection.MySQLConnection): MySQL connection object.
+        error_logger (logging.Logger): Logger object for error messages.
+        table_suffix (str): Suffix removed from table names, so staging tables share the catalog entries.
+        """
+        self.connection = connection
+        self.error_logger = error_logger
+        self.table_suffix = table_suffix
+        self.fixture_stats = {}
+        self.pending_stats = {}
+        self.stored_sketches = {}
+        self.loaded_tables = set()
+        self.ensure_table()
+
+    # Define a method to create the catalog table if it doesn't exist yet
+    def ensure_table(self):
+        """Create the column_stats table if it doesn't exist yet."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(CREATE_STATS_TABLE)
+        finally:
+            cursor.close()
+
+    # Define a method to record the rows written to a table
+    def observe(self, table_name, matched_fields, rows):
+        """
+        Add a batch of written rows to the statistics of the current fixture.
+
+        Parameters:
+        table_name (str): The table the rows were written to.
+        matched_fields (tuple): The columns written, in the order of the row values.
+        rows (list): The row values, as written to the table.
+        """
+        if self.table_suffix and table_name.endswith(self.table_suffix):
+            table_name = table_name[:-len(self.table_suffix)]
+        for index, column in enumerate(matched_fields):
+            summary = self.fixture_stats.setdefault((table_name, column), ColumnSummary())
+            for row in rows:
+                summary.add(row[index])
+
+    # Define a method to keep the statistics of a finished fixture
+    def end_fixture(self):
+        """Move the current fixture's statistics to the ones written on the next commit."""
+        for key, summary in self.fixture_stats.items():
+            if key in self.pending_stats:
+                self.pending_stats[key].merge(summary)
+            else:
+                self.pending_stats[key] = summary
+        self.fixture_stats = {}
+
+    # Define a method to drop the statistics of a rolled back fixture
+    def discard_fixture(self):
+        """Forget the current fixture's statistics, its rows were rolled back."""
+        self.fixture_stats = {}
+
+    # Define a method to drop every statistic that was not written yet
+    def discard_pending(self):
+        """Forget every statistic that was not written yet, the whole transaction was rolled back."""
+        self.fixture_stats = {}
+        self.pending_stats = {}
+
+    # Define a method to load the stored sketches of a table
+    def load_sketches(self, table_name):
+        """Load the stored distinct sketches of a table, so new values can be merged into them."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT columnName, distinctSketch FROM {STATS_TABLE} WHERE tableName = %s", (table_name,))
+            for column, registers in cursor.fetchall():
+                self.stored_sketches[(table_name, column)] = DistinctSketch(registers)
+        finally:
+            cursor.close()
+        self.loaded_tables.add(table_name)
+
+    # Define a method to write the pending statistics, just before the transaction is committed
+    def flush(self):
+        """Merge the pending statistics into the catalog table, inside the caller's open transaction."""
+        self.end_fixture()
+        if not self.pending_stats:
+            return
+
+        now = datetime.now()
+        rows = []
+        for (table_name, column), summary in self.pending_stats.items():
+            if table_name not in self.loaded_tables:
+                self.load_sketches(table_name)
+            sketch = self.stored_sketches.setdefault((table_name, column), DistinctSketch())
+            sketch.merge(summary.sketch)
+            rows.append((
+                table_name, column, summary.rows, summary.nulls, sketch.estimate(), bytes(sketch.registers),
+                summary.min_numeric, summary.max_numeric, summary.min_text, summary.max_text, now
+            ))
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(UPSERT_STATS, rows)
+        except Exception as e:
+            self.error_logger.error(f"Error updating {STATS_TABLE}: {e}")
+            raise
+        finally:
+            cursor.close()
+        self.pending_stats = {}
+
+
+# Function to list the completely NULL columns recorded in the catalog
+def null_columns_from_catalog(connection):
+    """
+    Read the columns that have only ever been written as NULL from the catalog, without scanning any table.
+    Columns the scraper never writes to are not in the catalog, use check_null_columns_in_all_tables for those.
+
+    Returns:
+    dict: Table name to the list of its completely NULL columns.
+    """
+    cursor = connection.cursor()
+    cursor.execute(f"""
+        SELECT tableName, columnName
+        FROM {STATS_TABLE}
+        WHERE nullCount = rowsWritten
+        ORDER BY tableName, columnName
+    """)
+    null_columns = {}
+    for table_name, column in cursor.fetchall():
+        null_columns.setdefault(table_name, []).append(column)
+    cursor.close()
+    return null_columns
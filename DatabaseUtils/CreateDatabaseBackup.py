@@ -1,7 +1,23 @@
+import io
 import os
-from datetime import datetime
-from SqlConnector import connect  
+import sys
+import gzip
+import json
+import queue
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from SqlConnector import connect
+from Utils.FileChecksum import file_checksum
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 """
@@ -10,23 +26,265 @@ This version uses Python's mysql-connector to handle the entire process without
 
 This is useful because it allows you to create a backup of the database without relying on external utilities.
 It also provides more control over the backup process and allows you to customize the backup file name and location.
+
+Rows are streamed from an unbuffered cursor with fetchmany, so memory stays flat no matter how big a table is,
+and written as multi-row INSERT statements into a gzip (or zstd, if the zstandard package is installed) file.
+
+Every table is written as its own compressed segment, and a '.index.json' file next to the backup records the
+byte offset and length of each segment, so BackupReconstructor can seek straight to the tables it needs.
+
+Run with --parallel to dump every table on its own worker connection instead. All workers read from the same
+consistent snapshot, each table goes into its own file, and a manifest.json records row counts and checksums.
+
+Run with --incremental to dump only the rows whose lastModified column changed since the last backup in the chain.
+The rows are written as REPLACE statements, and Backups/backup_chain.json records the full backup the chain starts
+from and every increment after it, so BackupReconstructor can apply them in order. Deleted rows are not tracked,
+so take a full backup after deleting data.
 """
 
-def create_backup():
+FETCH_SIZE = 1000  # Rows fetched from the server per round trip
+MAX_STATEMENT_BYTES = 1_000_000  # Upper bound on the size of one multi-row INSERT, well under max_allowed_packet
+PARALLEL_WORKERS = 4  # Worker connections used by the parallel backup
+MANIFEST_FILE = 'manifest.json'
+INDEX_SUFFIX = '.index.json'
+SCHEMA_FILE = 'schema'
+CHAIN_FILE = 'backup_chain.json'
+CHANGE_COLUMN = 'lastModified'  # Column the create scripts add to every table for change tracking
+INCREMENTAL_OVERLAP = timedelta(hours=1)  # Re-dump rows modified just before the last backup, for long transactions
+
+BACKUP_EXTENSIONS = {
+    None: '.sql',
+    'gzip': '.sql.gz',
+    'zstd': '.sql.zst'
+}
+
+
+# Function to open a backup file for reading or writing, based on its extension
+def open_backup_file(file_path, mode='rt'):
+    """Open a plain, gzip or zstd backup file as text."""
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, mode, encoding='utf-8')
+    if file_path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("The zstandard package is required to read or write .zst backups.")
+        if 'r' in mode:
+            # Each table is its own zstd frame, so the reader has to carry on across frames
+            reader = zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), read_across_frames=True)
+            return io.TextIOWrapper(reader, encoding='utf-8')
+        return zstandard.open(file_path, mode, encoding='utf-8')
+    return open(file_path, mode.replace('t', ''), encoding='utf-8')
+
+
+# Function to write one table of a backup file as its own compressed segment
+@contextmanager
+def open_backup_segment(raw, compression):
+    """
+    Open a text stream that writes a self-contained gzip member or zstd frame into the raw backup file.
+    The raw file is left open, so the next segment starts right where this one ends.
+    """
+    if compression == 'gzip':
+        stream = gzip.GzipFile(fileobj=raw, mode='wb')
+    elif compression == 'zstd':
+        stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    else:
+        stream = None
+    text = io.TextIOWrapper(stream or raw, encoding='utf-8')
     try:
+        yield text
+    finally:
+        text.flush()
+        text.detach()
+        if stream is not None:
+            stream.close()
+
+
+# Class to read a byte range of a file as if it were the whole file
+class BackupSegment(io.RawIOBase):
+    def __init__(self, raw, offset, length):
+        raw.seek(offset)
+        self.raw = raw
+        self.remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        data = self.raw.read(size)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+# Function to read one table segment of a backup file
+def read_backup_segment(raw, offset, length, compression):
+    """Seek to a table's segment in the raw backup file and return it as a text stream."""
+    segment = io.BufferedReader(BackupSegment(raw, offset, length))
+    if compression == 'gzip':
+        segment = gzip.GzipFile(fileobj=segment, mode='rb')
+    elif compression == 'zstd':
+        segment = zstandard.ZstdDecompressor().stream_reader(segment)
+    return io.TextIOWrapper(segment, encoding='utf-8')
+
+
+# Function to find the index file of a backup file
+def backup_index_path(backup_file):
+    """Return the path of the segment index written next to a backup file."""
+    return f"{backup_file}{INDEX_SUFFIX}"
+
+
+# Function to check if a file name is a backup file
+def is_backup_file(file_name):
+    """Check if a file name has one of the backup extensions."""
+    return file_name.endswith(tuple(BACKUP_EXTENSIONS.values()))
+
+
+# Function to format a Python value as a SQL literal
+def format_sql_value(value):
+    """Format a value for an INSERT statement, escaping quotes, backslashes and newlines in strings."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return f"0x{value.hex()}" if value else "''"
+    text = str(value)
+    text = text.replace('\\', '\\\\').replace("'", "''").replace('\n', '\\n').replace('\r', '\\r')
+    return f"'{text}'"
+
+
+# Function to stream the rows of a table into multi-row INSERT statements
+def dump_table_data(connection, table_name, f, fetch_size=FETCH_SIZE, max_statement_bytes=MAX_STATEMENT_BYTES,
+                    verb='INSERT', where=None, params=None):
+    """
+    Stream every row of a table into the backup file as multi-row INSERT statements.
+
+    Parameters:
+    connection (mysql.connector.connection.MySQLConnection): MySQL connection object.
+    table_name (str): The table to dump.
+    f (file): The open backup file.
+    fetch_size (int): Number of rows fetched per round trip.
+    max_statement_bytes (int): Maximum size of one INSERT statement.
+    verb (str): 'INSERT', or 'REPLACE' for incremental backups that overwrite existing rows.
+    where (str): Optional WHERE clause limiting the rows that are dumped.
+    params (tuple): Parameters for the WHERE clause.
+
+    Returns:
+    int: The number of rows written.
+    """
+    # Unbuffered cursor, rows stay on the server until they are fetched
+    cursor = connection.cursor(buffered=False)
+    query = f"SELECT * FROM `{table_name}`"
+    if where:
+        query += f" WHERE {where}"
+    cursor.execute(query, params)
+    column_names = ', '.join(f"`{column}`" for column in cursor.column_names)
+    insert_prefix = f"{verb} INTO `{table_name}` ({column_names}) VALUES\n"
+
+    row_count = 0
+    statement_rows = []
+    statement_bytes = len(insert_prefix)
+    try:
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                values = f"({', '.join(format_sql_value(value) for value in row)})"
+
+                # Flush the current statement before it grows past the size limit
+                if statement_rows and statement_bytes + len(values) + 2 > max_statement_bytes:
+                    f.write(insert_prefix + ',\n'.join(statement_rows) + ';\n')
+                    statement_rows = []
+                    statement_bytes = len(insert_prefix)
+
+                if row_count == 0:
+                    f.write(f"-- Dumping data for table `{table_name}`\n")
+                statement_rows.append(values)
+                statement_bytes += len(values) + 2
+                row_count += 1
+
+        if statement_rows:
+            f.write(insert_prefix + ',\n'.join(statement_rows) + ';\n')
+    finally:
+        cursor.close()
+    return row_count
+
+
+# Function to find the backup chain manifest
+def backup_chain_path(backup_folder):
+    """Return the path of the chain manifest in the backup folder."""
+    return os.path.join(backup_folder, CHAIN_FILE)
+
+
+# Function to load the backup chain manifest
+def load_backup_chain(backup_folder):
+    """Load the chain manifest, or return None if no full backup has been taken yet."""
+    chain_path = backup_chain_path(backup_folder)
+    if not os.path.exists(chain_path):
+        return None
+    with open(chain_path, 'r') as f:
+        return json.load(f)
+
+
+# Function to save the backup chain manifest
+def save_backup_chain(backup_folder, chain):
+    """Write the chain manifest through a temporary file, so a crash can't leave it half written."""
+    chain_path = backup_chain_path(backup_folder)
+    with open(f"{chain_path}.tmp", 'w') as f:
+        json.dump(chain, f, indent=2)
+    os.replace(f"{chain_path}.tmp", chain_path)
+
+
+# Function to read the time the current snapshot was taken at
+def snapshot_time(cursor):
+    """Return the server time of the open snapshot, used as the starting point of the next increment."""
+    cursor.execute("SELECT NOW(6)")
+    return cursor.fetchone()[0]
+
+
+# Function to check if a table has the change tracking column
+def has_change_column(cursor, table_name):
+    """Check if a table has the lastModified column incremental backups filter on."""
+    cursor.execute(f"SHOW COLUMNS FROM `{table_name}` LIKE %s", (CHANGE_COLUMN,))
+    return cursor.fetchone() is not None
+
+
+def create_backup(compression='gzip'):
+    """
+    Create a backup of every table in the database.
+
+    Parameters:
+    compression (str): 'gzip', 'zstd' or None for a plain .sql file.
+
+    Returns:
+    str: The path of the backup file, or None if the backup failed.
+    """
+    connection = None
+    cursor = None
+    try:
+        if compression == 'zstd' and zstandard is None:
+            print("The zstandard package is not installed, falling back to gzip.")
+            compression = 'gzip'
+
         # Connect to the database
         connection = connect()
         if connection is None:
             print("Connection to the database failed. Backup cannot be created.")
-            return
+            return None
 
-        cursor = connection.cursor()
+        # Buffered so the schema queries never leave unread results behind while table data is streamed
+        cursor = connection.cursor(buffered=True)
 
         project_root = os.path.abspath(os.getcwd())
-        
+
         # Define the path for the 'Backups' folder within the root project folder
         backup_folder = os.path.join(project_root, 'Backups')
-        
+
         # Create 'Backups' folder at the root level if it doesn't exist
         if not os.path.exists(backup_folder):
             os.makedirs(backup_folder)
@@ -34,41 +292,53 @@ def create_backup():
         # Define the backup file name with a timestamp (DD-MM-YYYY - time AM/PM.sql)
         # Replace the ':' with a '-' to make it a valid file name
         timestamp = datetime.now().strftime('%d-%m-%Y - %I-%M%p')
-        backup_file = os.path.join(backup_folder, f'powerdata_backup_{timestamp}.sql')
+        backup_file = os.path.join(backup_folder, f'powerdata_backup_{timestamp}{BACKUP_EXTENSIONS[compression]}')
+
+        index = {'compression': compression, 'tables': {}}
 
-        # Open the backup file with utf-8 encoding to handle all characters
-        with open(backup_file, 'w', encoding='utf-8') as f:
+        # Open the raw backup file, every table is written into it as its own utf-8 segment
+        with open(backup_file, 'wb') as raw:
             # Write SQL statements to the backup file
 
+            # Read every table from one consistent snapshot, so a running scrape can't leave the backup half updated
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+            index['snapshot_time'] = snapshot_time(cursor).isoformat()
+
             # Backup schema (create table statements)
             cursor.execute("SHOW TABLES")
             tables = cursor.fetchall()
 
             for (table_name,) in tables:
-                # Write CREATE TABLE statement for each table
-                cursor.execute(f"SHOW CREATE TABLE `{table_name}`")
-                create_table_stmt = cursor.fetchone()[1]
-                f.write(f"\n-- Table structure for `{table_name}`\n")
-                f.write(f"{create_table_stmt};\n\n")
+                offset = raw.tell()
+                with open_backup_segment(raw, compression) as f:
+                    # Write CREATE TABLE statement for each table
+                    cursor.execute(f"SHOW CREATE TABLE `{table_name}`")
+                    create_table_stmt = cursor.fetchone()[1]
+                    f.write(f"\n-- Table structure for `{table_name}`\n")
+                    f.write(f"{create_table_stmt};\n\n")
 
-                # Backup table data (insert statements)
-                cursor.execute(f"SELECT * FROM `{table_name}`")
-                rows = cursor.fetchall()
-                if rows:
-                    columns_query = f"SHOW COLUMNS FROM `{table_name}`"
-                    cursor.execute(columns_query)
-                    column_names = [col[0] for col in cursor.fetchall()]
+                    # Backup table data (multi-row insert statements)
+                    row_count = dump_table_data(connection, table_name, f)
+                index['tables'][table_name] = {'offset': offset, 'length': raw.tell() - offset, 'rows': row_count}
+                print(f"Dumped {row_count} rows from {table_name}")
 
-                    f.write(f"-- Dumping data for table `{table_name}`\n")
-                    for row in rows:
-                        values = ', '.join(f"'{{}}'".format(str(value).replace("'", "''")) if value is not None else 'NULL' for value in row)
-                        insert_stmt = f"INSERT INTO `{table_name}` ({', '.join(column_names)}) VALUES ({values});"
-                        f.write(f"{insert_stmt}\n")
+        # Write the segment index next to the backup
+        with open(backup_index_path(backup_file), 'w') as f:
+            json.dump(index, f, indent=2)
+
+        # A full backup starts a new chain for the incremental backups
+        save_backup_chain(backup_folder, {
+            'base': os.path.basename(backup_file),
+            'base_time': index['snapshot_time'],
+            'increments': []
+        })
 
-            print(f"Backup created successfully at {backup_file}")
+        print(f"Backup created successfully at {backup_file}")
+        return backup_file
 
     except Exception as e:
         print(f"Error occurred while creating backup: {e}")
+        return None
     finally:
         # Ensure the connection is properly closed
         if connection and connection.is_connected():
@@ -76,5 +346,232 @@ def create_backup():
             connection.close()
             print("MySQL connection closed.")
 
+# Function to open worker connections that all share one consistent snapshot
+def open_snapshot_connections(lock_connection, worker_count):
+    """
+    Open worker connections that all see the same snapshot of the database.
+    Writes are blocked with FLUSH TABLES WITH READ LOCK only while the workers start their snapshots,
+    which takes milliseconds, then the lock is released and the scrape can carry on.
+    """
+    lock_cursor = lock_connection.cursor()
+    connections = []
+    try:
+        lock_cursor.execute("FLUSH TABLES WITH READ LOCK")
+        for _ in range(worker_count):
+            connection = connect()
+            if connection is None:
+                raise ConnectionError("Could not open a worker connection.")
+            cursor = connection.cursor()
+            cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+            cursor.close()
+            connections.append(connection)
+    except Exception:
+        for connection in connections:
+            connection.close()
+        raise
+    finally:
+        lock_cursor.execute("UNLOCK TABLES")
+        lock_cursor.close()
+    return connections
+
+
+# Function to dump one table into its own chunk file
+def dump_table_to_file(connection_pool, table_name, backup_dir, extension):
+    """Dump a table on a pooled worker connection and return its manifest entry."""
+    connection = connection_pool.get()
+    try:
+        file_name = f"{table_name}{extension}"
+        file_path = os.path.join(backup_dir, file_name)
+        with open_backup_file(file_path, 'wt') as f:
+            row_count = dump_table_data(connection, table_name, f)
+    finally:
+        connection_pool.put(connection)
+
+    print(f"Dumped {row_count} rows from {table_name}")
+    return {
+        'file': file_name,
+        'rows': row_count,
+        'bytes': os.path.getsize(file_path),
+        'sha256': file_checksum(file_path)
+    }
+
+
+def create_parallel_backup(compression='gzip', workers=PARALLEL_WORKERS):
+    """
+    Create a backup with every table dumped in parallel from one consistent snapshot.
+
+    The backup is a folder holding a schema file, one file per table and a manifest.json
+    with the row count and checksum of every table file.
+
+    Parameters:
+    compression (str): 'gzip', 'zstd' or None for plain .sql files.
+    workers (int): Number of worker connections.
+
+    Returns:
+    str: The path of the backup folder, or None if the backup failed.
+    """
+    if compression == 'zstd' and zstandard is None:
+        print("The zstandard package is not installed, falling back to gzip.")
+        compression = 'gzip'
+    extension = BACKUP_EXTENSIONS[compression]
+
+    connection = connect()
+    if connection is None:
+        print("Connection to the database failed. Backup cannot be created.")
+        return None
+
+    worker_connections = []
+    try:
+        timestamp = datetime.now().strftime('%d-%m-%Y - %I-%M%p')
+        backup_dir = os.path.join(os.path.abspath(os.getcwd()), 'Backups', f'powerdata_backup_{timestamp}')
+        os.makedirs(backup_dir, exist_ok=True)
+
+        # Snapshot first, so the schema and the data come from the same point in time
+        worker_connections = open_snapshot_connections(connection, workers)
+
+        # Backup schema (create table statements) on the first worker's snapshot
+        cursor = worker_connections[0].cursor(buffered=True)
+        base_time = snapshot_time(cursor).isoformat()
+        cursor.execute("SHOW TABLES")
+        tables = [table_name for (table_name,) in cursor.fetchall()]
+        with open_backup_file(os.path.join(backup_dir, f"{SCHEMA_FILE}{extension}"), 'wt') as f:
+            for table_name in tables:
+                cursor.execute(f"SHOW CREATE TABLE `{table_name}`")
+                f.write(f"\n-- Table structure for `{table_name}`\n")
+                f.write(f"{cursor.fetchone()[1]};\n\n")
+        cursor.close()
+
+        # Hand the worker connections out through a pool, one table at a time
+        connection_pool = queue.Queue()
+        for worker_connection in worker_connections:
+            connection_pool.put(worker_connection)
+
+        with ThreadPoolExecutor(max_workers=len(worker_connections)) as executor:
+            futures = {
+                table_name: executor.submit(dump_table_to_file, connection_pool, table_name, backup_dir, extension)
+                for table_name in tables
+            }
+            manifest_tables = {table_name: future.result() for table_name, future in futures.items()}
+
+        manifest = {
+            'created': datetime.now().isoformat(),
+            'consistent_snapshot': True,
+            'snapshot_time': base_time,
+            'compression': compression,
+            'schema': f"{SCHEMA_FILE}{extension}",
+            'tables': manifest_tables
+        }
+        with open(os.path.join(backup_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # A full backup starts a new chain for the incremental backups
+        save_backup_chain(os.path.dirname(backup_dir), {
+            'base': os.path.basename(backup_dir),
+            'base_time': base_time,
+            'increments': []
+        })
+
+        print(f"Backup created successfully at {backup_dir}")
+        return backup_dir
+
+    except Exception as e:
+        print(f"Error occurred while creating backup: {e}")
+        return None
+    finally:
+        for worker_connection in worker_connections:
+            worker_connection.close()
+        connection.close()
+        print("MySQL connection closed.")
+
+
+def create_incremental_backup(compression='gzip'):
+    """
+    Create a backup of only the rows changed since the last backup in the chain.
+
+    Rows with a lastModified time after the previous backup (minus INCREMENTAL_OVERLAP) are written as REPLACE
+    statements, so applying an increment on top of the restored chain overwrites the old versions of the rows.
+    Tables without the lastModified column are dumped in full. The increment is appended to backup_chain.json.
+
+    Parameters:
+    compression (str): 'gzip', 'zstd' or None for a plain .sql file.
+
+    Returns:
+    str: The path of the incremental backup file, or None if the backup failed.
+    """
+    if compression == 'zstd' and zstandard is None:
+        print("The zstandard package is not installed, falling back to gzip.")
+        compression = 'gzip'
+
+    backup_folder = os.path.join(os.path.abspath(os.getcwd()), 'Backups')
+    chain = load_backup_chain(backup_folder)
+    if chain is None:
+        print("No full backup found to build on, creating a full backup instead.")
+        return create_backup(compression)
+
+    # Continue from the end of the chain, or from the base if this is the first increment
+    since = datetime.fromisoformat(chain['increments'][-1]['until'] if chain['increments'] else chain['base_time'])
+
+    connection = connect()
+    if connection is None:
+        print("Connection to the database failed. Backup cannot be created.")
+        return None
+
+    cursor = connection.cursor(buffered=True)
+    try:
+        timestamp = datetime.now().strftime('%d-%m-%Y - %I-%M%p')
+        backup_file = os.path.join(
+            backup_folder, f'powerdata_incremental_{timestamp}{BACKUP_EXTENSIONS[compression]}')
+
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+        until = snapshot_time(cursor)
+        index = {'compression': compression, 'since': since.isoformat(), 'snapshot_time': until.isoformat(),
+                 'tables': {}}
+
+        cursor.execute("SHOW TABLES")
+        tables = [table_name for (table_name,) in cursor.fetchall()]
+
+        with open(backup_file, 'wb') as raw:
+            for table_name in tables:
+                if has_change_column(cursor, table_name):
+                    where = f"`{CHANGE_COLUMN}` > %s"
+                    params = (since - INCREMENTAL_OVERLAP,)
+                else:
+                    where, params = None, None
+                    print(f"{table_name} has no {CHANGE_COLUMN} column, dumping the whole table.")
+
+                offset = raw.tell()
+                with open_backup_segment(raw, compression) as f:
+                    row_count = dump_table_data(connection, table_name, f, verb='REPLACE', where=where, params=params)
+                index['tables'][table_name] = {'offset': offset, 'length': raw.tell() - offset, 'rows': row_count}
+                print(f"Dumped {row_count} changed rows from {table_name}")
+
+        with open(backup_index_path(backup_file), 'w') as f:
+            json.dump(index, f, indent=2)
+
+        chain['increments'].append({
+            'file': os.path.basename(backup_file),
+            'since': since.isoformat(),
+            'until': until.isoformat()
+        })
+        save_backup_chain(backup_folder, chain)
+
+        print(f"Incremental backup created successfully at {backup_file}")
+        return backup_file
+
+    except Exception as e:
+        print(f"Error occurred while creating incremental backup: {e}")
+        return None
+    finally:
+        cursor.close()
+        connection.close()
+        print("MySQL connection closed.")
+
+
 if __name__ == "__main__":
-    create_backup()
+    if '--incremental' in sys.argv:
+        create_incremental_backup()
+    elif '--parallel' in sys.argv:
+        create_parallel_backup()
+    else:
+        create_backup()
@@ -0,0 +1,141 @@
+import os
+import re
+import json
+
+"""
+Parses the CREATE TABLE scripts listed in Assets/jsons/sql_create_queries_file_paths.json.
+
+Each script is split into its columns, primary key, foreign keys, secondary indexes and table options,
+so the rest of DatabaseUtils can rebuild, compare or alter tables without hand-writing SQL for every sport.
+"""
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CREATE_QUERIES_JSON = os.path.join(PROJECT_ROOT, 'Assets', 'jsons', 'sql_create_queries_file_paths.json')
+
+CREATE_TABLE_PATTERN = re.compile(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(', re.IGNORECASE)
+REFERENCES_PATTERN = re.compile(r'(REFERENCES\s+)`?(\w+)`?', re.IGNORECASE)
+INDEX_PATTERN = re.compile(r'^(KEY|INDEX|UNIQUE|FULLTEXT|SPATIAL)\b', re.IGNORECASE)
+
+
+# Function to remove -- and /* */ comments from a SQL script
+def strip_sql_comments(sql):
+    """Remove line and block comments so commas and brackets inside comments don't break parsing."""
+    sql = re.sub(r'/\*.*?\*/', '', sql, flags=re.DOTALL)
+    return re.sub(r'--[^\n]*', '', sql)
+
+
+# Function to split a string on commas that are not inside brackets
+def split_top_level(body):
+    """Split the body of a CREATE TABLE statement into its comma separated definitions."""
+    parts = []
+    depth = 0
+    current = ''
+    for char in body:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+# Function to parse a CREATE TABLE statement
+def parse_create_table(sql):
+    """
+    Parse a CREATE TABLE statement.
+
+    Parameters:
+    sql (str): The CREATE TABLE statement.
+
+    Returns:
+    dict: table_name, columns (list of (name, definition)), primary_key, foreign_keys, indexes and table_options.
+    """
+    sql = strip_sql_comments(sql)
+    match = CREATE_TABLE_PATTERN.search(sql)
+    if not match:
+        raise ValueError("No CREATE TABLE statement found.")
+
+    # Find the bracket that closes the column list
+    start = match.end()
+    depth = 1
+    end = start
+    while depth and end < len(sql):
+        if sql[end] == '(':
+            depth += 1
+        elif sql[end] == ')':
+            depth -= 1
+        end += 1
+
+    table = {
+        'table_name': match.group(1),
+        'columns': [],
+        'primary_key': None,
+        'foreign_keys': [],
+        'indexes': [],
+        'table_options': sql[end:].strip().rstrip(';').strip()
+    }
+
+    for definition in split_top_level(sql[start:end - 1]):
+        definition = re.sub(r'\s+', ' ', definition)
+        upper = definition.upper()
+        if upper.startswith('PRIMARY KEY'):
+            table['primary_key'] = definition
+        elif upper.startswith('FOREIGN KEY') or (upper.startswith('CONSTRAINT') and 'FOREIGN KEY' in upper):
+            table['foreign_keys'].append(definition)
+        elif INDEX_PATTERN.match(definition):
+            table['indexes'].append(definition)
+        else:
+            name, _, column_definition = definition.partition(' ')
+            table['columns'].append((name.strip('`'), column_definition))
+    return table
+
+
+# Function to build a CREATE TABLE statement from its parsed parts
+def build_create_table(table_name, columns, primary_key=None, foreign_keys=(), indexes=(), table_options=''):
+    """Build a CREATE TABLE statement, the inverse of parse_create_table."""
+    definitions = [f"`{name}` {definition}" for name, definition in columns]
+    if primary_key:
+        definitions.append(primary_key)
+    definitions.extend(indexes)
+    definitions.extend(foreign_keys)
+    body = ',\n    '.join(definitions)
+    options = f" {table_options}" if table_options else ''
+    return f"CREATE TABLE `{table_name}` (\n    {body}\n){options};"
+
+
+# Function to point the REFERENCES part of a foreign key at renamed tables
+def rename_references(definition, suffix):
+    """Append a suffix to the table a foreign key references, e.g. for staging copies."""
+    return REFERENCES_PATTERN.sub(lambda m: f"{m.group(1)}`{m.group(2)}{suffix}`", definition)
+
+
+# Function to load and parse every create script
+def load_create_scripts():
+    """
+    Load every create script listed in sql_create_queries_file_paths.json, in file order
+    (info tables first, so foreign keys can be resolved).
+
+    Returns:
+    list: Parsed tables, each with 'sport', 'category' and 'file_path' added.
+    """
+    with open(CREATE_QUERIES_JSON, 'r') as json_file:
+        sport_sql_files = json.load(json_file)
+
+    tables = []
+    for sport, sql_files in sport_sql_files.items():
+        for category, sql_file in sql_files.items():
+            file_path = os.path.join(PROJECT_ROOT, sql_file)
+            if not os.path.exists(file_path):
+                print(f"SQL file not found: {sql_file}")
+                continue
+            with open(file_path, 'r') as file:
+                table = parse_create_table(file.read())
+            table.update({'sport': sport, 'category': category, 'file_path': file_path})
+            tables.append(table)
+    return tables
@@ -1,8 +1,10 @@
+import time
 import mysql.connector
 
 # Define a class to handle database operations
 class DatabaseHelper:
-    def __init__(self, connection, info_logger, error_logger):
+    def __init__(self, connection, info_logger, error_logger, commit_every=1, commit_interval=None, use_prepared=True,
+                 stats_catalog=None, on_commit=None, on_rollback=None):
 
         """
         Initialize the DatabaseHelper object with the MySQL connection and logger objects.
@@ -13,11 +15,148 @@ class DatabaseHelper:
         connection (mysql.connector.connection.MySQLConnection): MySQL connection object.
         info_logger (logging.Logger): Logger object for info messages.
         error_logger (logging.Logger): Logger object for error messages.
+        commit_every (int): Number of fixtures to group into one commit.
+        commit_interval (float): Maximum number of seconds between commits, or None to only commit by fixture count.
+        use_prepared (bool): Reuse server-side prepared statements for upserts instead of the text protocol.
+        stats_catalog (ColumnStatsCatalog): Optional column statistics catalog, updated with every row written.
+        on_commit (callable): Optional, called after the pending fixtures are committed.
+        on_rollback (callable): Optional, called after the pending fixtures are rolled back together.
         """
         self.connection = connection
         self.info_logger = info_logger
         self.error_logger = error_logger
 
+        # Group commit policy, rows are only committed once enough fixtures (or time) have built up
+        self.commit_every = max(1, commit_every)
+        self.commit_interval = commit_interval
+        self.in_transaction = False
+        self.pending_fixtures = 0
+        self.last_commit_time = time.monotonic()
+
+        # Upsert statements cached per (table, fields), and prepared cursors per (table, column set)
+        self.use_prepared = use_prepared
+        self.upsert_queries = {}
+        self.prepared_cursors = {}
+
+        # Column statistics are merged into the catalog in the same transaction as the rows they describe
+        self.stats_catalog = stats_catalog
+
+        # Lets the caller hold back work (e.g. the output sinks) until the fixtures it depends on are committed
+        self.on_commit = on_commit
+        self.on_rollback = on_rollback
+
+    # Define a method to open (or continue) the transaction for a fixture
+    def begin_fixture(self):
+        """
+        Start the writes for a fixture. The fixture joins the open transaction (or starts one)
+        and gets its own savepoint so it can be rolled back without losing the fixtures before it.
+        """
+        if not self.in_transaction:
+            if not self.connection.in_transaction:
+                self.connection.start_transaction()
+            self.in_transaction = True
+            self.last_commit_time = time.monotonic()
+        self.savepoint('fixture')
+
+    # Define a method to finish a fixture and commit if the group commit policy is met
+    def end_fixture(self):
+        """
+        Mark the current fixture as complete and commit the transaction once
+        commit_every fixtures are pending or commit_interval seconds have passed.
+
+        Returns:
+            bool: True if the transaction was committed.
+        """
+        self.release_savepoint('fixture')
+        self.pending_fixtures += 1
+        if self.stats_catalog is not None:
+            self.stats_catalog.end_fixture()
+
+        elapsed = time.monotonic() - self.last_commit_time
+        if self.pending_fixtures >= self.commit_every or (
+                self.commit_interval is not None and elapsed >= self.commit_interval):
+            self.commit_pending()
+            return True
+        return False
+
+    # Define a method to roll back the fixture that is currently being written
+    def rollback_fixture(self):
+        """Undo every write made since begin_fixture, keeping earlier pending fixtures intact."""
+        if self.stats_catalog is not None:
+            self.stats_catalog.discard_fixture()
+        try:
+            self.rollback_to_savepoint('fixture')
+        except mysql.connector.Error as err:
+            # The savepoint is gone (e.g. the server rolled the transaction back), so the whole group is lost
+            self.error_logger.error(f"Could not roll back to fixture savepoint, rolling back {self.pending_fixtures} pending fixtures: {err.msg}")
+            try:
+                self.connection.rollback()
+            except mysql.connector.Error as rollback_err:
+                # The connection is gone too, the server discards the open transaction on its own
+                self.error_logger.error(f"Error rolling back {self.pending_fixtures} pending fixtures: {rollback_err.msg}")
+            self.in_transaction = False
+            self.pending_fixtures = 0
+            if self.stats_catalog is not None:
+                self.stats_catalog.discard_pending()
+            if self.on_rollback is not None:
+                self.on_rollback()
+
+    # Define a method to commit every pending fixture
+    def commit_pending(self):
+        """Commit the open transaction, if there is one."""
+        if self.in_transaction:
+            if self.stats_catalog is not None:
+                self.stats_catalog.flush()
+            self.connection.commit()
+            self.info_logger.info(f"Committed {self.pending_fixtures} fixtures.")
+            if self.on_commit is not None:
+                self.on_commit()
+        self.in_transaction = False
+        self.pending_fixtures = 0
+        self.last_commit_time = time.monotonic()
+
+    # Define a method to roll back every pending fixture
+    def rollback_pending(self):
+        """Roll back the open transaction, with every fixture pending in it."""
+        if self.in_transaction:
+            try:
+                self.connection.rollback()
+            except mysql.connector.Error as err:
+                self.error_logger.error(f"Error rolling back {self.pending_fixtures} pending fixtures: {err.msg}")
+            if self.stats_catalog is not None:
+                self.stats_catalog.discard_pending()
+            if self.on_rollback is not None:
+                self.on_rollback()
+            self.info_logger.info(f"Rolled back {self.pending_fixtures} pending fixtures.")
+        self.in_transaction = False
+        self.pending_fixtures = 0
+        self.last_commit_time = time.monotonic()
+
+    # Define methods to manage savepoints inside the open transaction
+    def savepoint(self, name):
+        """Create (or move) a savepoint, used to section off the writes for each table."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT `{name}`")
+        finally:
+            cursor.close()
+
+    def rollback_to_savepoint(self, name):
+        """Undo every write made since the savepoint was created."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT `{name}`")
+        finally:
+            cursor.close()
+
+    def release_savepoint(self, name):
+        """Release a savepoint once its writes are no longer at risk of being rolled back."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"RELEASE SAVEPOINT `{name}`")
+        finally:
+            cursor.close()
+
     # Define a method to fetch column names from a given database table
     def get_table_columns(self, table_name):
         """Fetch column names from a given database table."""
@@ -34,94 +173,186 @@ class DatabaseHelper:
             cursor.close()  # Ensure cursor is closed even if there's an error
         return columns
 
-    # Define a method to insert data dynamically into a table
-    def insert_data_dynamically(self, table_name, data_dict, json_fields):
+    # Define a method to build (and cache) the upsert statement for a table
+    def build_upsert_query(self, table_name, json_fields):
         """
-        Insert or update data dynamically into the table by matching fields between data and table.
+        Build the upsert statement for a table by matching the JSON fields against the table columns.
+        The result is cached per table and field list, so the column and primary key lookups only run once.
+
         Parameters:
             table_name (str): Name of the table to insert data into.
-            data_dict (dict): Dictionary containing data to be inserted.
             json_fields (dict): Dictionary containing 'required_fields' and 'optional_fields'.
+
+        Returns:
+            tuple: (matched_fields, query), or (None, None) if the table does not exist.
         """
-        # Check if the table exists in the database
-        try:
-            # Extract 'required_fields' and 'optional_fields' from the JSON fields
-            required_fields = json_fields.get('required_fields', [])
-            optional_fields = json_fields.get('optional_fields', [])
+        # Extract 'required_fields' and 'optional_fields' from the JSON fields
+        required_fields = json_fields.get('required_fields', [])
+        optional_fields = json_fields.get('optional_fields', [])
 
-            # Combine required and optional fields
-            available_fields = required_fields + optional_fields
+        # Combine required and optional fields
+        available_fields = tuple(required_fields + optional_fields)
 
-            # Get the actual table columns from the database
-            columns = self.get_table_columns(table_name)
+        cache_key = (table_name, available_fields)
+        if cache_key in self.upsert_queries:
+            return self.upsert_queries[cache_key]
 
-            # Check if the table exists and has columns
-            if not columns:
-                self.error_logger.error(f"Table {table_name} does not exist or has no columns.")
-                return
+        # Get the actual table columns from the database
+        columns = self.get_table_columns(table_name)
+
+        # Check if the table exists and has columns
+        if not columns:
+            self.error_logger.error(f"Table {table_name} does not exist or has no columns.")
+            return None, None
+
+        # Find which fields from the data_dict can be inserted into the table (matching columns)
+        matched_fields = [field for field in available_fields if field in columns]
+
+        # Remove duplicates while preserving order
+        seen = set()
+        matched_fields = tuple(x for x in matched_fields if not (x in seen or seen.add(x)))
 
-            # Find which fields from the data_dict can be inserted into the table (matching columns)
-            matched_fields = [field for field in available_fields if field in columns]
-
-            # Remove duplicates while preserving order
-            seen = set()
-            matched_fields = [x for x in matched_fields if not (x in seen or seen.add(x))]
-
-            # Extract the values for the matched fields, ensuring missing fields are handled appropriately
-            values = []
-            for field in matched_fields:
-                value = data_dict.get(field, None)
-
-                # Handle None or missing values differently based on the expected data type
-                if isinstance(value, (int, float)) or value is None:
-                    # If the value is None or numeric, leave it as None (SQL will treat it as NULL)
-                    value = value if value is not None else None
-                else:
-                    # If the value is a string, use an empty string for missing string fields
-                    value = value if value != '' else ''
-
-                values.append(value)
-
-            # Prepare SQL placeholders and the query
-            placeholders = ', '.join(['%s'] * len(matched_fields))
-            columns_formatted = ', '.join(matched_fields)
-
-            # Prepare the ON DUPLICATE KEY UPDATE part
-            # Exclude primary keys from the update statement to avoid issues
-            primary_keys = self.get_primary_keys(table_name)
-            update_fields = [field for field in matched_fields if field not in primary_keys]
-
-            # If there are fields to update, construct the update clause
-            if update_fields:
-                update_clause = ', '.join([f"{field}=VALUES({field})" for field in update_fields])
-                query = f"""
+        # Prepare SQL placeholders and the query
+        placeholders = ', '.join(['%s'] * len(matched_fields))
+        columns_formatted = ', '.join(matched_fields)
+
+        # Prepare the ON DUPLICATE KEY UPDATE part
+        # Exclude primary keys from the update statement to avoid issues
+        primary_keys = self.get_primary_keys(table_name)
+        update_fields = [field for field in matched_fields if field not in primary_keys]
+
+        # If there are fields to update, construct the update clause
+        if update_fields:
+            update_clause = ', '.join([f"{field}=VALUES({field})" for field in update_fields])
+            query = f"""
                 INSERT INTO {table_name} ({columns_formatted}) 
                 VALUES ({placeholders})
                 ON DUPLICATE KEY UPDATE {update_clause}
                 """
+        else:
+            # If there are no fields to update, perform a simple insert
+            query = f"INSERT IGNORE INTO {table_name} ({columns_formatted}) VALUES ({placeholders})"
+
+        self.upsert_queries[cache_key] = (matched_fields, query)
+        return matched_fields, query
+
+    # Define a method to fetch the cursor an upsert statement should run on
+    def get_upsert_cursor(self, table_name, matched_fields):
+        """
+        Return the cursor for a (table, column set) upsert.
+        With prepared statements enabled, one server-side prepared cursor is kept per shape and reused,
+        so MySQL only parses each upsert once per connection.
+        """
+        if not self.use_prepared:
+            return self.connection.cursor()
+
+        cursor_key = (table_name, matched_fields)
+        cursor = self.prepared_cursors.get(cursor_key)
+        if cursor is None:
+            cursor = self.connection.cursor(prepared=True)
+            self.prepared_cursors[cursor_key] = cursor
+        return cursor
+
+    # Define a method to drop every cached statement and prepared cursor
+    def clear_statement_cache(self):
+        """Close the prepared cursors and forget the cached upserts, e.g. after a table has been altered."""
+        for cursor in self.prepared_cursors.values():
+            try:
+                cursor.close()
+            except mysql.connector.Error as err:
+                self.error_logger.warning(f"Error closing prepared cursor: {err.msg}")
+        self.prepared_cursors = {}
+        self.upsert_queries = {}
+
+    # Define a method to extract the row values for the matched fields
+    @staticmethod
+    def extract_values(matched_fields, data_dict):
+        """Extract the values for the matched fields, ensuring missing fields are handled appropriately."""
+        values = []
+        for field in matched_fields:
+            value = data_dict.get(field, None)
+
+            # Handle None or missing values differently based on the expected data type
+            if isinstance(value, (int, float)) or value is None:
+                # If the value is None or numeric, leave it as None (SQL will treat it as NULL)
+                value = value if value is not None else None
             else:
-                # If there are no fields to update, perform a simple insert
-                query = f"INSERT IGNORE INTO {table_name} ({columns_formatted}) VALUES ({placeholders})"
+                # If the value is a string, use an empty string for missing string fields
+                value = value if value != '' else ''
+
+            values.append(value)
+        return values
+
+    # Define a method to insert data dynamically into a table
+    def insert_data_dynamically(self, table_name, data_dict, json_fields):
+        """
+        Insert or update data dynamically into the table by matching fields between data and table.
+        Parameters:
+            table_name (str): Name of the table to insert data into.
+            data_dict (dict): Dictionary containing data to be inserted.
+            json_fields (dict): Dictionary containing 'required_fields' and 'optional_fields'.
+        """
+        self.insert_rows_dynamically(table_name, [data_dict], json_fields)
+
+    # Define a method to insert a batch of rows dynamically into a table
+    def insert_rows_dynamically(self, table_name, data_dicts, json_fields):
+        """
+        Insert or update a batch of rows into the table, reusing one upsert statement for every row.
+        Parameters:
+            table_name (str): Name of the table to insert data into.
+            data_dicts (list): List of dictionaries containing data to be inserted.
+            json_fields (dict): Dictionary containing 'required_fields' and 'optional_fields'.
+        """
+        if not data_dicts:
+            return
+
+        # Check if the table exists in the database
+        cursor = None
+        try:
+            matched_fields, query = self.build_upsert_query(table_name, json_fields)
+            if query is None:
+                return
+
+            rows = [self.extract_values(matched_fields, data_dict) for data_dict in data_dicts]
 
             # Logging the SQL query for debugging purposes
             self.info_logger.debug(f"Executing query on table {table_name}: {query}")
-            self.info_logger.debug(f"With values: {values}")
+            self.info_logger.debug(f"With values: {rows}")
 
-            cursor = self.connection.cursor()
-            cursor.execute(query, values)
-            self.connection.commit()
+            cursor = self.get_upsert_cursor(table_name, matched_fields)
+            if len(rows) == 1:
+                cursor.execute(query, rows[0])
+            else:
+                cursor.executemany(query, rows)
+
+            if self.stats_catalog is not None:
+                self.stats_catalog.observe(table_name, matched_fields, rows)
+
+            # Inside a fixture transaction the commit is left to the group commit policy
+            if not self.in_transaction:
+                if self.stats_catalog is not None:
+                    self.stats_catalog.flush()
+                self.connection.commit()
 
         # Handle exceptions
         except mysql.connector.Error as err:
             self.error_logger.error(f"Error inserting into {table_name}: {err.msg}")
-            self.connection.rollback()  # Rollback in case of any error
+            if not self.in_transaction:
+                self.connection.rollback()  # Rollback in case of any error, savepoints handle this inside a transaction
+                if self.stats_catalog is not None:
+                    self.stats_catalog.discard_pending()
             raise  # Re-raise the exception to be handled upstream
         except Exception as e:
             self.error_logger.error(f"Error inserting into {table_name}: {e}")
-            self.connection.rollback()  # Rollback in case of any error
+            if not self.in_transaction:
+                self.connection.rollback()  # Rollback in case of any error, savepoints handle this inside a transaction
+                if self.stats_catalog is not None:
+                    self.stats_catalog.discard_pending()
             raise  # Re-raise the exception to be handled upstream
         finally:
-            cursor.close()  # Ensure cursor is closed even if an error occurs
+            # Prepared cursors are kept open for reuse, plain cursors are closed
+            if cursor is not None and not self.use_prepared:
+                cursor.close()  # Ensure cursor is closed even if an error occurs
 
     # Define a method to fetch the primary key columns of a table
     def get_primary_keys(self, table_name):
@@ -0,0 +1,390 @@
+import os
+import sys
+import json
+import queue
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from DatabaseUtils.SqlConnector import connect
+from DatabaseUtils.CreateScriptParser import load_create_scripts
+from DatabaseUtils.Reconstructor import drop_all_tables, create_tables
+from CreateDatabaseBackup import open_snapshot_connections  # Reuses the consistent snapshot workers of the parallel backup
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+"""
+Exports every table of the powerdata database to a columnar Parquet snapshot, and imports a snapshot back.
+
+Each table is written under Snapshots/parquet_snapshot_<timestamp>/<sport>/<table>/ with Arrow types that match
+the MySQL column types, and tables with a fixtureYear column are partitioned into fixtureYear=<year> folders.
+Row groups carry min/max statistics, so tools like pandas, DuckDB or Spark can query a snapshot directly and
+skip the row groups and years they don't need, without restoring MySQL.
+
+A snapshot.json next to the sport folders records the sport, path, row count, columns and CREATE TABLE statement
+of every table. Importing drops every table and recreates the snapshot's tables from those statements, so tables
+that aren't in the create scripts (static_player_info, column_stats) and the season partitions come back as they were.
+Then every table is loaded in parallel on pooled connections.
+
+Requires the pyarrow package.
+"""
+
+FETCH_SIZE = 10000  # Rows fetched from the server per round trip, and rows per record batch
+ROW_GROUP_SIZE = 100000  # Rows per Parquet row group
+INSERT_BATCH_SIZE = 5000  # Rows inserted per executemany on import
+IMPORT_WORKERS = 4  # Worker connections used by the importer
+PARTITION_COLUMN = 'fixtureYear'
+SNAPSHOT_MANIFEST = 'snapshot.json'
+
+
+# Function to map a MySQL column type to an Arrow type
+def arrow_type(data_type, column_type, precision, scale):
+    """
+    Map a column from INFORMATION_SCHEMA.COLUMNS to the Arrow type it is stored as.
+
+    Parameters:
+    data_type (str): DATA_TYPE, e.g. 'int' or 'varchar'.
+    column_type (str): COLUMN_TYPE, e.g. 'int unsigned' or 'tinyint(1)'.
+    precision (int): NUMERIC_PRECISION, used for DECIMAL columns.
+    scale (int): NUMERIC_SCALE, used for DECIMAL columns.
+
+    Returns:
+    pyarrow.DataType: The Arrow type.
+    """
+    unsigned = 'unsigned' in column_type
+    if data_type == 'tinyint':
+        return pa.uint8() if unsigned else pa.int8()
+    if data_type == 'smallint':
+        return pa.uint16() if unsigned else pa.int16()
+    if data_type in ('mediumint', 'int', 'integer'):
+        return pa.uint32() if unsigned else pa.int32()
+    if data_type == 'bigint':
+        return pa.uint64() if unsigned else pa.int64()
+    if data_type == 'float':
+        return pa.float32()
+    if data_type in ('double', 'real'):
+        return pa.float64()
+    if data_type == 'decimal':
+        return pa.decimal128(precision, scale)
+    if data_type == 'bit':
+        return pa.uint64()
+    if data_type == 'date':
+        return pa.date32()
+    if data_type in ('datetime', 'timestamp'):
+        return pa.timestamp('us')
+    if data_type == 'time':
+        return pa.duration('us')
+    if data_type == 'year':
+        return pa.int16()
+    if data_type in ('binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob'):
+        return pa.binary()
+    return pa.string()
+
+
+# Function to build the Arrow schema of a table
+def table_schema(connection, table_name):
+    """Build the Arrow schema of a table from INFORMATION_SCHEMA, in column order."""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, NUMERIC_PRECISION, NUMERIC_SCALE, IS_NULLABLE
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+    """, (table_name,))
+    fields = [
+        pa.field(name, arrow_type(data_type, column_type, precision, scale), nullable=(is_nullable == 'YES'))
+        for name, data_type, column_type, precision, scale, is_nullable in cursor.fetchall()
+    ]
+    cursor.close()
+    return pa.schema(fields)
+
+
+# Function to find the sport every table belongs to
+def table_sports():
+    """Map every table name in the create scripts (lower case) to its sport."""
+    return {table['table_name'].lower(): table['sport'] for table in load_create_scripts()}
+
+
+# Function to stream the rows of a table as Arrow record batches
+def iter_record_batches(connection, table_name, schema, fetch_size=FETCH_SIZE):
+    """Yield the rows of a table as record batches, fetched from an unbuffered cursor."""
+    cursor = connection.cursor(buffered=False)
+    cursor.execute(f"SELECT * FROM `{table_name}`")
+    try:
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+    finally:
+        cursor.close()
+
+
+# Function to export one table to Parquet on a pooled connection
+def export_table(connection_pool, table_name, sport, snapshot_dir):
+    """
+    Export a table to Parquet, partitioned by fixtureYear if it has that column.
+
+    Returns:
+    dict: The table's snapshot.json entry.
+    """
+    connection = connection_pool.get()
+    try:
+        schema = table_schema(connection, table_name)
+        cursor = connection.cursor()
+        cursor.execute(f"SHOW CREATE TABLE `{table_name}`")
+        create_statement = cursor.fetchone()[1]
+        cursor.close()
+        relative_path = os.path.join(sport, table_name)
+        table_dir = os.path.join(snapshot_dir, relative_path)
+
+        partitioning = None
+        if PARTITION_COLUMN in schema.names:
+            partitioning = ds.partitioning(
+                pa.schema([schema.field(PARTITION_COLUMN)]), flavor='hive')
+
+        row_count = 0
+
+        def counted_batches():
+            nonlocal row_count
+            for batch in iter_record_batches(connection, table_name, schema):
+                row_count += batch.num_rows
+                yield batch
+
+        ds.write_dataset(
+            counted_batches(), table_dir, schema=schema, format='parquet', partitioning=partitioning,
+            existing_data_behavior='delete_matching', max_rows_per_group=ROW_GROUP_SIZE,
+            min_rows_per_group=min(ROW_GROUP_SIZE, FETCH_SIZE),
+            file_options=ds.ParquetFileFormat().make_write_options(compression='zstd', write_statistics=True))
+    finally:
+        connection_pool.put(connection)
+
+    print(f"Exported {row_count} rows from {table_name}")
+    return {
+        'sport': sport,
+        'path': relative_path,
+        'rows': row_count,
+        'partitioned_by': PARTITION_COLUMN if partitioning else None,
+        'columns': schema.names,
+        'create': create_statement
+    }
+
+
+# Function to export every table to a Parquet snapshot
+def export_snapshot(workers=IMPORT_WORKERS):
+    """
+    Export every table to a Parquet snapshot, one table per worker connection.
+    All workers read from one consistent snapshot of the database.
+
+    Returns:
+    str: The path of the snapshot folder, or None if the export failed.
+    """
+    if pa is None:
+        print("The pyarrow package is not installed. Parquet snapshots cannot be created.")
+        return None
+
+    connection = connect()
+    if connection is None:
+        print("Connection to the database failed. Snapshot cannot be created.")
+        return None
+
+    worker_connections = []
+    try:
+        timestamp = datetime.now().strftime('%d-%m-%Y - %I-%M%p')
+        snapshot_dir = os.path.join(os.path.abspath(os.getcwd()), 'Snapshots', f'parquet_snapshot_{timestamp}')
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+        worker_connections = open_snapshot_connections(connection, workers)
+        cursor = worker_connections[0].cursor()
+        cursor.execute("SHOW TABLES")
+        tables = [table_name for (table_name,) in cursor.fetchall()]
+        cursor.close()
+
+        sports = table_sports()
+        connection_pool = queue.Queue()
+        for worker_connection in worker_connections:
+            connection_pool.put(worker_connection)
+
+        with ThreadPoolExecutor(max_workers=len(worker_connections)) as executor:
+            futures = {
+                table_name: executor.submit(
+                    export_table, connection_pool, table_name, sports.get(table_name.lower(), 'Other'), snapshot_dir)
+                for table_name in tables
+            }
+            snapshot_tables = {table_name: future.result() for table_name, future in futures.items()}
+
+        with open(os.path.join(snapshot_dir, SNAPSHOT_MANIFEST), 'w') as f:
+            json.dump({'created': datetime.now().isoformat(), 'tables': snapshot_tables}, f, indent=2)
+
+        print(f"Parquet snapshot created successfully at {snapshot_dir}")
+        return snapshot_dir
+
+    except Exception as e:
+        logging.error(f"Error occurred while creating Parquet snapshot: {e}")
+        print(f"Error occurred while creating Parquet snapshot: {e}")
+        return None
+    finally:
+        for worker_connection in worker_connections:
+            worker_connection.close()
+        connection.close()
+        print("MySQL connection closed.")
+
+
+# Function to recreate the tables of a snapshot
+def recreate_tables(connection, tables):
+    """
+    Drop the tables a snapshot replaces and recreate them blank.
+
+    Tables are recreated from the CREATE TABLE statements in snapshot.json. Snapshots taken before the statements
+    were stored fall back to the create scripts: only the script tables are dropped and recreated, and the snapshot's
+    other tables are left alone and skipped.
+
+    Parameters:
+    connection (mysql.connector.connection.MySQLConnection): The connection to run the DDL on.
+    tables (dict): The 'tables' entries of snapshot.json.
+
+    Returns:
+    list: The names of the tables to import.
+    """
+    if all('create' in entry for entry in tables.values()):
+        print("Dropping all tables...")
+        drop_all_tables(connection)
+        print("Recreating blank tables from the snapshot...")
+        cursor = connection.cursor()
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")  # Tables can reference tables created after them
+        try:
+            for table_name, entry in tables.items():
+                cursor.execute(entry['create'])
+                print(f"Created table: {table_name}")
+        finally:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+            cursor.close()
+        return list(tables)
+
+    print("The snapshot has no CREATE TABLE statements, recreating the tables from the create scripts...")
+    script_tables = {table['table_name'].lower() for table in load_create_scripts()}
+    cursor = connection.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+    try:
+        for table_name in script_tables:
+            cursor.execute(f"DROP TABLE IF EXISTS `{table_name}`;")
+    finally:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+        cursor.close()
+    create_tables()
+
+    for table_name in tables:
+        if table_name.lower() not in script_tables:
+            print(f"Skipping {table_name}, it isn't in the create scripts and the snapshot has no CREATE TABLE for it.")
+    return [table_name for table_name in tables if table_name.lower() in script_tables]
+
+
+# Function to import one table from a snapshot on a pooled connection
+def import_table(connection_pool, snapshot_dir, table_name, entry):
+    """Load a table's Parquet files into MySQL with batched executemany inserts, and return the row count."""
+    dataset = ds.dataset(
+        os.path.join(snapshot_dir, entry['path']), format='parquet',
+        partitioning='hive' if entry['partitioned_by'] else None)
+    columns = entry['columns']
+    column_names = ', '.join(f"`{column}`" for column in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    insert_query = f"INSERT INTO `{table_name}` ({column_names}) VALUES ({placeholders})"
+
+    connection = connection_pool.get()
+    cursor = connection.cursor()
+    row_count = 0
+    try:
+        for batch in dataset.to_batches(columns=columns, batch_size=INSERT_BATCH_SIZE):
+            values = list(zip(*(column.to_pylist() for column in batch.columns)))
+            if values:
+                cursor.executemany(insert_query, values)
+                connection.commit()
+                row_count += len(values)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection_pool.put(connection)
+
+    print(f"Imported {row_count} rows into {table_name}")
+    return row_count
+
+
+# Function to import every table of a Parquet snapshot
+def import_snapshot(snapshot_dir, workers=IMPORT_WORKERS):
+    """Drop and recreate the snapshot's tables, then load the snapshot into them in parallel."""
+    if pa is None:
+        print("The pyarrow package is not installed. Parquet snapshots cannot be imported.")
+        return
+
+    with open(os.path.join(snapshot_dir, SNAPSHOT_MANIFEST), 'r') as f:
+        manifest = json.load(f)
+
+    connection = connect()
+    if connection is None:
+        logging.error("Failed to connect to the database.")
+        print("Failed to connect to the database.")
+        return
+
+    worker_connections = []
+    try:
+        table_names = recreate_tables(connection, manifest['tables'])
+
+        # Foreign key and unique checks are off on the workers, so tables can load in any order
+        connection_pool = queue.Queue()
+        for _ in range(workers):
+            worker_connection = connect()
+            if worker_connection is None:
+                raise ConnectionError("Could not open a worker connection.")
+            cursor = worker_connection.cursor()
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+            cursor.execute("SET UNIQUE_CHECKS = 0;")
+            cursor.close()
+            worker_connection.autocommit = False
+            worker_connections.append(worker_connection)
+            connection_pool.put(worker_connection)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                table_name: executor.submit(
+                    import_table, connection_pool, snapshot_dir, table_name, manifest['tables'][table_name])
+                for table_name in table_names
+            }
+            for table_name, future in futures.items():
+                row_count = future.result()
+                if row_count != manifest['tables'][table_name]['rows']:
+                    print(f"Warning: {table_name} imported {row_count} rows, "
+                          f"the snapshot has {manifest['tables'][table_name]['rows']}")
+
+        print(f"Snapshot imported successfully from {snapshot_dir}")
+    except Exception as e:
+        logging.error(f"Error during snapshot import: {e}")
+        print(f"Error during snapshot import: {e}")
+    finally:
+        for worker_connection in worker_connections:
+            worker_connection.close()
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import a Parquet snapshot of the database.")
+    parser.add_argument('--import', dest='import_dir', help="Import this snapshot folder instead of exporting.")
+    parser.add_argument('--workers', type=int, default=IMPORT_WORKERS, help="Number of worker connections.")
+    args = parser.parse_args()
+
+    if args.import_dir:
+        import_snapshot(args.import_dir, args.workers)
+    else:
+        export_snapshot(args.workers)
@@ -0,0 +1,290 @@
+import os
+import re
+import sys
+import logging
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from DatabaseUtils.SqlConnector import connect
+from DatabaseUtils.CreateScriptParser import load_create_scripts
+
+"""
+Partitions the sport match, period and score flow tables by season (fixtureYear).
+
+Tables are partitioned with RANGE COLUMNS on fixtureYear, one partition per season and a 'p_future' partition
+that catches anything newer. Queries that filter on fixtureYear only read the partitions of those seasons.
+
+InnoDB has two rules for partitioned tables that shape how this works:
+- Every unique key must include the partition column, so the primary key becomes (primary key, fixtureYear).
+- Partitioned tables can't have foreign keys or be referenced by one, so the foreign keys from and to
+  a partitioned table are dropped. The scraper already only writes rows whose parents exist.
+
+Rows without a season (the league name has no year) are written with fixtureYear 'unknown'. It sorts after every
+year, so those rows always land in 'p_future'. Rows written before period and score flow had a fixtureYear are
+backfilled from their match (or set to 'unknown') when the table is partitioned.
+
+When the scraper reaches a season that has no partition yet, PartitionManager splits it out of 'p_future'
+(or, for an older season, out of the next season's partition) before any of its rows are written,
+so every bulk load lands in its own season's partition whatever order the leagues are scraped in.
+A finished season can be archived with EXCHANGE PARTITION, which moves its rows into a standalone
+'<table>_archive_<year>' table without copying them.
+
+Usage:
+    python DatabaseUtils/PartitionManager.py --sport "AFL Mens"            Partition a sport's tables
+    python DatabaseUtils/PartitionManager.py --archive afl_mens_match 2015  Archive one season
+"""
+
+PARTITION_COLUMN = 'fixtureYear'
+PARTITIONED_CATEGORIES = ('match_details', 'period_stats', 'score_flow')  # Keys in sql_create_queries_file_paths.json
+FUTURE_PARTITION = 'p_future'
+YEAR_PATTERN = re.compile(r'^\d{4}$')
+UNKNOWN_SEASON = 'unknown'  # fixtureYear of rows without a season, sorts after every year into p_future
+MATCH_CHILD_PATTERN = re.compile(r'_(period|score_flow)(?=_|$)')  # afl_mens_period -> afl_mens_match
+
+
+# Function to build the name of a season's partition
+def partition_name(year):
+    """Return the partition name of a season, e.g. 'p2023'."""
+    return f"p{year}"
+
+
+# Function to build the PARTITION BY clause for a set of seasons
+def partition_clause(years):
+    """
+    Build a RANGE COLUMNS clause with one partition per season and a catch-all partition for newer seasons.
+    Rows from before the first season fall into the first season's partition.
+    """
+    partitions = [
+        f"PARTITION {partition_name(year)} VALUES LESS THAN ('{int(year) + 1}')"
+        for year in sorted(set(years), key=int)
+    ]
+    partitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return f"PARTITION BY RANGE COLUMNS({PARTITION_COLUMN}) (\n    " + ',\n    '.join(partitions) + "\n)"
+
+
+# Function to find the tables of a sport that should be partitioned
+def partitionable_tables(sport=None):
+    """Return the match, period and score flow table names from the create scripts, optionally for one sport."""
+    return [
+        table['table_name'] for table in load_create_scripts()
+        if table['category'] in PARTITIONED_CATEGORIES and (sport is None or table['sport'] == sport)
+    ]
+
+
+# Function to fetch the partitions of a table
+def get_partitions(connection, table_name):
+    """Return the partition names of a table in order, or an empty list if it isn't partitioned."""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT PARTITION_NAME
+        FROM INFORMATION_SCHEMA.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table_name,))
+    partitions = [name for (name,) in cursor.fetchall()]
+    cursor.close()
+    return partitions
+
+
+# Function to drop the foreign keys from and to a table
+def drop_foreign_keys(connection, table_name):
+    """Drop every foreign key declared on the table, or referencing it, since partitioned tables can't have them."""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT DISTINCT TABLE_NAME, CONSTRAINT_NAME
+        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+          AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)
+    """, (table_name, table_name))
+    for owner_table, constraint_name in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE `{owner_table}` DROP FOREIGN KEY `{constraint_name}`")
+        print(f"Dropped foreign key {constraint_name} on {owner_table}")
+    cursor.close()
+
+
+# Function to fill in the partition column of rows that don't have one
+def backfill_partition_column(connection, table_name):
+    """
+    Give every row without a fixtureYear (NULL or '') one, so the column can join the primary key.
+    Period and score flow rows take their match's season, anything left gets UNKNOWN_SEASON.
+    """
+    missing = f"(t.`{PARTITION_COLUMN}` IS NULL OR t.`{PARTITION_COLUMN}` = '')"
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM `{table_name}` t WHERE {missing}")
+    if cursor.fetchone()[0] == 0:
+        cursor.close()
+        return
+
+    match_table = MATCH_CHILD_PATTERN.sub('_match', table_name, count=1)
+    if match_table != table_name:
+        cursor.execute("SHOW TABLES LIKE %s", (match_table,))
+        if cursor.fetchone():
+            cursor.execute(f"""
+                UPDATE `{table_name}` t
+                JOIN `{match_table}` m ON m.uniqueMatchId = t.uniqueMatchId
+                SET t.`{PARTITION_COLUMN}` = m.`{PARTITION_COLUMN}`
+                WHERE {missing} AND m.`{PARTITION_COLUMN}` IS NOT NULL AND m.`{PARTITION_COLUMN}` <> ''
+            """)
+            print(f"Backfilled {PARTITION_COLUMN} of {cursor.rowcount} rows in {table_name} from {match_table}.")
+
+    cursor.execute(f"UPDATE `{table_name}` t SET t.`{PARTITION_COLUMN}` = %s WHERE {missing}", (UNKNOWN_SEASON,))
+    if cursor.rowcount:
+        print(f"Set {PARTITION_COLUMN} of {cursor.rowcount} rows in {table_name} to '{UNKNOWN_SEASON}'.")
+    connection.commit()
+    cursor.close()
+
+
+# Function to partition an existing table by season
+def partition_table(connection, table_name):
+    """
+    Partition a table by fixtureYear, with one partition for every season it already holds.
+    The primary key is extended with fixtureYear in the same ALTER TABLE, so the table is only rebuilt once.
+    Rows without a fixtureYear are backfilled first, since primary key columns can't be NULL.
+    """
+    if get_partitions(connection, table_name):
+        print(f"{table_name} is already partitioned.")
+        return
+
+    backfill_partition_column(connection, table_name)
+
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT DISTINCT `{PARTITION_COLUMN}` FROM `{table_name}`")
+    years = [year for (year,) in cursor.fetchall() if year and YEAR_PATTERN.match(str(year))]
+    cursor.execute("""
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY'
+        ORDER BY ORDINAL_POSITION
+    """, (table_name,))
+    primary_key = [column for (column,) in cursor.fetchall()]
+    cursor.close()
+
+    drop_foreign_keys(connection, table_name)
+
+    if PARTITION_COLUMN not in primary_key:
+        primary_key.append(PARTITION_COLUMN)
+    key_columns = ', '.join(f"`{column}`" for column in primary_key)
+
+    cursor = connection.cursor()
+    cursor.execute(
+        f"ALTER TABLE `{table_name}` DROP PRIMARY KEY, ADD PRIMARY KEY ({key_columns})\n{partition_clause(years)}")
+    cursor.close()
+    print(f"Partitioned {table_name} into {len(years) + 1} partitions.")
+
+
+# Function to move a season out of a partitioned table into its own archive table
+def archive_season(connection, table_name, year):
+    """
+    Move a season's partition into '<table>_archive_<year>' with EXCHANGE PARTITION, without copying rows.
+    The season's partition is left empty, and the archive table can be dumped or dropped on its own.
+
+    Returns:
+    str: The name of the archive table.
+    """
+    if partition_name(year) not in get_partitions(connection, table_name):
+        raise ValueError(f"{table_name} has no partition for {year}.")
+
+    archive_table = f"{table_name}_archive_{year}"
+    cursor = connection.cursor()
+    cursor.execute(f"CREATE TABLE `{archive_table}` LIKE `{table_name}`")
+    cursor.execute(f"ALTER TABLE `{archive_table}` REMOVE PARTITIONING")
+    cursor.execute(f"ALTER TABLE `{table_name}` EXCHANGE PARTITION {partition_name(year)} WITH TABLE `{archive_table}`")
+    cursor.close()
+    print(f"Archived the {year} season of {table_name} into {archive_table}.")
+    return archive_table
+
+
+# Class to keep the season partitions in step with the scrape
+class PartitionManager:
+    def __init__(self, connection, error_logger):
+        """
+        Track which tables are partitioned and give every new season its own partition before it is loaded.
+
+        Parameters:
+        connection (mysql.connector.connection.MySQLConnection): MySQL connection object.
+        error_logger (logging.Logger): Logger object for error messages.
+        """
+        self.connection = connection
+        self.error_logger = error_logger
+        self.partitions = {}
+
+    # Define a method to check if a season needs a new partition
+    def needs_partition(self, table_name, year):
+        """Check if the table is partitioned and the season doesn't have its own partition yet."""
+        if not year or not YEAR_PATTERN.match(str(year)):
+            return False
+        if table_name not in self.partitions:
+            self.partitions[table_name] = get_partitions(self.connection, table_name)
+        partitions = self.partitions[table_name]
+        return FUTURE_PARTITION in partitions and partition_name(year) not in partitions
+
+    # Define a method to find the partition a season's rows currently fall into
+    def covering_partition(self, table_name, year):
+        """Return the first partition whose range covers the season, 'p_future' if no season partition does."""
+        for name in self.partitions[table_name]:
+            if name != FUTURE_PARTITION and int(name[1:]) > int(year):
+                return name
+        return FUTURE_PARTITION
+
+    # Define a method to split a season out of the partition that covers it
+    def ensure_season(self, table_name, year):
+        """
+        Give the season its own partition if it doesn't have one yet, by splitting it out of the partition
+        that covers it: 'p_future' for a new season, or the next season's partition for an older one
+        (leagues aren't scraped in season order).
+        This is DDL, so it commits implicitly and must run outside the fixture transaction.
+
+        Returns:
+        bool: True if a partition was added.
+        """
+        if not self.needs_partition(table_name, year):
+            return False
+
+        covering = self.covering_partition(table_name, year)
+        upper_bound = 'MAXVALUE' if covering == FUTURE_PARTITION else f"'{int(covering[1:]) + 1}'"
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                f"ALTER TABLE `{table_name}` REORGANIZE PARTITION {covering} INTO ("
+                f"PARTITION {partition_name(year)} VALUES LESS THAN ('{int(year) + 1}'), "
+                f"PARTITION {covering} VALUES LESS THAN ({upper_bound}))")
+        except Exception as e:
+            self.error_logger.error(f"Error adding partition {partition_name(year)} to {table_name}: {e}")
+            return False
+        finally:
+            cursor.close()
+
+        partitions = self.partitions[table_name]
+        partitions.insert(partitions.index(covering), partition_name(year))
+        print(f"Added partition {partition_name(year)} to {table_name}")
+        return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition the sport tables by season, or archive a season.")
+    parser.add_argument('--sport', action='append', help="Partition this sport's tables, e.g. 'AFL Mens' (can be repeated).")
+    parser.add_argument('--all', action='store_true', help="Partition every sport's match, period and score flow tables.")
+    parser.add_argument('--archive', nargs=2, metavar=('TABLE', 'YEAR'), help="Archive one season of a table.")
+    args = parser.parse_args()
+
+    connection = connect()
+    if connection is None:
+        logging.error("Failed to connect to the database.")
+        print("Failed to connect to the database.")
+        sys.exit(1)
+
+    try:
+        if args.archive:
+            archive_season(connection, args.archive[0], args.archive[1])
+        else:
+            sports = [None] if args.all else (args.sport or [])
+            for sport in sports:
+                for table_name in partitionable_tables(sport):
+                    partition_table(connection, table_name)
+    except Exception as e:
+        logging.error(f"Error partitioning tables: {e}")
+        print(f"Error partitioning tables: {e}")
+    finally:
+        connection.close()
+        print("MySQL connection closed.")
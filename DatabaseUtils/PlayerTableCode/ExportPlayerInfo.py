@@ -3,42 +3,92 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-import pandas as pd
-from DatabaseUtils.SqlConnector import connect 
+import json
+import argparse
+from DatabaseUtils.SqlConnector import connect
+from DatabaseUtils.PlayerTableCode.InsertStaticPlayerInfo import JSON_FILE_PATH
 
 
 
 """
-Exports existing player data from the database to a JSON file for testing purposes. 
+Exports existing player data from the database to a JSON file for testing purposes.
 This might end up being a one-time operation, but it's useful to have the code here for reference.
 
-Json file is stored in /Assets/Jsons/player_info.json
+Json file is stored in /Assets/jsons/player_info.json, as newline delimited JSON (one player per line),
+which is the format InsertStaticPlayerInfo reads back.
+
+Rows are streamed from the server with an unbuffered cursor and written CHUNK_SIZE rows at a time,
+so memory stays flat however big the table is. Any other table can be exported the same way with --table.
+The file is written to a temporary file first and renamed over the old one once the export is complete.
 """
 
-# Function to fetch player data and save as a JSON file
-def export_player_data_to_json():
+CHUNK_SIZE = 5000  # Rows fetched and written per batch
+
+
+# Function to stream a table to a newline delimited JSON file
+def export_table_to_ndjson(table_name, output_path, chunk_size=CHUNK_SIZE):
+    """
+    Stream every row of a table into an NDJSON file.
+
+    Parameters:
+    table_name (str): The table to export.
+    output_path (str): The NDJSON file to write.
+    chunk_size (int): Rows fetched and written per batch.
+
+    Returns:
+    int: The number of rows exported, or None if the export failed.
+    """
+    connection = connect()
+    if connection is None:
+        print("Failed to connect to the database.")
+        return None
+
+    temp_path = f"{output_path}.tmp"
+    row_count = 0
     try:
-        # Establish a connection using your existing connector
-        connection = connect()
+        # Unbuffered, so rows are read from the server as they are fetched instead of all at once
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        cursor.execute(f"SELECT * FROM `{table_name}`")
 
-        if connection:
-            # Define the query to fetch all data from the table
-            query = "SELECT * FROM powerdata.player_info"
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(temp_path, 'w', encoding='utf-8') as ndjson_file:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                ndjson_file.writelines(json.dumps(row, default=str) + '\n' for row in rows)
+                row_count += len(rows)
+                print(f"Exported {row_count} rows from {table_name}...")
+        cursor.close()
 
-            # Fetch the data using pandas and store it in a DataFrame
-            df = pd.read_sql(query, connection)
+        os.replace(temp_path, output_path)
+        print(f"Data successfully exported to '{output_path}' ({row_count} rows).")
+        return row_count
 
-            # Save the DataFrame as a JSON file
-            df.to_json('player_info.json', orient='records', lines=False)  # Comma-separated JSON array
-            print("Data successfully exported to 'player_info.json'.")
-        
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None
+
+    finally:
         # Close the connection after the operation
         if connection.is_connected():
             connection.close()
             print("MySQL connection is closed.")
 
-    except Exception as e:
-        print(f"An error occurred: {e}")
+# Function to fetch player data and save as a JSON file
+def export_player_data_to_json(output_path=JSON_FILE_PATH):
+    """Export player_info to the NDJSON file InsertStaticPlayerInfo loads static_player_info from."""
+    return export_table_to_ndjson('player_info', output_path)
 
 if __name__ == "__main__":
-    export_player_data_to_json()
+    parser = argparse.ArgumentParser(description="Export a table to a newline delimited JSON file.")
+    parser.add_argument('--table', default='player_info', help="The table to export, player_info by default.")
+    parser.add_argument('--output', help="The file to write, Assets/jsons/player_info.json by default for player_info.")
+    args = parser.parse_args()
+
+    if args.table == 'player_info' and args.output is None:
+        export_player_data_to_json()
+    else:
+        export_table_to_ndjson(args.table, args.output or f"{args.table}.json")
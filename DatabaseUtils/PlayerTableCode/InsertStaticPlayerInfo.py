@@ -4,20 +4,81 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 import json
+from itertools import islice
 from DatabaseUtils.SqlConnector import connect
+from Utils.FileChecksum import file_checksum
 from mysql.connector import Error
 
 # Correct path to the player_info.json file
-JSON_FILE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Assets', 'Jsons', 'player_info.json'))
+JSON_FILE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Assets', 'jsons', 'player_info.json'))
+
+CHUNK_SIZE = 1000  # NDJSON lines parsed and upserted per executemany
+
+PLAYER_COLUMNS = ('playerId', 'firstname', 'surname', 'displayName', 'shortDisplayName',
+                  'squadName', 'squadId', 'sportId', 'uniqueSquadId', 'uniquePlayerId')
 
 
 """
 This script inserts data from a JSON file into the static_player_info table in the database.
 This table stores static information about players, such as their names, squad details, and sport ID.
+
+The file is parsed in chunks and each chunk is upserted with one batched executemany.
+The checksum and row count of the loaded file are kept in the table's comment, so when the file hasn't
+changed since the last load (and the table still holds every row) the load is skipped entirely.
+Dropping the table drops the comment with it, so a rebuilt database is always reloaded.
 """
 
 
-def insert_data_from_json_into_static_player_info():
+# Function to build the marker stored in the table comment
+def load_marker(checksum, row_count):
+    """Return the table comment that records which file version was loaded."""
+    return f"player_info.json sha256:{checksum} rows:{row_count}"
+
+
+# Function to check if the current file version is already loaded
+def is_already_loaded(cursor, checksum):
+    """Check if the table comment matches the file checksum and the table still holds every loaded row."""
+    cursor.execute("""
+        SELECT TABLE_COMMENT
+        FROM INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'static_player_info'
+    """)
+    row = cursor.fetchone()
+    if row is None or f"sha256:{checksum} " not in (row[0] or ''):
+        return False
+
+    cursor.execute("SELECT COUNT(*) FROM static_player_info")
+    return row[0] == load_marker(checksum, cursor.fetchone()[0])
+
+
+# Function to read the NDJSON file in chunks of row tuples
+def iter_player_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """Yield lists of up to chunk_size player tuples, parsed from the NDJSON file."""
+    with open(file_path, 'r') as file:
+        while True:
+            lines = list(islice(file, chunk_size))
+            if not lines:
+                break
+            chunk = []
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                player = json.loads(line)  # Read each line as a JSON object
+                chunk.append(tuple(player.get(column) for column in PLAYER_COLUMNS))
+            yield chunk
+
+
+# Function to load player_info.json into the static_player_info table
+def insert_data_from_json_into_static_player_info(force=False):
+    """
+    Load player_info.json into the static_player_info table, unless this version of the file is already loaded.
+
+    Parameters:
+    force (bool): Reload the file even if its checksum matches the last load.
+    """
+    connection = None
+    cursor = None
     try:
         # Connect to the database
         connection = connect()
@@ -25,59 +86,52 @@ def insert_data_from_json_into_static_player_info():
         if connection:
             cursor = connection.cursor()
 
+            checksum = file_checksum(JSON_FILE_PATH)
+            if not force and is_already_loaded(cursor, checksum):
+                print("player_info.json is unchanged since the last load, skipping 'static_player_info'.")
+                return
+
             # SQL query to insert data
-            insert_query = """
-            INSERT INTO static_player_info (playerId, firstname, surname, displayName, shortDisplayName, squadName, squadId, sportId, uniqueSquadId, uniquePlayerId)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE 
-                firstname=VALUES(firstname), 
-                surname=VALUES(surname), 
-                displayName=VALUES(displayName),
-                shortDisplayName=VALUES(shortDisplayName),
-                squadName=VALUES(squadName),
-                squadId=VALUES(squadId),
-                sportId=VALUES(sportId),
-                uniqueSquadId=VALUES(uniqueSquadId),
-                uniquePlayerId=VALUES(uniquePlayerId);
+            columns = ', '.join(PLAYER_COLUMNS)
+            placeholders = ', '.join(['%s'] * len(PLAYER_COLUMNS))
+            update_clause = ', '.join(f"{column}=VALUES({column})" for column in PLAYER_COLUMNS[1:])
+            insert_query = f"""
+            INSERT INTO static_player_info ({columns})
+            VALUES ({placeholders})
+            ON DUPLICATE KEY UPDATE {update_clause}
             """
 
-            # Load the JSON data from the file (NDJSON format, read line by line)
-            with open(JSON_FILE_PATH, 'r') as file:
-                for line in file:
-                    player = json.loads(line.strip())  # Read each line as a JSON object
-                    
-                    # Prepare the data tuple
-                    data = (
-                        player.get('playerId'),
-                        player.get('firstname'),
-                        player.get('surname'),
-                        player.get('displayName'),
-                        player.get('shortDisplayName'),
-                        player.get('squadName'),
-                        player.get('squadId'),
-                        player.get('sportId'),
-                        player.get('uniqueSquadId'),
-                        player.get('uniquePlayerId')
-                    )
-                    
-                    # Execute the insert query for each player
-                    cursor.execute(insert_query, data)
-
-            # Commit the transaction
+            # Start from an empty table, so players removed from the file don't linger
+            cursor.execute("TRUNCATE TABLE static_player_info")
+
+            # Upsert the file one chunk at a time, each chunk is sent as a multi-row INSERT
+            row_count = 0
+            for chunk in iter_player_chunks(JSON_FILE_PATH):
+                cursor.executemany(insert_query, chunk)
+                row_count += len(chunk)
             connection.commit()
-            print("Data has been successfully inserted into 'static_player_info'.")
 
-        # Close the connection
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
-            print("MySQL connection is closed.")
+            # Record the loaded version, COUNT(*) is compared against it because duplicate playerIds collapse
+            cursor.execute("SELECT COUNT(*) FROM static_player_info")
+            loaded_rows = cursor.fetchone()[0]
+            cursor.execute(f"ALTER TABLE static_player_info COMMENT = '{load_marker(checksum, loaded_rows)}'")
+            print(f"Data has been successfully inserted into 'static_player_info' ({row_count} lines, {loaded_rows} players).")
 
     except Error as e:
         print(f"Error occurred: {e}")
+    except OSError as oe:
+        # e.g. no player_info.json yet, the scrape can still run without static_player_info
+        print(f"Error reading {JSON_FILE_PATH}: {oe}")
     except json.JSONDecodeError as je:
         print(f"Error decoding JSON: {je}")
+    finally:
+        # Close the connection
+        if connection and connection.is_connected():
+            if cursor:
+                cursor.close()
+            connection.close()
+            print("MySQL connection is closed.")
 
 # Run the function to insert data from JSON into the static_player_info table
 if __name__ == "__main__":
-    insert_data_from_json_into_static_player_info()
+    insert_data_from_json_into_static_player_info(force='--force' in sys.argv)
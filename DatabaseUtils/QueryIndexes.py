@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from DatabaseUtils.SqlConnector import connect
+from DatabaseUtils.CreateScriptParser import PROJECT_ROOT, load_create_scripts
+
+"""
+Builds, drops and rebuilds the secondary indexes the sport tables are queried through.
+
+The create scripts only define primary keys (for the upserts) and foreign keys. The indexes for the access patterns
+we actually run (player by season, squad by round, match by date) are declared per table category in
+Assets/jsons/query_indexes.json, under 'default' for every sport and under 'sports' for extra per-sport indexes.
+
+All the indexes of a table are added or dropped in one ALTER TABLE, so each table is only rebuilt once.
+During a bulk load, deferred_query_indexes() drops the indexes first and builds them again once the load is done,
+which is much faster than maintaining them row by row. main.py and SpoolLoader.py defer them around their loads.
+
+Usage:
+    python DatabaseUtils/QueryIndexes.py --build [--sport "AFL Mens"]
+    python DatabaseUtils/QueryIndexes.py --drop
+    python DatabaseUtils/QueryIndexes.py --rebuild
+"""
+
+QUERY_INDEXES_JSON = os.path.join(PROJECT_ROOT, 'Assets', 'jsons', 'query_indexes.json')
+
+
+# Function to load the declared index set of every table
+def load_index_set(sport=None, table_suffix=''):
+    """
+    Resolve query_indexes.json against the create scripts.
+
+    Parameters:
+    sport (str): Only return the indexes of this sport's tables, e.g. 'AFL Mens'.
+    table_suffix (str): Suffix added to every table name, e.g. '_staging'.
+
+    Returns:
+    dict: Table name to a list of (index name, columns) tuples.
+    """
+    with open(QUERY_INDEXES_JSON, 'r') as json_file:
+        index_config = json.load(json_file)
+
+    index_set = {}
+    for table in load_create_scripts():
+        if sport is not None and table['sport'] != sport:
+            continue
+        declared = index_config['default'].get(table['category'], [])
+        declared = declared + index_config['sports'].get(table['sport'], {}).get(table['category'], [])
+
+        table_columns = {column for column, _ in table['columns']}
+        indexes = []
+        for index in declared:
+            missing_columns = [column for column in index['columns'] if column not in table_columns]
+            if missing_columns:
+                print(f"Skipping {index['name']} on {table['table_name']}, missing columns: {missing_columns}")
+                continue
+            indexes.append((index['name'], tuple(index['columns'])))
+        if indexes:
+            index_set[f"{table['table_name']}{table_suffix}"] = indexes
+    return index_set
+
+
+# Function to fetch the secondary index names of every table
+def get_existing_indexes(connection):
+    """Return a dict of table name to the set of its index names."""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT DISTINCT TABLE_NAME, INDEX_NAME
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+    """)
+    existing = {}
+    for table_name, index_name in cursor.fetchall():
+        existing.setdefault(table_name, set()).add(index_name)
+    cursor.close()
+    return existing
+
+
+# Function to build the ADD INDEX clause of an index
+def index_definition(index_name, columns):
+    """Return the INDEX definition of a declared index, as used in CREATE TABLE or ALTER TABLE ... ADD."""
+    column_list = ', '.join(f"`{column}`" for column in columns)
+    return f"INDEX `{index_name}` ({column_list})"
+
+
+# Function to add every declared index that is missing
+def build_query_indexes(connection, index_set):
+    """Add the missing declared indexes, with one ALTER TABLE per table."""
+    existing = get_existing_indexes(connection)
+    cursor = connection.cursor()
+    for table_name, indexes in index_set.items():
+        if table_name not in existing:
+            continue
+        missing = [(name, columns) for name, columns in indexes if name not in existing[table_name]]
+        if not missing:
+            continue
+        clauses = ', '.join(f"ADD {index_definition(name, columns)}" for name, columns in missing)
+        cursor.execute(f"ALTER TABLE `{table_name}` {clauses}")
+        print(f"Built {len(missing)} query indexes on {table_name}")
+    cursor.close()
+
+
+# Function to drop every declared index that exists
+def drop_query_indexes(connection, index_set):
+    """Drop the declared indexes that exist, with one ALTER TABLE per table."""
+    existing = get_existing_indexes(connection)
+    cursor = connection.cursor()
+    for table_name, indexes in index_set.items():
+        present = [name for name, _ in indexes if name in existing.get(table_name, set())]
+        if not present:
+            continue
+        clauses = ', '.join(f"DROP INDEX `{name}`" for name in present)
+        cursor.execute(f"ALTER TABLE `{table_name}` {clauses}")
+        print(f"Dropped {len(present)} query indexes on {table_name}")
+    cursor.close()
+
+
+# Function to drop and build every declared index again
+def rebuild_query_indexes(connection, index_set):
+    """Drop the declared indexes and build them again, e.g. after their columns in query_indexes.json changed."""
+    drop_query_indexes(connection, index_set)
+    build_query_indexes(connection, index_set)
+
+
+# Context manager to keep the query indexes out of the way of a bulk load
+@contextmanager
+def deferred_query_indexes(connection, index_set):
+    """Drop the declared indexes for the duration of a bulk load, and build them again once it is done."""
+    drop_query_indexes(connection, index_set)
+    try:
+        yield
+    finally:
+        build_query_indexes(connection, index_set)
+
+
+# Function to run one of the index actions on a new connection
+def run_index_action(action, sport=None):
+    """Run 'build', 'drop' or 'rebuild' on the declared index set."""
+    connection = connect()
+    if connection is None:
+        logging.error("Failed to connect to the database.")
+        print("Failed to connect to the database.")
+        return
+
+    try:
+        index_set = load_index_set(sport)
+        {'build': build_query_indexes, 'drop': drop_query_indexes, 'rebuild': rebuild_query_indexes}[action](
+            connection, index_set)
+    except Exception as e:
+        logging.error(f"Error during query index {action}: {e}")
+        print(f"Error during query index {action}: {e}")
+    finally:
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build, drop or rebuild the declared query indexes.")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--build', dest='action', action='store_const', const='build')
+    action.add_argument('--drop', dest='action', action='store_const', const='drop')
+    action.add_argument('--rebuild', dest='action', action='store_const', const='rebuild')
+    parser.add_argument('--sport', help="Only this sport's tables, e.g. 'AFL Mens'.")
+    args = parser.parse_args()
+
+    run_index_action(args.action, args.sport)
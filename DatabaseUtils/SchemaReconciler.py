@@ -0,0 +1,241 @@
+import os
+import re
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from DatabaseUtils.SqlConnector import connect
+from DatabaseUtils.CreateScriptParser import load_create_scripts, build_create_table
+
+"""
+Brings the database schema in line with the create scripts without dropping any data.
+
+Every create script listed in sql_create_queries_file_paths.json is parsed and compared with INFORMATION_SCHEMA:
+- Missing tables are created.
+- Missing columns are added in script order, and columns whose type or nullability changed are modified.
+- A changed primary key, and missing foreign keys and secondary indexes, are added.
+- Columns that are in the database but not in the script are only reported, unless --drop-columns is given.
+- Tables partitioned by PartitionManager keep their extended primary key and stay without foreign keys,
+  since InnoDB doesn't allow foreign keys on (or to) partitioned tables.
+
+All changes to a table are applied in one ALTER TABLE, so adding a column takes seconds instead of a
+drop, recreate and full re-scrape with Reconstructor.py. Column defaults are not compared.
+
+Run with --dry-run to print the statements without executing them.
+"""
+
+TYPE_PATTERN = re.compile(r'^(\w+(?:\s*\([^)]*\))?(?:\s+UNSIGNED)?)', re.IGNORECASE)
+INTEGER_WIDTH_PATTERN = re.compile(r'^(tinyint|smallint|mediumint|int|bigint|year)\(\d+\)')
+KEY_COLUMNS_PATTERN = re.compile(r'\(([^)]*)\)')
+FOREIGN_KEY_PATTERN = re.compile(
+    r'FOREIGN\s+KEY\s*\(([^)]*)\)\s*REFERENCES\s+`?(\w+)`?\s*\(([^)]*)\)', re.IGNORECASE)
+
+
+# Function to normalise a column type so script and INFORMATION_SCHEMA types can be compared
+def normalize_type(column_type):
+    """Lower case a column type, drop integer display widths and collapse whitespace, e.g. 'INT(11)' -> 'int'."""
+    column_type = re.sub(r'\s+', ' ', column_type.strip().lower())
+    column_type = re.sub(r'\s*\(\s*', '(', column_type).replace(' )', ')')
+    column_type = 'int' + column_type[len('integer'):] if column_type.startswith('integer') else column_type
+    return INTEGER_WIDTH_PATTERN.sub(r'\1', column_type)
+
+
+# Function to split a bracketed key column list into column names
+def key_columns(column_list):
+    """Turn 'a, `b`' into ('a', 'b')."""
+    return tuple(column.strip().strip('`') for column in column_list.split(',') if column.strip())
+
+
+# Function to read the type and nullability of a column from its script definition
+def script_column_spec(definition, primary_key_columns, column_name):
+    """Return the normalised type of a script column and whether it is nullable."""
+    column_type = normalize_type(TYPE_PATTERN.match(definition).group(1))
+    nullable = 'NOT NULL' not in definition.upper() and column_name not in primary_key_columns
+    return column_type, nullable
+
+
+# Function to load the current schema of every table from INFORMATION_SCHEMA
+def get_live_schema(connection):
+    """
+    Read the columns, keys, foreign keys and partitioning of every table in four queries.
+
+    Returns:
+    dict: Lower case table name to a dict with 'name', 'columns', 'primary_key', 'indexes', 'foreign_keys' and 'partitioned'.
+    """
+    cursor = connection.cursor()
+    schema = {}
+
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """)
+    for table_name, column_name, column_type, is_nullable in cursor.fetchall():
+        table = schema.setdefault(table_name.lower(), {
+            'name': table_name, 'columns': {}, 'primary_key': (), 'indexes': {}, 'foreign_keys': set(),
+            'partitioned': False})
+        table['columns'][column_name] = (normalize_type(column_type), is_nullable == 'YES')
+
+    cursor.execute("""
+        SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """)
+    for table_name, index_name, column_name in cursor.fetchall():
+        table = schema.get(table_name.lower())
+        if table is None:
+            continue
+        if index_name == 'PRIMARY':
+            table['primary_key'] += (column_name,)
+        else:
+            table['indexes'][index_name] = table['indexes'].get(index_name, ()) + (column_name,)
+
+    cursor.execute("""
+        SELECT TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+        ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+    """)
+    foreign_keys = {}
+    for table_name, constraint_name, column_name, referenced_table, referenced_column in cursor.fetchall():
+        columns, _, referenced_columns = foreign_keys.setdefault(
+            (table_name.lower(), constraint_name), ([], referenced_table.lower(), []))
+        columns.append(column_name)
+        referenced_columns.append(referenced_column)
+    for (table_name, _), (columns, referenced_table, referenced_columns) in foreign_keys.items():
+        if table_name in schema:
+            schema[table_name]['foreign_keys'].add((tuple(columns), referenced_table, tuple(referenced_columns)))
+
+    cursor.execute("""
+        SELECT DISTINCT TABLE_NAME
+        FROM INFORMATION_SCHEMA.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND PARTITION_NAME IS NOT NULL
+    """)
+    for (table_name,) in cursor.fetchall():
+        if table_name.lower() in schema:
+            schema[table_name.lower()]['partitioned'] = True
+
+    cursor.close()
+    return schema
+
+
+# Function to work out the ALTER TABLE clauses that bring a table in line with its script
+def diff_table(table, live_table, drop_columns=False, partitioned_tables=frozenset()):
+    """
+    Compare a parsed create script with the live table.
+
+    Parameters:
+    table (dict): The parsed create script, from load_create_scripts.
+    live_table (dict): The live table, from get_live_schema.
+    drop_columns (bool): Drop columns that are not in the script instead of only reporting them.
+    partitioned_tables (set): Lower case names of partitioned tables, which foreign keys can't reference.
+
+    Returns:
+    tuple: The list of ALTER TABLE clauses and the list of columns that are only in the database.
+    """
+    clauses = []
+    primary_key = key_columns(KEY_COLUMNS_PATTERN.search(table['primary_key']).group(1)) if table['primary_key'] else ()
+    live_columns = live_table['columns']
+
+    # Columns, added after the column before them in the script so the column order is kept
+    previous_column = None
+    for column_name, definition in table['columns']:
+        position = f"AFTER `{previous_column}`" if previous_column else "FIRST"
+        if column_name not in live_columns:
+            clauses.append(f"ADD COLUMN `{column_name}` {definition} {position}")
+        elif script_column_spec(definition, primary_key, column_name) != live_columns[column_name]:
+            clauses.append(f"MODIFY COLUMN `{column_name}` {definition}")
+        previous_column = column_name
+
+    script_columns = {column_name for column_name, _ in table['columns']}
+    extra_columns = [column_name for column_name in live_columns if column_name not in script_columns]
+    if drop_columns:
+        clauses.extend(f"DROP COLUMN `{column_name}`" for column_name in extra_columns)
+
+    # Primary key, partitioned tables have the partition column added to theirs
+    if primary_key and primary_key != live_table['primary_key'] and not live_table['partitioned']:
+        if live_table['primary_key']:
+            clauses.append("DROP PRIMARY KEY")
+        clauses.append(table['primary_key'])
+
+    # Secondary indexes, matched on their column list
+    live_indexes = set(live_table['indexes'].values())
+    for index in table['indexes']:
+        if key_columns(KEY_COLUMNS_PATTERN.search(index).group(1)) not in live_indexes:
+            clauses.append(f"ADD {index}")
+
+    # Foreign keys, matched on their columns and the columns they reference
+    for foreign_key in table['foreign_keys']:
+        match = FOREIGN_KEY_PATTERN.search(foreign_key)
+        key = (key_columns(match.group(1)), match.group(2).lower(), key_columns(match.group(3)))
+        if live_table['partitioned'] or key[1] in partitioned_tables:
+            continue
+        if key not in live_table['foreign_keys']:
+            clauses.append(f"ADD {foreign_key}")
+
+    return clauses, extra_columns
+
+
+# Function to bring every table in line with the create scripts
+def reconcile_schema(dry_run=False, drop_columns=False):
+    """
+    Create missing tables and alter existing ones to match the create scripts, keeping their data.
+
+    Parameters:
+    dry_run (bool): Print the statements without executing them.
+    drop_columns (bool): Drop columns that are in the database but not in the create scripts.
+
+    Returns:
+    list: The statements that were executed (or would be, on a dry run).
+    """
+    connection = connect()
+    if connection is None:
+        logging.error("Failed to connect to the database.")
+        print("Failed to connect to the database.")
+        return []
+
+    statements = []
+    try:
+        live_schema = get_live_schema(connection)
+        partitioned_tables = {name for name, live_table in live_schema.items() if live_table['partitioned']}
+        cursor = connection.cursor()
+
+        # Tables are in file order, info tables first, so foreign keys always reference existing tables
+        for table in load_create_scripts():
+            live_table = live_schema.get(table['table_name'].lower())
+            if live_table is None:
+                statement = build_create_table(
+                    table['table_name'], table['columns'], table['primary_key'],
+                    table['foreign_keys'], table['indexes'], table['table_options'])
+            else:
+                clauses, extra_columns = diff_table(table, live_table, drop_columns, partitioned_tables)
+                if extra_columns and not drop_columns:
+                    print(f"{live_table['name']} has columns that are not in its create script: {extra_columns}")
+                if not clauses:
+                    continue
+                statement = f"ALTER TABLE `{live_table['name']}`\n    " + ',\n    '.join(clauses) + ';'
+
+            statements.append(statement)
+            print(statement)
+            if not dry_run:
+                cursor.execute(statement)
+                print(f"Reconciled table: {table['table_name']}")
+
+        cursor.close()
+        connection.commit()
+        if not statements:
+            print("The database schema already matches the create scripts.")
+    except Exception as e:
+        logging.error(f"Error reconciling the schema: {e}")
+        print(f"Error reconciling the schema: {e}")
+    finally:
+        connection.close()
+        print("MySQL connection closed.")
+    return statements
+
+
+if __name__ == "__main__":
+    reconcile_schema(dry_run='--dry-run' in sys.argv, drop_columns='--drop-columns' in sys.argv)
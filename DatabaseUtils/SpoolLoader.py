@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from mysql.connector import Error as mysql_error
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from Core.Scraper import Scraper
+from Core.Sinks import SPOOL_DIR, FixtureRecords, list_segments
+from DatabaseUtils.QueryIndexes import load_index_set, deferred_query_indexes
+
+"""
+Loads the fixtures spooled by SpoolSink into MySQL, separately from the scrape.
+
+Run the scraper with `python main.py --sinks=spool --no-database` and it only appends every fixture to write-ahead
+segments under Spool/, so a slow or unavailable database never holds up (or fails) the scrape.
+This loader reads the segments in order and upserts every fixture with the same code and group commit
+policy as the scraper (Scraper.load_fixture_records).
+
+While a pass has fixtures to load, the query indexes (query_indexes.json) are dropped and built again once the
+pass is done, instead of being maintained row by row.
+
+Progress is kept in Spool/checkpoint.json as the segment and byte offset after the last committed fixture.
+It is only moved forward once a commit has gone through, so a crashed or restarted loader picks up where
+the last commit left off. Fixtures loaded again after a crash are upserted over themselves.
+
+A fixture that fails to load is rolled back with the rest of its commit group, which is loaded again without it.
+The fixture is added to BrokenFixtures.json like in the scraper, and its line stays in the segment.
+If the connection itself is lost, nothing is skipped: the loader stops, or with --follow waits and retries.
+
+Usage:
+    python DatabaseUtils/SpoolLoader.py             Load everything spooled so far
+    python DatabaseUtils/SpoolLoader.py --follow    Keep tailing the segments as the scraper writes them
+"""
+
+CHECKPOINT_FILE = 'checkpoint.json'
+POLL_INTERVAL = 10  # Seconds between passes over the segments with --follow
+
+
+# Function to load the loader checkpoint
+def load_checkpoint(spool_dir):
+    """Return the segment and byte offset after the last committed fixture, or (None, 0) before the first load."""
+    checkpoint_path = os.path.join(spool_dir, CHECKPOINT_FILE)
+    if not os.path.exists(checkpoint_path):
+        return None, 0
+    with open(checkpoint_path, 'r') as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+    return checkpoint['segment'], checkpoint['offset']
+
+
+# Function to save the loader checkpoint
+def save_checkpoint(spool_dir, segment, offset):
+    """Save the segment and byte offset after the last committed fixture, with an atomic rename."""
+    checkpoint_path = os.path.join(spool_dir, CHECKPOINT_FILE)
+    with open(f"{checkpoint_path}.tmp", 'w') as checkpoint_file:
+        json.dump({'segment': segment, 'offset': offset}, checkpoint_file)
+    os.replace(f"{checkpoint_path}.tmp", checkpoint_path)
+
+
+# Function to read the spooled fixtures after a checkpoint
+def iter_spooled_fixtures(spool_dir, checkpoint_segment, checkpoint_offset):
+    """
+    Yield (segment, offset after the line, FixtureRecords) for every complete line after the checkpoint.
+    A last line without its newline is still being written by the scraper and is left for the next pass.
+    """
+    for segment in list_segments(spool_dir):
+        if checkpoint_segment is not None and segment < checkpoint_segment:
+            continue
+        offset = checkpoint_offset if segment == checkpoint_segment else 0
+
+        with open(os.path.join(spool_dir, segment), 'rb') as segment_file:
+            segment_file.seek(offset)
+            for line in segment_file:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                yield segment, offset, FixtureRecords.from_dict(json.loads(line))
+
+
+# Function to check for spooled fixtures after the checkpoint
+def has_pending_fixtures(spool_dir):
+    """Check if there is at least one complete spooled fixture after the checkpoint."""
+    return next(iter_spooled_fixtures(spool_dir, *load_checkpoint(spool_dir)), None) is not None
+
+
+# Function to load every spooled fixture after the checkpoint
+def load_pending_fixtures(scraper, spool_dir):
+    """
+    Load every complete spooled fixture after the checkpoint, moving the checkpoint forward at every commit.
+
+    Returns:
+    int: The number of fixtures committed.
+
+    Raises:
+    ConnectionError: If the database connection was lost, with everything since the last commit rolled back.
+    """
+    skipped = set()
+    committed = 0
+    while True:
+        checkpoint_segment, checkpoint_offset = load_checkpoint(spool_dir)
+        position = None
+        loaded = 0  # Fixtures loaded since the last commit
+        failed = False
+
+        for segment, offset, records in iter_spooled_fixtures(spool_dir, checkpoint_segment, checkpoint_offset):
+            if (segment, offset) not in skipped:
+                if not scraper.load_fixture_records(records):
+                    failed = True
+                    break
+                loaded += 1
+            position = (segment, offset)
+            if scraper.db_helper.pending_fixtures == 0:
+                save_checkpoint(spool_dir, *position)
+                committed += loaded
+                loaded = 0
+
+        if not failed:
+            scraper.db_helper.commit_pending()
+            if position is not None:
+                save_checkpoint(spool_dir, *position)
+            return committed + loaded
+
+        # The failed fixture may have taken its whole commit group with it, so load the group again without it
+        scraper.db_helper.rollback_pending()
+        if not scraper.connection.is_connected():
+            raise ConnectionError(f"Lost the database connection while loading {segment} at offset {offset}.")
+        skipped.add((segment, offset))
+        logging.error(f"Skipping fixture {records.fixture_id} from {segment}, it could not be loaded.")
+        print(f"Skipping fixture {records.fixture_id} from {segment}, it could not be loaded.")
+
+
+# Function to delete the segments that are fully loaded
+def prune_segments(spool_dir):
+    """Delete the segments before the checkpoint segment, every fixture in them has been committed."""
+    checkpoint_segment, _ = load_checkpoint(spool_dir)
+    if checkpoint_segment is None:
+        return
+    for segment in list_segments(spool_dir):
+        if segment < checkpoint_segment:
+            os.remove(os.path.join(spool_dir, segment))
+            print(f"Deleted loaded segment {segment}")
+
+
+# Function to load the spool, once or continuously
+def load_spool(spool_dir=SPOOL_DIR, follow=False, prune=False, table_suffix=''):
+    """
+    Load the spooled fixtures into MySQL.
+
+    Parameters:
+    spool_dir (str): The folder the SpoolSink writes its segments to.
+    follow (bool): Keep polling the segments for new fixtures, and keep retrying when the database is unavailable.
+    prune (bool): Delete segments once every fixture in them has been committed.
+    table_suffix (str): Suffix added to every table written to, e.g. '_staging'.
+    """
+    scraper = None
+    index_set = load_index_set(table_suffix=table_suffix)
+    while True:
+        try:
+            if scraper is None:
+                scraper = Scraper(table_suffix=table_suffix)
+            if has_pending_fixtures(spool_dir):
+                # Keep the query indexes out of the bulk load, they are built again once the pass is committed
+                with deferred_query_indexes(scraper.connection, index_set):
+                    loaded = load_pending_fixtures(scraper, spool_dir)
+                print(f"Loaded {loaded} spooled fixtures.")
+            if prune:
+                prune_segments(spool_dir)
+        except (ConnectionError, mysql_error) as e:
+            # A MySQL error with the connection still up is a real error, not an outage to wait out
+            if isinstance(e, mysql_error) and scraper is not None and scraper.connection.is_connected():
+                raise
+            logging.error(f"Spool loader lost the database: {e}")
+            print(f"Spool loader lost the database: {e}")
+            scraper = None
+            if not follow:
+                return
+
+        if not follow:
+            break
+        time.sleep(POLL_INTERVAL)
+
+    scraper.connection.close()
+    print("MySQL connection closed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the fixtures spooled by the scraper into MySQL.")
+    parser.add_argument('--follow', action='store_true', help="Keep tailing the segments for new fixtures.")
+    parser.add_argument('--prune', action='store_true', help="Delete segments once they are fully loaded.")
+    parser.add_argument('--spool-dir', default=SPOOL_DIR, help="The folder the segments are in.")
+    args = parser.parse_args()
+
+    load_spool(args.spool_dir, follow=args.follow, prune=args.prune)
@@ -0,0 +1,163 @@
+import os
+import sys
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from DatabaseUtils.SqlConnector import connect
+from DatabaseUtils.CreateScriptParser import load_create_scripts, build_create_table, rename_references, REFERENCES_PATTERN
+from DatabaseUtils.PartitionManager import get_partitions, partition_table
+from DatabaseUtils.QueryIndexes import load_index_set, index_definition
+from Core.Scraper import Scraper
+
+"""
+Rebuilds the database without downtime by scraping into staging copies of every table.
+
+1. A '_staging' copy of every table in sql_create_queries_file_paths.json is created, with only its primary key.
+   Tables partitioned by season in production (see PartitionManager) get partitioned staging copies.
+2. The scraper bulk-loads the staging tables, without foreign keys or secondary indexes slowing the inserts down.
+   It splits every new season out of the staging tables' 'p_future' partition as it reaches it.
+3. The deferred foreign keys, indexes and query indexes (query_indexes.json) are built once the load is done.
+   Foreign keys from or to a partitioned table are left out, since InnoDB doesn't allow them.
+4. Every staging table is swapped in with one atomic RENAME TABLE, and the old tables are dropped.
+
+Readers keep seeing the old tables for the whole scrape. InnoDB moves foreign keys along with a renamed
+parent table, so the staging foreign keys point at the production names once the swap is done.
+"""
+
+STAGING_SUFFIX = '_staging'
+OLD_SUFFIX = '_old'
+
+
+# Function to fetch the names of every table in the current database
+def get_existing_tables(connection):
+    """Return the set of table names in the current database."""
+    cursor = connection.cursor()
+    cursor.execute("SHOW TABLES;")
+    tables = {table[0] for table in cursor.fetchall()}
+    cursor.close()
+    return tables
+
+
+# Function to find the tables that are partitioned in production
+def get_partitioned_tables(connection, tables):
+    """Return the names of the tables that are currently partitioned, so their staging copies can be too."""
+    return {table['table_name'] for table in tables if get_partitions(connection, table['table_name'])}
+
+
+# Function to create a blank staging copy of every table
+def create_staging_tables(connection, tables, partitioned_tables=frozenset()):
+    """
+    Drop any leftover staging tables and create the staging copies with only their primary keys.
+    The copies of partitioned tables are partitioned the same way, empty except for 'p_future'.
+    """
+    cursor = connection.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+    for table in tables:
+        staging_name = f"{table['table_name']}{STAGING_SUFFIX}"
+        cursor.execute(f"DROP TABLE IF EXISTS `{staging_name}`;")
+        cursor.execute(build_create_table(
+            staging_name, table['columns'], table['primary_key'], table_options=table['table_options']))
+        print(f"Created staging table: {staging_name}")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+    connection.commit()
+    cursor.close()
+
+    for table in tables:
+        if table['table_name'] in partitioned_tables:
+            partition_table(connection, f"{table['table_name']}{STAGING_SUFFIX}")
+
+
+# Function to build the indexes and foreign keys that were deferred during the load
+def build_deferred_indexes(connection, tables, partitioned_tables=frozenset()):
+    """
+    Add every secondary index, query index and foreign key to the staging tables in one ALTER TABLE per table.
+    Foreign keys on or referencing a partitioned table are skipped.
+    """
+    query_indexes = load_index_set()
+    cursor = connection.cursor()
+
+    # The data was loaded by the scraper, so the foreign keys don't need to be validated row by row
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+    for table in tables:
+        staging_name = f"{table['table_name']}{STAGING_SUFFIX}"
+        definitions = list(table['indexes'])
+        definitions += [index_definition(name, columns) for name, columns in query_indexes.get(table['table_name'], [])]
+        if table['table_name'] not in partitioned_tables:
+            definitions += [
+                rename_references(foreign_key, STAGING_SUFFIX) for foreign_key in table['foreign_keys']
+                if REFERENCES_PATTERN.search(foreign_key).group(2) not in partitioned_tables]
+        if not definitions:
+            continue
+        alter_clause = ', '.join(f"ADD {definition}" for definition in definitions)
+        cursor.execute(f"ALTER TABLE `{staging_name}` {alter_clause};")
+        print(f"Built {len(definitions)} deferred indexes on {staging_name}")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+    connection.commit()
+    cursor.close()
+
+
+# Function to swap the staging tables in with one atomic RENAME TABLE
+def swap_staging_tables(connection, tables):
+    """Rename every production table to '_old' and every staging table to its production name in one statement."""
+    existing_tables = get_existing_tables(connection)
+    cursor = connection.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+
+    # Clear out leftovers of an earlier swap so the rename can't collide with them
+    for table in tables:
+        cursor.execute(f"DROP TABLE IF EXISTS `{table['table_name']}{OLD_SUFFIX}`;")
+
+    renames = []
+    for table in tables:
+        table_name = table['table_name']
+        if table_name in existing_tables:
+            renames.append(f"`{table_name}` TO `{table_name}{OLD_SUFFIX}`")
+        renames.append(f"`{table_name}{STAGING_SUFFIX}` TO `{table_name}`")
+    cursor.execute(f"RENAME TABLE {', '.join(renames)};")
+    print(f"Swapped in {len(tables)} tables.")
+
+    for table in tables:
+        cursor.execute(f"DROP TABLE IF EXISTS `{table['table_name']}{OLD_SUFFIX}`;")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+    connection.commit()
+    cursor.close()
+    print("Dropped the old tables.")
+
+
+# Function to run a full rebuild through the staging tables
+def rebuild_with_staging():
+    """Rebuild every table through staging copies and swap them in once the scrape is done."""
+    tables = load_create_scripts()
+    connection = connect()
+    if connection is None:
+        logging.error("Failed to connect to the database.")
+        print("Failed to connect to the database.")
+        return
+
+    try:
+        partitioned_tables = get_partitioned_tables(connection, tables)
+
+        print("Creating staging tables...")
+        create_staging_tables(connection, tables, partitioned_tables)
+
+        print("Scraping into the staging tables...")
+        scraper = Scraper(table_suffix=STAGING_SUFFIX)
+        scraper.scrape_entire_database()
+        scraper.connection.close()
+
+        print("Building deferred indexes...")
+        build_deferred_indexes(connection, tables, partitioned_tables)
+
+        print("Swapping the staging tables in...")
+        swap_staging_tables(connection, tables)
+    except Exception as e:
+        logging.error(f"Error during staging rebuild: {e}")
+        print(f"Error during staging rebuild: {e}")
+    finally:
+        connection.close()
+        print("MySQL connection closed.")
+
+
+if __name__ == "__main__":
+    rebuild_with_staging()
@@ -1,21 +1,70 @@
-import pandas as pd
-import mysql.connector
+import sys
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from SqlConnector import connect
-import warnings
-
-# Suppress specific UserWarning about pandas and SQLAlchemy
-warnings.filterwarnings("ignore", message=".*pandas only support SQLAlchemy.*")
+from ColumnStats import null_columns_from_catalog
 
 """
 This python code exists for testing purposes, to check if there are any columns that are completely NULL in every table in the database.
 This is important because of the sheer amount of columns added over the years some are never even used.
+
+Each table is scanned once: a single SELECT computes COUNT(column) for every column, instead of one query per column.
+Run with --catalog to read the answer from the column_stats catalog the scraper keeps up to date, without any scans.
 """
 
 
+PROFILE_WORKERS = 4  # Tables profiled in parallel, each on its own pooled connection
+
+
+# Function to fetch the column names of a table
+def get_table_columns(connection, table_name):
+    """Return the column names of a table, in column order."""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+    """, (table_name,))
+    columns = [column for (column,) in cursor.fetchall()]
+    cursor.close()
+    return columns
+
+
+# Function to count the non-NULL values of every column of a table in one scan
+def profile_table(connection_pool, table_name):
+    """
+    Count the rows and the non-NULL values of every column of a table with a single aggregate query.
+
+    Parameters:
+    connection_pool (queue.Queue): Pool of MySQL connections to take a connection from.
+    table_name (str): The table to profile.
+
+    Returns:
+    tuple: The row count and a dict of column name to non-NULL count.
+    """
+    connection = connection_pool.get()
+    try:
+        columns = get_table_columns(connection, table_name)
+        counts = ', '.join(f"COUNT(`{column}`)" for column in columns)
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT COUNT(*), {counts} FROM `{table_name}`")
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        connection_pool.put(connection)
+    return row[0], dict(zip(columns, row[1:]))
+
+
 # Function to check if there are any columns that are completely NULL in every table in the database
-def check_null_columns_in_all_tables():
+def check_null_columns_in_all_tables(workers=PROFILE_WORKERS):
     """
     Check if there are any columns that are completely NULL in every table in the database.
+    Every table is scanned once, with COUNT(column) computed for all of its columns at the same time,
+    and the tables are profiled in parallel on a pool of connections.
+
+    Returns:
+    dict: Table name to the list of its completely NULL columns.
     """
     # Connect to the database
     connection = connect()  # Connect to the database
@@ -28,45 +77,69 @@ def check_null_columns_in_all_tables():
 
     # Fetch all table names in the database
     cursor.execute("SHOW TABLES")
-    tables = cursor.fetchall()
-
-    # For each table, check if there are any columns that are completely NULL
-    for table in tables:
-        table_name = table[0]
-        print(f"\nChecking table: {table_name}")
-
-        # Query to fetch all columns and data from the current table
-        query = f"SELECT * FROM {table_name} LIMIT 1"
-        df = pd.read_sql(query, connection)
-
-        # Prepare a query to check if all values in each column are NULL
-        query = f"""
-            SELECT COLUMN_NAME
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_SCHEMA = 'powerdata' AND TABLE_NAME = '{table_name}';
-        """
-
-        columns = pd.read_sql(query, connection)['COLUMN_NAME'].tolist()
-
-        # For each column, check if the count of NULL values is equal to the total count of rows
-        null_columns = []
-        for column in columns:
-            query = f"SELECT COUNT(*) FROM {table_name} WHERE {column} IS NOT NULL"
-            result = pd.read_sql(query, connection)
-
-            if result.iloc[0, 0] == 0:
-                null_columns.append(column)
-
-        # Report columns that are completely NULL
-        if null_columns:
-            print(f"Completely NULL columns in {table_name}: {null_columns}")
-        else:
-            print(f"No completely NULL columns found in {table_name}.")
-
-    # Close the cursor and connection
+    tables = [table[0] for table in cursor.fetchall()]
     cursor.close()
-    connection.close()
+
+    # The first connection joins the pool, the rest are opened for the other workers
+    connection_pool = queue.Queue()
+    connection_pool.put(connection)
+    connections = [connection]
+    for _ in range(min(workers, len(tables)) - 1):
+        worker_connection = connect()
+        if worker_connection is None:
+            break
+        connection_pool.put(worker_connection)
+        connections.append(worker_connection)
+
+    null_columns_by_table = {}
+    try:
+        with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+            futures = {table_name: executor.submit(profile_table, connection_pool, table_name) for table_name in tables}
+
+            # Report in table order, as each table's profile comes in
+            for table_name, future in futures.items():
+                print(f"\nChecking table: {table_name}")
+                _, non_null_counts = future.result()
+
+                # A column is completely NULL when none of its values are NOT NULL
+                null_columns = [column for column, count in non_null_counts.items() if count == 0]
+                null_columns_by_table[table_name] = null_columns
+
+                # Report columns that are completely NULL
+                if null_columns:
+                    print(f"Completely NULL columns in {table_name}: {null_columns}")
+                else:
+                    print(f"No completely NULL columns found in {table_name}.")
+    finally:
+        # Close every pooled connection
+        for pooled_connection in connections:
+            pooled_connection.close()
+
+    return null_columns_by_table
+
+
+# Function to report the completely NULL columns recorded in the column_stats catalog
+def check_null_columns_from_catalog():
+    """Report the columns the scraper has only ever written as NULL, read from the column_stats catalog."""
+    connection = connect()
+    if connection is None:
+        print("Failed to connect to the database.")
+        return
+
+    try:
+        null_columns_by_table = null_columns_from_catalog(connection)
+    finally:
+        connection.close()
+
+    for table_name, null_columns in null_columns_by_table.items():
+        print(f"Completely NULL columns in {table_name}: {null_columns}")
+    if not null_columns_by_table:
+        print("No completely NULL columns found in the catalog.")
+    return null_columns_by_table
 
 
 if __name__ == "__main__":
-    check_null_columns_in_all_tables()
+    if '--catalog' in sys.argv:
+        check_null_columns_from_catalog()
+    else:
+        check_null_columns_in_all_tables()
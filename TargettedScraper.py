@@ -51,5 +51,8 @@ def main():
         except Exception as e:
             print(f"An error occurred while processing fixture {fixture_id}: {e}")
 
+    # Commit any fixtures still waiting on the group commit policy
+    scraper.db_helper.commit_pending()
+
 if __name__ == "__main__":
     main()
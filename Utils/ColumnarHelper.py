@@ -0,0 +1,184 @@
+import os
+import glob
+import pandas as pd
+from Utils.SanitiseFilename import sanitize_filename
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+"""
+Columnar output backend for CsvScraper.
+
+Instead of thousands of small CSVs, every table is written as a dataset per sport, partitioned by season:
+    Data/Columnar/<sport>/<table>/season=<year>/part-<n>.parquet (or .feather)
+
+Rows are buffered per partition and written in files of up to ROW_GROUP_SIZE rows, so each file holds one large
+row group with min/max statistics and zstd compression.
+
+The stat columns differ from one match to the next, so the writer keeps one schema per table: every column keeps
+the type it was first written with, numbers are always stored as doubles (pandas turns an int column into floats
+as soon as one value is missing), and every file carries every column seen so far. Files written before a column
+first appeared don't have it, so load a table with read_columnar_table('Data/Columnar/AFL Mens/match'), which
+unifies the schemas of all its files (pd.read_parquet on the folder takes the schema of the first file only).
+
+Requires the pyarrow package.
+"""
+
+COLUMNAR_ROOT = os.path.join("Data", "Columnar")
+COLUMNAR_FORMATS = ('parquet', 'feather')
+ROW_GROUP_SIZE = 100000  # Rows per file and row group
+MAX_BUFFERED_ROWS = 1000000  # Rows held in memory over all partitions before they are all written
+
+
+def arrow_table(df):
+    """
+    Convert a DataFrame to an Arrow table.
+    Object columns that mix types (e.g. ids that are ints in one match and strings in the next) are stored as strings.
+    """
+    columns = {}
+    for column in df.columns:
+        try:
+            columns[str(column)] = pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns[str(column)] = pa.array(df[column].map(lambda value: None if pd.isnull(value) else str(value)))
+    return pa.table(columns)
+
+
+def normalise_type(data_type):
+    """Return the type a column is stored as: every integer and float type as double, anything else as it is."""
+    if pa.types.is_integer(data_type) or pa.types.is_floating(data_type):
+        return pa.float64()
+    return data_type
+
+
+def conform_column(column, data_type):
+    """Cast a column to the type its table stores it as. Values that can't be converted become null."""
+    if column.type == data_type:
+        return column
+    try:
+        return column.cast(data_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        values = column.to_pandas()
+        if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+            return pa.array(values.map(lambda value: None if pd.isnull(value) else str(value)), type=data_type)
+        if pa.types.is_floating(data_type):
+            return pa.array(pd.to_numeric(values, errors='coerce'), type=data_type, from_pandas=True)
+        return pa.nulls(len(column), type=data_type)
+
+
+def read_columnar_table(table_dir, output_format='parquet'):
+    """
+    Load every season of a table written by ColumnarWriter into one DataFrame, with a 'season' column.
+    The schemas of all files are unified, so columns that only appear in some files are kept (null elsewhere).
+    """
+    if pa is None:
+        raise ImportError("Reading the columnar output needs the pyarrow package, install it with 'pip install pyarrow'.")
+    partitioning = ds.partitioning(pa.schema([('season', pa.string())]), flavor='hive')
+    dataset = ds.dataset(table_dir, format=output_format, partitioning=partitioning)
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if not schemas:
+        return pd.DataFrame()
+    schema = pa.unify_schemas(schemas + [partitioning.schema], promote_options='permissive')
+    return ds.dataset(table_dir, schema=schema, format=output_format, partitioning=partitioning).to_table().to_pandas()
+
+
+class ColumnarWriter:
+    """
+    Buffers the scraped tables in memory and writes them as season partitioned Parquet or Feather datasets.
+    """
+
+    def __init__(self, output_format='parquet', root=COLUMNAR_ROOT):
+        """
+        Parameters:
+        output_format (str): 'parquet' or 'feather'.
+        root (str): The folder the sport datasets are written under.
+        """
+        if pa is None:
+            raise ImportError("The columnar output needs the pyarrow package, install it with 'pip install pyarrow'.")
+        if output_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format '{output_format}', expected one of {COLUMNAR_FORMATS}.")
+
+        self.output_format = output_format
+        self.root = root
+        self.buffers = {}  # Partition folder to a list of DataFrames
+        self.buffered_rows = {}  # Partition folder to its number of buffered rows
+        self.file_counts = {}  # Partition folder to the number of files written to it in this run
+        self.schemas = {}  # Table folder to a dict of column name to stored type, in the order the columns appeared
+
+    def partition_dir(self, sport_category, table, season):
+        """Return the folder of a table's season partition."""
+        season = sanitize_filename(str(season)) if season else 'unknown'
+        return os.path.join(self.root, sanitize_filename(sport_category), table, f"season={season}")
+
+    def add(self, sport_category, table, season, df, key=None):
+        """
+        Buffer the rows of a table, and write the partition once it holds ROW_GROUP_SIZE rows.
+
+        Parameters:
+        sport_category (str): The sport category, e.g. 'AFL Mens'.
+        table (str): 'fixture', 'match', 'period' or 'score_flow'.
+        season (str): The season the rows belong to.
+        df (pandas.DataFrame): The rows.
+        key (str): Unused, accepted so ColumnarWriter and ConsolidatedCsvWriter can be called the same way.
+        """
+        if df.empty:
+            return
+        partition = self.partition_dir(sport_category, table, season)
+        self.buffers.setdefault(partition, []).append(df)
+        self.buffered_rows[partition] = self.buffered_rows.get(partition, 0) + len(df)
+
+        if self.buffered_rows[partition] >= ROW_GROUP_SIZE:
+            self.write_partition(partition)
+        elif sum(self.buffered_rows.values()) >= MAX_BUFFERED_ROWS:
+            self.flush()
+
+    def write_partition(self, partition):
+        """Write the buffered rows of a partition to a new file in it."""
+        frames = self.buffers.pop(partition, [])
+        row_count = self.buffered_rows.pop(partition, 0)
+        if not frames:
+            return
+
+        # The first write of a run replaces the files of an earlier run
+        if partition not in self.file_counts:
+            os.makedirs(partition, exist_ok=True)
+            for old_file in glob.glob(os.path.join(partition, f"part-*.{self.output_format}")):
+                os.remove(old_file)
+            self.file_counts[partition] = 0
+
+        table = self.conform_table(os.path.dirname(partition), arrow_table(pd.concat(frames, ignore_index=True, sort=False)))
+        file_path = os.path.join(partition, f"part-{self.file_counts[partition]}.{self.output_format}")
+        if self.output_format == 'parquet':
+            pq.write_table(table, file_path, row_group_size=ROW_GROUP_SIZE, compression='zstd', write_statistics=True)
+        else:
+            feather.write_feather(table, file_path, compression='zstd', chunksize=ROW_GROUP_SIZE)
+        self.file_counts[partition] += 1
+        print(f"Saved {row_count} rows to {file_path}")
+
+    def conform_table(self, table_dir, table):
+        """
+        Cast a table to the schema kept for its table folder, adding the columns it is missing as nulls.
+        New columns are added to the schema with their type, and a column only seen as null so far gets the
+        first real type it is written with.
+        """
+        schema = self.schemas.setdefault(table_dir, {})
+        columns = {}
+        for name, column in zip(table.column_names, table.columns):
+            column = column.combine_chunks()
+            if name not in schema or pa.types.is_null(schema[name]):
+                schema[name] = normalise_type(column.type)
+            columns[name] = conform_column(column, schema[name])
+        return pa.table({
+            name: columns[name] if name in columns else pa.nulls(table.num_rows, type=data_type)
+            for name, data_type in schema.items()
+        })
+
+    def flush(self):
+        """Write every buffered partition."""
+        for partition in list(self.buffers):
+            self.write_partition(partition)
@@ -1,8 +1,19 @@
+import io
 import os
+import gzip
+import json
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from Utils.SanitiseFilename import sanitize_filename
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
+CSV_COMPRESSION_EXTENSIONS = {None: '', 'gzip': '.gz', 'zstd': '.zst'}  # zstd needs the zstandard package
+CSV_CHUNK_ROWS = 10000  # Rows formatted and compressed per chunk when a CSV is written
+PERIOD_WRITE_WORKERS = 4  # Period files of a match written at the same time
 
 
 def ensure_directory_exists(directory_path):
@@ -12,7 +23,40 @@ def ensure_directory_exists(directory_path):
     if not os.path.exists(directory_path):
         os.makedirs(directory_path)
 
-def save_dataframe_to_csv(df, file_path, force_save=False):
+def compressed_csv_path(file_path, compression=None):
+    """
+    Return the path a CSV is saved to with the given compression, e.g. 'data.csv' -> 'data.csv.gz' for gzip.
+    """
+    if compression not in CSV_COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Unknown CSV compression '{compression}', expected one of {list(CSV_COMPRESSION_EXTENSIONS)}.")
+    return f"{file_path}{CSV_COMPRESSION_EXTENSIONS[compression]}"
+
+def find_csv_file(file_path):
+    """
+    Find a CSV whether it was saved plain or compressed.
+
+    Returns:
+    str: The path of the plain, gzip or zstd file that exists, or None.
+    """
+    for extension in CSV_COMPRESSION_EXTENSIONS.values():
+        if os.path.exists(f"{file_path}{extension}"):
+            return f"{file_path}{extension}"
+    return None
+
+def read_csv_file(file_path, **kwargs):
+    """
+    Read a CSV saved by the scraper, plain or compressed. pandas works out the compression from the extension.
+
+    Parameters:
+    file_path (str): The path of the plain CSV, e.g. '... match 123 data.csv'.
+    kwargs: Passed on to pandas.read_csv.
+    """
+    found_path = find_csv_file(file_path)
+    if found_path is None:
+        raise FileNotFoundError(f"No plain or compressed CSV found for {file_path}")
+    return pd.read_csv(found_path, **kwargs)
+
+def save_dataframe_to_csv(df, file_path, force_save=False, compression=None):
     """
     Save a pandas DataFrame to a CSV file.
 
@@ -20,25 +64,28 @@ def save_dataframe_to_csv(df, file_path, force_save=False):
     df (pandas.DataFrame): The DataFrame to save.
     file_path (str): The full path where the CSV should be saved.
     force_save (bool): If True, the file will be overwritten regardless of existing data.
+    compression (str): None for a plain CSV, or 'gzip' or 'zstd' to stream it compressed, CSV_CHUNK_ROWS rows at a time.
     """
+    file_path = compressed_csv_path(file_path, compression)
     if os.path.exists(file_path) and not force_save:
         print(f"File already exists: {file_path}. Skipping save.")
     else:
-        df.to_csv(file_path, index=False)
+        df.to_csv(file_path, index=False, compression=compression, chunksize=CSV_CHUNK_ROWS)
         print(f"Data saved to {file_path}")
 
-def save_fixture_to_csv(fixture_data, fixture_csv_path):
+def save_fixture_to_csv(fixture_data, fixture_csv_path, compression=None):
     """
     Save fixture data to a CSV file.
 
     Parameters:
     fixture_data (pandas.DataFrame): The DataFrame containing fixture data.
     fixture_csv_path (str): The path where the fixture CSV should be saved.
+    compression (str): None, 'gzip' or 'zstd'.
     """
     ensure_directory_exists(os.path.dirname(fixture_csv_path))
-    save_dataframe_to_csv(fixture_data, fixture_csv_path, force_save=True)
+    save_dataframe_to_csv(fixture_data, fixture_csv_path, force_save=True, compression=compression)
 
-def save_score_flow_to_csv(score_flow_data, league_name_and_season, match_id, match_dir):
+def save_score_flow_to_csv(score_flow_data, league_name_and_season, match_id, match_dir, compression=None):
     """
     Save score flow data to a CSV file.
 
@@ -47,126 +94,322 @@ def save_score_flow_to_csv(score_flow_data, league_name_and_season, match_id, ma
     league_name_and_season (str): The sanitized league name and season, used to generate the file name.
     match_id (int): The ID of the match, used to generate the file name.
     match_dir (str): The directory where the CSV file will be saved.
+    compression (str): None, 'gzip' or 'zstd'.
     """
     ensure_directory_exists(match_dir)
     clean_league_name = sanitize_filename(league_name_and_season)  # Use the sanitize_filename function
     file_name = f'{clean_league_name} match {match_id} score flow.csv'
     output_csv_path = os.path.join(match_dir, file_name)
 
-    save_dataframe_to_csv(score_flow_data, output_csv_path, force_save=True)
+    save_dataframe_to_csv(score_flow_data, output_csv_path, force_save=True, compression=compression)
 
-def save_period_stats_to_csv(df, match_id, additional_data_dir, league_name_and_season):
+def save_period_stats_to_csv(df, match_id, additional_data_dir, league_name_and_season, compression=None):
     """
     Save period stats to individual CSV files based on the period.
     Ensure that the period files do not have redundant year names.
+    The files are compressed with 'gzip' or 'zstd' if a compression is given.
+
+    The rows are split by period in one groupby pass, in the order the periods first appear,
+    and the period files are written on PERIOD_WRITE_WORKERS threads.
     """
     ensure_directory_exists(additional_data_dir)
     if 'period' in df.columns:
-        periods = df['period'].unique()
         clean_league_name = sanitize_filename(league_name_and_season)  # Use the sanitize_filename function
 
-        for i, period in enumerate(periods, start=1):
-            period_df = df[df['period'] == period].copy()
-            period_df['matchId'] = match_id
-            period_df['periodId'] = i
+        with ThreadPoolExecutor(max_workers=PERIOD_WRITE_WORKERS) as executor:
+            futures = []
+            for i, (_, period_df) in enumerate(df.groupby('period', sort=False), start=1):
+                period_df = period_df.assign(matchId=match_id, periodId=i)
+
+                # Ensure the period filename has a clean format, without duplicating the year
+                # Format: {clean_league_name} match {match_id} period {i} details.csv
+                output_csv_path = os.path.join(additional_data_dir, f'{clean_league_name} match {match_id} period {i} details.csv')
 
-            # Ensure the period filename has a clean format, without duplicating the year
-            # Format: {clean_league_name} match {match_id} period {i} details.csv
-            output_csv_path = os.path.join(additional_data_dir, f'{clean_league_name} match {match_id} period {i} details.csv')
+                futures.append(executor.submit(save_dataframe_to_csv, period_df, output_csv_path, compression=compression))
 
-            save_dataframe_to_csv(period_df, output_csv_path)
+            for future in futures:
+                future.result()  # Raise any error from the writer threads
     else:
         print(f"No 'period' data available for match {match_id}.")
 
-def save_unique_fields(sport_category, match_fields):
+SQUAD_INFO_COLUMNS = ['SquadID', 'SquadName', 'FixtureTitle', 'FixtureYear', 'SportID']
+PLAYER_INFO_COLUMNS = ['playerId', 'firstname', 'surname', 'displayName', 'shortDisplayName', 'squadName', 'squadId', 'sportId', 'uniqueSquadId', 'uniquePlayerId']
+ACCUMULATOR_FLUSH_ROWS = 5000
+
+
+class CsvAccumulator:
     """
-    Save unique fields to a CSV file based on the sport category.
+    Collects the rows of a CSV file in memory for a whole scrape, and writes the file once at the end
+    (or every flush_rows new rows) instead of rewriting it for every row.
+
+    Duplicates are dropped as rows are added, using a set of the key columns, so the first row of each key is kept
+    like drop_duplicates(keep='first') did. Rows already in the file are read once, when the accumulator is created.
+    The file is written to a temporary file first and moved over the old one with os.replace,
+    so an interrupted scrape never leaves a half written CSV behind.
+    """
+
+    def __init__(self, file_path, columns, key_columns, flush_rows=ACCUMULATOR_FLUSH_ROWS):
+        """
+        Parameters:
+        file_path (str): The CSV file the rows are saved to.
+        columns (list): The columns of the CSV file, in order.
+        key_columns (list): The columns that identify a row, used to drop duplicates.
+        flush_rows (int): Write the file every time this many new rows were added, or None to only write on flush().
+        """
+        self.file_path = file_path
+        self.columns = columns
+        self.key_columns = key_columns
+        self.flush_rows = flush_rows
+        self.rows = []
+        self.keys = set()
+        self.pending = 0
+
+        ensure_directory_exists(os.path.dirname(file_path))
+        if os.path.exists(file_path):
+            existing_df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+            for row in existing_df.to_dict('records'):
+                self.add(row, count=False)
+
+    def key(self, row):
+        """Return the key of a row, with every value as a string so keys read from the file match new ones."""
+        return tuple('' if row.get(column) is None or pd.isnull(row.get(column)) else str(row.get(column))
+                     for column in self.key_columns)
+
+    def add(self, row, count=True):
+        """
+        Add a row unless a row with the same key was already added.
+
+        Returns:
+        bool: True if the row was new.
+        """
+        key = self.key(row)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self.rows.append({column: row.get(column) for column in self.columns})
+        if count:
+            self.pending += 1
+            if self.flush_rows and self.pending >= self.flush_rows:
+                self.flush()
+        return True
+
+    def flush(self):
+        """Write every row to the CSV file with an atomic rename, if rows were added since the last write."""
+        if not self.pending:
+            return
+        temp_path = f"{self.file_path}.tmp"
+        pd.DataFrame(self.rows, columns=self.columns).to_csv(temp_path, index=False)
+        os.replace(temp_path, self.file_path)
+        print(f"Saved {self.pending} new rows ({len(self.rows)} in total) to {self.file_path}")
+        self.pending = 0
+
+
+def squad_info_accumulator():
+    """
+    Create the accumulator for 'misc csv files/squad_info.csv', deduplicated across all columns.
+    """
+    csv_file_path = os.path.join("Data", "misc csv files", 'squad_info.csv')
+    return CsvAccumulator(csv_file_path, SQUAD_INFO_COLUMNS, SQUAD_INFO_COLUMNS)
+
+def player_info_accumulator():
+    """
+    Create the accumulator for 'misc csv files/player_info.csv', deduplicated on 'playerId' and 'squadId'.
     """
-    misc_csv_dir = os.path.join("Data", "misc csv files")
-    ensure_directory_exists(misc_csv_dir)
+    csv_file_path = os.path.join("Data", "misc csv files", 'player_info.csv')
+    return CsvAccumulator(csv_file_path, PLAYER_INFO_COLUMNS, ['playerId', 'squadId'])
 
-    unique_fields_csv = os.path.join(misc_csv_dir, f'unique fields {sport_category}.csv')
+def unique_fields_accumulator(sport_category):
+    """
+    Create the accumulator for a sport's 'misc csv files/unique fields {sport_category}.csv'.
+    It is only written on flush(), so the fields of every match are merged with the file once.
+    """
+    unique_fields_csv = os.path.join("Data", "misc csv files", f'unique fields {sport_category}.csv')
+    return CsvAccumulator(unique_fields_csv, ['Field'], ['Field'], flush_rows=None)
+
+def save_unique_fields(sport_category, match_fields, registry=None):
+    """
+    Save unique fields to a CSV file based on the sport category.
 
-    if os.path.exists(unique_fields_csv):
-        existing_fields_df = pd.read_csv(unique_fields_csv)
-        existing_fields = set(existing_fields_df['Field'])
+    Parameters:
+    sport_category (str): The sanitized sport category, used to generate the file name.
+    match_fields (list): The columns of a match.
+    registry (dict): The scrape's sport category to unique fields accumulator registry, written once at the end.
+                     Without one, the file is updated straight away.
+    """
+    if registry is None:
+        accumulator = unique_fields_accumulator(sport_category)
     else:
-        existing_fields = set()
-        existing_fields_df = pd.DataFrame(columns=['Field'])
+        if sport_category not in registry:
+            registry[sport_category] = unique_fields_accumulator(sport_category)
+        accumulator = registry[sport_category]
 
-    new_fields = set(match_fields) - existing_fields
+    for field in match_fields:
+        accumulator.add({'Field': field})
 
-    if new_fields:
-        new_fields_df = pd.DataFrame(new_fields, columns=['Field'])
-        updated_df = pd.concat([existing_fields_df, new_fields_df], ignore_index=True)
-        updated_df.to_csv(unique_fields_csv, index=False)
-        print(f"Added {len(new_fields)} new fields to {unique_fields_csv}")
+    if registry is None:
+        accumulator.flush()
 
-def save_squad_info_to_csv(squad_id, squad_name, fixture_title, fixture_year, sport_id):
+def save_squad_info_to_csv(squad_id, squad_name, fixture_title, fixture_year, sport_id, accumulator=None):
     """
-    Save squad information to a CSV file in the 'misc csv files' directory, but only for women's netball (sport_id 8, 9, or 10).
+    Save squad information to the squad_info.csv file in the 'misc csv files' directory.
 
     Parameters:
     squad_id (int): The ID of the squad.
     squad_name (str): The name of the squad.
     fixture_title (str): The title of the fixture.
     fixture_year (str): The year of the fixture.
-    sport_id (int): The ID of the sport (used to filter relevant squads).
+    sport_id (int): The ID of the sport.
+    accumulator (CsvAccumulator): The scrape's squad info accumulator. Without one, the file is rewritten straight away.
     """
+    new_entry = dict(zip(SQUAD_INFO_COLUMNS, [squad_id, squad_name, fixture_title, fixture_year, sport_id]))
 
-    # Check
-    misc_csv_dir = os.path.join("Data", "misc csv files")
-    ensure_directory_exists(misc_csv_dir)
+    if accumulator is not None:
+        accumulator.add(new_entry)
+        return
 
-    csv_file_path = os.path.join(misc_csv_dir, 'squad_info.csv')
+    accumulator = squad_info_accumulator()
+    accumulator.add(new_entry)
+    accumulator.flush()
 
-    # Check if the CSV file exists; if not, create an empty DataFrame with the required columns
-    if os.path.exists(csv_file_path):
-        squad_df = pd.read_csv(csv_file_path)
-    else:
-        squad_df = pd.DataFrame(columns=['SquadID', 'SquadName', 'FixtureTitle', 'FixtureYear', 'SportID'])
+def save_player_info_to_csv(player_info_data, accumulator=None):
+    """
+    Save player information to the player_info.csv file in the 'misc csv files' directory.
 
-    # Create a new entry DataFrame
-    new_entry = pd.DataFrame([[squad_id, squad_name, fixture_title, fixture_year, sport_id]],
-                             columns=['SquadID', 'SquadName', 'FixtureTitle', 'FixtureYear', 'SportID'])
+    Parameters:
+    player_info_data (dict): A dictionary containing player information.
+    accumulator (CsvAccumulator): The scrape's player info accumulator. Without one, the file is rewritten straight away.
+    """
+    if accumulator is not None:
+        accumulator.add(player_info_data)
+        return
 
-    # Concatenate the new entry with the existing DataFrame
-    squad_df = pd.concat([squad_df, new_entry], ignore_index=True)
+    accumulator = player_info_accumulator()
+    accumulator.add(player_info_data)
+    accumulator.flush()
 
-    # Remove any duplicate rows (ensure uniqueness across all columns)
-    squad_df = squad_df.drop_duplicates(subset=['SquadID', 'SquadName', 'FixtureTitle', 'FixtureYear', 'SportID'], keep='first')
+CONSOLIDATED_ROOT = os.path.join("Data", "Consolidated")
+CONSOLIDATED_FLUSH_BYTES = 8 * 1024 * 1024  # Buffered bytes over all files before they are appended to disk
 
-    # Save the updated DataFrame back to the CSV file
-    squad_df.to_csv(csv_file_path, index=False)
-    print(f"Squad info updated and saved to {csv_file_path}")
 
-def save_player_info_to_csv(player_info_data):
+class ConsolidatedCsvWriter:
     """
-    Save player information to a CSV file in the 'misc csv files' directory.
+    Appends the rows of every table to one rolling CSV file per sport and season, instead of a folder and
+    several files per match:
+        Data/Consolidated/<sport>/<season>/<table>.csv
+        Data/Consolidated/<sport>/<season>/<table>.index.json
 
-    Parameters:
-    player_info_data (dict): A dictionary containing player information.
-    """
-    misc_csv_dir = os.path.join("Data", "misc csv files")
-    ensure_directory_exists(misc_csv_dir)
+    Every add() becomes one block of rows without a header. The index maps the block's key (the matchId, or the
+    fixtureId for fixtures) to its byte offset, its length and its columns, since the columns differ between matches.
+    read_consolidated_block() reads a single match back by seeking to its byte range.
 
-    csv_file_path = os.path.join(misc_csv_dir, 'player_info.csv')
+    Blocks are buffered in memory and appended to their files every CONSOLIDATED_FLUSH_BYTES, and the indexes are
+    rewritten with an atomic rename on every flush. The first flush of a file in a run replaces the file of an earlier run.
 
-    # Check if the CSV file exists; if not, create an empty DataFrame with the required columns
-    if os.path.exists(csv_file_path):
-        player_df = pd.read_csv(csv_file_path)
-    else:
-        player_df = pd.DataFrame(columns=['playerId', 'firstname', 'surname', 'displayName', 'shortDisplayName', 'squadName', 'squadId', 'sportId', 'uniqueSquadId', 'uniquePlayerId'])
+    With a compression, every block is compressed on its own (a gzip member or a zstd frame). Concatenated members
+    are still one valid .csv.gz or .csv.zst file, and the index byte ranges point at single compressed blocks.
+    """
 
-    # Create a new entry DataFrame
-    new_entry = pd.DataFrame([player_info_data])
+    def __init__(self, root=CONSOLIDATED_ROOT, compression=None):
+        """
+        Parameters:
+        root (str): The folder the sport folders are written under.
+        compression (str): None, 'gzip' or 'zstd'.
+        """
+        self.root = root
+        self.compression = compression
+        compressed_csv_path('', compression)  # Fails early on an unknown compression
+        self.buffers = {}  # File path to a list of (key, columns, bytes) blocks
+        self.buffered_bytes = 0
+        self.indexes = {}  # File path to its index, for every file written in this run
+
+    def file_path(self, sport_category, table, season):
+        """Return the consolidated file of a table's season."""
+        season = sanitize_filename(str(season)) if season else 'unknown'
+        return compressed_csv_path(
+            os.path.join(self.root, sanitize_filename(sport_category), season, f"{table}.csv"), self.compression)
+
+    def add(self, sport_category, table, season, df, key=None):
+        """
+        Buffer the rows of a match as one block of the table's season file.
+
+        Parameters:
+        sport_category (str): The sport category, e.g. 'AFL Mens'.
+        table (str): 'fixture', 'match', 'period' or 'score_flow'.
+        season (str): The season the rows belong to.
+        df (pandas.DataFrame): The rows.
+        key (str): The key of the block in the index, defaults to the matchId of the first row.
+        """
+        if df.empty:
+            return
+        if key is None:
+            key = df['matchId'].iloc[0]
+        block = compress_block(df.to_csv(index=False, header=False).encode('utf-8'), self.compression)
+        self.buffers.setdefault(self.file_path(sport_category, table, season), []).append(
+            (str(key), [str(column) for column in df.columns], block))
+        self.buffered_bytes += len(block)
+
+        if self.buffered_bytes >= CONSOLIDATED_FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        """Append every buffered block to its file and save the updated indexes."""
+        for file_path, blocks in self.buffers.items():
+            if file_path not in self.indexes:
+                ensure_directory_exists(os.path.dirname(file_path))
+                open(file_path, 'wb').close()
+                self.indexes[file_path] = {}
+            index = self.indexes[file_path]
+
+            with open(file_path, 'ab') as consolidated_file:
+                offset = consolidated_file.tell()
+                for key, columns, block in blocks:
+                    consolidated_file.write(block)
+                    index[key] = {'offset': offset, 'length': len(block), 'columns': columns}
+                    offset += len(block)
+
+            index_path = consolidated_index_path(file_path)
+            with open(f"{index_path}.tmp", 'w') as index_file:
+                json.dump(index, index_file)
+            os.replace(f"{index_path}.tmp", index_path)
+            print(f"Appended {len(blocks)} blocks to {file_path}")
+
+        self.buffers = {}
+        self.buffered_bytes = 0
+
+def compress_block(block, compression):
+    """
+    Compress one block of CSV bytes as a standalone gzip member or zstd frame.
+    """
+    if compression == 'gzip':
+        return gzip.compress(block)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstd compression needs the zstandard package, install it with 'pip install zstandard'.")
+        return zstandard.ZstdCompressor().compress(block)
+    return block
+
+def consolidated_index_path(file_path):
+    """
+    Return the index file of a consolidated CSV, e.g. 'match.csv.gz' -> 'match.index.json'.
+    """
+    return f"{file_path[:file_path.rindex('.csv')]}.index.json"
 
-    # Concatenate the new entry with the existing DataFrame
-    player_df = pd.concat([player_df, new_entry], ignore_index=True)
+def read_consolidated_block(file_path, key):
+    """
+    Read one match (or fixture) back from a consolidated file, using its index.
 
-    # Remove any duplicate rows based on 'playerId' and 'squadId'
-    player_df = player_df.drop_duplicates(subset=['playerId', 'squadId'], keep='first')
+    Parameters:
+    file_path (str): The consolidated CSV file, plain or compressed.
+    key (str): The matchId, or the fixtureId for fixture files.
 
-    # Save the updated DataFrame back to the CSV file
-    player_df.to_csv(csv_file_path, index=False)
-    print(f"Player info updated and saved to {csv_file_path}")
+    Returns:
+    pandas.DataFrame: The rows of the block, with their columns.
+    """
+    with open(consolidated_index_path(file_path), 'r') as index_file:
+        entry = json.load(index_file)[str(key)]
+    with open(file_path, 'rb') as consolidated_file:
+        consolidated_file.seek(entry['offset'])
+        block = consolidated_file.read(entry['length'])
+    compression = next((name for name, extension in CSV_COMPRESSION_EXTENSIONS.items()
+                        if extension and file_path.endswith(extension)), None)
+    return pd.read_csv(io.BytesIO(block), header=None, names=entry['columns'], compression=compression)
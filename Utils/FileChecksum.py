@@ -0,0 +1,10 @@
+import hashlib
+
+
+def file_checksum(file_path):
+    """Return the SHA-256 checksum of a file, read in chunks."""
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
@@ -1,18 +1,58 @@
+import sys
+from contextlib import nullcontext
 from DatabaseUtils.Reconstructor import reconstruct_database
 from DatabaseUtils.PlayerTableReconstructor import reconstruct_player_table
+from DatabaseUtils.StagingRebuild import rebuild_with_staging
+from DatabaseUtils.SchemaReconciler import reconcile_schema
+from DatabaseUtils.QueryIndexes import load_index_set, deferred_query_indexes
 from Core.Scraper import Scraper
+from Core.Sinks import create_sinks
 
 """
 Main script to handle database reconstruction, cleaning player table, and scraping.
+
+A plain run drops and recreates every table from the create scripts (reconstruct_database), which also undoes
+any season partitioning done with DatabaseUtils/PartitionManager.py. Use --reconcile (or --staging) to keep it.
+
+Run with --staging to rebuild through staging tables instead, which keeps the current tables readable
+until the new ones are swapped in.
+
+Run with --reconcile to alter the existing tables to match the create scripts instead of dropping them,
+so the scrape upserts into the data that is already there.
+
+Run with --sinks=csv,parquet,ndjson to also write the scraped rows to those formats from the same scrape,
+and add --no-database to only write the sinks. Add --compression=gzip (or zstd) to compress the CSV sink.
+With --sinks=spool --no-database the fixtures are only spooled to disk, and DatabaseUtils/SpoolLoader.py loads them.
 """
 
 if __name__ == "__main__":
-    reconstruct_database()
-    reconstruct_player_table()
+    sink_names = next((arg.split('=', 1)[1].split(',') for arg in sys.argv if arg.startswith('--sinks=')), [])
+    compression = next((arg.split('=', 1)[1] for arg in sys.argv if arg.startswith('--compression=')), None)
+    write_database = '--no-database' not in sys.argv
+
+    if compression not in (None, 'gzip', 'zstd'):
+        sys.exit(f"Unknown compression '{compression}', expected 'gzip' or 'zstd'.")
+
+    if '--staging' in sys.argv:
+        reconstruct_player_table()
+        rebuild_with_staging()
+        sys.exit()
+
+    # Without the database the tables are left alone, and MySQL may not be running at all.
+    # static_player_info is still used for playerId lookups if it is, as it was last loaded.
+    if write_database:
+        if '--reconcile' in sys.argv:
+            reconcile_schema()
+        else:
+            reconstruct_database()
+        reconstruct_player_table()
 
 
 
     # Start the scraper after the database and player table have been prepared
-    scraper = Scraper()
-    scraper.scrape_entire_database()
+    scraper = Scraper(sinks=create_sinks(sink_names, compression), write_database=write_database)
 
+    # Drop the query indexes for the bulk load and build them once it is done, instead of maintaining them row by row
+    index_deferral = deferred_query_indexes(scraper.connection, load_index_set()) if write_database else nullcontext()
+    with index_deferral:
+        scraper.scrape_entire_database()